@@ -14,6 +14,69 @@ print_message () {
     echo -e "${left_filler_len// /$symbol}$message${right_filler_len// /$symbol}\033[0m"
 }
 
+elapsed_since () {
+    # Print seconds passed since the moment given in the first argument
+    # as "date +%s.%N" output.
+    awk "BEGIN { printf \"%.1f\", $(date +%s.%N) - $1 }"
+}
+
+run_project () {
+    # Run the tests of the project in the directory (first argument) with the
+    # settings module (second argument) and write the running time in seconds
+    # to the file given as a third argument. Extra arguments go to pytest.
+    local started=$(date +%s.%N)
+    local directory=$1
+    local settings=$2
+    local timing=$3
+    shift 3
+    (cd "$directory" && DJANGO_SETTINGS_MODULE="$settings" pytest --tb=line "$@")
+    local status=$?
+    elapsed_since "$started" > "$timing"
+    return $status
+}
+
+run_parallel () {
+    # Run the tests of both projects at once. With pytest-xdist installed each
+    # project is also split between TEST_WORKERS processes (auto by default),
+    # every worker has its own test database: in memory for ya_news, the file
+    # test_db.sqlite3_gw<N> for ya_note.
+    local xdist_args=()
+    if python -c "import xdist" 2>/dev/null; then
+        xdist_args=(-n "${TEST_WORKERS:-auto}")
+    fi
+    local logs=$(mktemp -d)
+    local started=$(date +%s.%N)
+    run_project ya_news yanews.settings "$logs/news.time" "${xdist_args[@]}" > "$logs/news.log" 2>&1 &
+    local news_pid=$!
+    run_project ya_note yanote.settings "$logs/note.time" "${xdist_args[@]}" > "$logs/note.log" 2>&1 &
+    local note_pid=$!
+    wait $news_pid
+    local news_status=$?
+    wait $note_pid
+    local note_status=$?
+    local total=$(elapsed_since "$started")
+    cat "$logs/news.log" "$logs/note.log" 1>&2
+    local news_time=$(cat "$logs/news.time")
+    local note_time=$(cat "$logs/note.time")
+    rm -r "$logs"
+    local saved=$(awk "BEGIN { printf \"%.1f\", $news_time + $note_time - $total }")
+    print_message " YaNews: ${news_time} с, YaNote: ${note_time} с, вместе: ${total} с, сэкономлено: ${saved} с " "="
+    if [[ $news_status -ne 0 ]]; then
+        print_message " При запуске упали ваши тесты для проекта YaNews. Проверьте тесты этого проекта " "=" 1
+        echo \`\`\` 1>&2
+        return $news_status
+    fi
+    if [[ $note_status -ne 0 ]]; then
+        print_message " При запуске упали ваши тесты для проекта YaNote. Проверьте тесты этого проекта " "=" 1
+        echo \`\`\` 1>&2
+        return $note_status
+    fi
+    return 0
+}
+
+# With --parallel both projects are tested at once, see run_parallel.
+if [[ "$1" == "--parallel" ]]; then parallel=1; fi
+
 
 if python -m flake8 --config=setup.cfg 1>&2;
 then
@@ -21,6 +84,10 @@ then
     echo $LF 1>&2
     if python structure_test.py
     then
+        if [[ -n "$parallel" ]]; then
+            run_parallel
+            exit $?
+        fi
         cd ya_news
         export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanews.settings"}"
         if pytest --tb=line 1>&2;
@@ -0,0 +1,239 @@
+"""
+Нагрузочный замер всех адресов news.urls смесью чтения и записи.
+
+База SQLite заполняется новостями и комментариями (по умолчанию
+100 тысяч и миллион; у популярных новостей комментариев больше),
+затем потоки с анонимным клиентом, читателем и сотрудником гоняют
+смесь запросов из ROUTES. Читатель пишет, правит и удаляет свои
+комментарии. Результаты — по маршрутам, см. yacommon.bench.
+Запуск из каталога ya_news:
+    python -m benchmarks.load --database /tmp/news.sqlite3 \\
+        --output results.json --baseline previous.json
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+# Общий для обоих проектов код лежит в корне репозитория.
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from yacommon import bench  # noqa: E402
+
+# Своих комментариев у читателя: их он правит и удаляет.
+OWN_COMMENTS = 500
+# Доля комментариев, ещё не прошедших модерацию.
+PENDING_SHARE = 0.05
+
+
+def popular(rng, count):
+    """Номер от 0 до count: первые встречаются намного чаще."""
+    return int(count * rng.random() ** 3)
+
+
+def seed_news(args, rng, vocabulary):
+    from django.db import connection
+
+    today = date.today()
+    updated = connection.ops.adapt_datetimefield_value(
+        datetime.now(timezone.utc)
+    )
+    return bench.insert_rows(
+        'news_news',
+        ('id', 'title', 'text', 'date', 'comment_count', 'updated'),
+        (
+            (pk, bench.sentence(rng, vocabulary, 5),
+             bench.sentence(rng, vocabulary, 80),
+             (today - timedelta(days=rng.randrange(3650))).isoformat(), 0,
+             updated)
+            for pk in range(1, args.news + 1)
+        ),
+    )
+
+
+def seed_comments(rng, vocabulary, news_count, author_ids, count):
+    from django.db import connection
+
+    from news.models import Comment
+
+    adapt = connection.ops.adapt_datetimefield_value
+    now = datetime.now(timezone.utc)
+    return bench.insert_rows(
+        'news_comment',
+        ('news_id', 'author_id', 'text', 'created', 'version', 'status'),
+        (
+            (popular(rng, news_count) + 1, rng.choice(author_ids),
+             bench.sentence(rng, vocabulary, rng.randint(3, 30)),
+             adapt(now - timedelta(minutes=rng.randrange(10 ** 6))), 1,
+             Comment.Status.PENDING if rng.random() < PENDING_SHARE
+             else Comment.Status.APPROVED)
+            for _ in range(count)
+        ),
+    )
+
+
+def seed(args, rng):
+    """Заполняет пустую базу; возвращает читателей и сотрудника."""
+    from django.contrib.auth import get_user_model
+
+    from news.cache import page_cache
+    from news.models import Comment, News
+    from news.search import get_backend
+
+    User = get_user_model()
+    vocabulary = [bench.random_word(rng) for _ in range(args.vocabulary)]
+    inserted = 0
+    if not News.objects.exists():
+        inserted += seed_news(args, rng, vocabulary)
+        User.objects.bulk_create(
+            User(username=f'commenter{index}')
+            for index in range(args.authors)
+        )
+        inserted += seed_comments(
+            rng, vocabulary, args.news,
+            list(User.objects.values_list('pk', flat=True)), args.comments,
+        )
+    readers = []
+    for index in range(args.concurrency):
+        reader, _ = User.objects.get_or_create(username=f'reader{index}')
+        missing = OWN_COMMENTS - reader.comment_set.count()
+        if missing > 0:
+            inserted += seed_comments(
+                rng, vocabulary, News.objects.count(), [reader.pk], missing
+            )
+        readers.append(reader)
+    staff, _ = User.objects.get_or_create(
+        username='staff', defaults={'is_staff': True}
+    )
+    if inserted:
+        # Вставка идёт мимо моделей, как в import_news.
+        print('пересчёт комментариев и поискового индекса…')
+        News.objects.recount_comments()
+        get_backend().rebuild()
+    page_cache().clear()
+    print(f'новостей: {News.objects.count()}, '
+          f'комментариев: {Comment.objects.count()}')
+    return readers, staff, vocabulary
+
+
+def make_workers(args, readers, staff, vocabulary):
+    from django.test import Client
+
+    from news.models import News
+
+    news_count = News.objects.count()
+    workers = []
+    for index, reader in enumerate(readers):
+        clients = {'anonymous': Client(), 'user': Client(), 'staff': Client()}
+        clients['user'].force_login(reader)
+        clients['staff'].force_login(staff)
+        workers.append(bench.Worker(
+            clients, args.seed + index,
+            news_count=news_count, vocabulary=vocabulary,
+            own_comments=list(
+                reader.comment_set.values_list('pk', flat=True)
+            ),
+        ))
+    return workers
+
+
+def news_url(name):
+    def build(worker):
+        from django.urls import reverse
+
+        pk = popular(worker.rng, worker.news_count) + 1
+        return {'path': reverse(name, args=(pk,))}
+    return build
+
+
+def own_comment_url(name, data=None, remove=False):
+    def build(worker):
+        from django.urls import reverse
+
+        if not worker.own_comments:
+            return None
+        index = worker.rng.randrange(len(worker.own_comments))
+        pk = (worker.own_comments.pop(index) if remove
+              else worker.own_comments[index])
+        return {'path': reverse(name, args=(pk,)), 'data': data}
+    return build
+
+
+def home(worker):
+    from django.urls import reverse
+
+    return {'path': reverse('news:home')}
+
+
+def search(worker):
+    from django.urls import reverse
+
+    return {'path': reverse('news:search'),
+            'data': {'q': worker.rng.choice(worker.vocabulary)}}
+
+
+def export(worker):
+    from django.urls import reverse
+
+    return {'path': reverse('news:export'), 'data': {'model': 'news'}}
+
+
+def add_comment(worker):
+    build = news_url('news:detail')(worker)
+    build['data'] = {'text': bench.sentence(worker.rng, worker.vocabulary, 10)}
+    return build
+
+
+ROUTES = [
+    bench.Route('news:home', 'GET', 15, home, client='anonymous'),
+    bench.Route('news:home', 'GET', 10, home),
+    bench.Route('news:detail', 'GET', 15, news_url('news:detail'),
+                client='anonymous'),
+    bench.Route('news:detail', 'GET', 10, news_url('news:detail')),
+    bench.Route('news:comments', 'GET', 8, news_url('news:comments')),
+    bench.Route('news:search', 'GET', 8, search, client='anonymous'),
+    bench.Route('news:export', 'GET', 1, export, client='staff'),
+    bench.Route('news:detail', 'POST', 4, add_comment),
+    bench.Route('news:edit', 'GET', 2, own_comment_url('news:edit')),
+    bench.Route('news:edit', 'POST', 3, own_comment_url(
+        'news:edit', {'text': 'Исправленный комментарий'}
+    )),
+    bench.Route('news:delete', 'GET', 1, own_comment_url('news:delete')),
+    bench.Route('news:delete', 'POST', 2, own_comment_url(
+        'news:delete', remove=True
+    )),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    bench.add_arguments(parser)
+    parser.add_argument('--news', type=int, default=100_000)
+    parser.add_argument('--comments', type=int, default=1_000_000)
+    parser.add_argument('--authors', type=int, default=1000)
+    parser.add_argument('--vocabulary', type=int, default=5000)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        bench.setup_django(
+            'yanews.settings', 'YANEWS',
+            args.database or os.path.join(directory, 'bench.sqlite3'),
+        )
+        readers, staff, vocabulary = seed(args, rng)
+        workers = make_workers(args, readers, staff, vocabulary)
+        print(f'нагрузка: {args.concurrency} потоков, {args.seconds:g} с')
+        results = bench.run(ROUTES, workers, args.seconds)
+    results.update(
+        project='ya_news', environment=bench.environment(),
+        config=vars(args),
+    )
+    return bench.finish(results, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+Сравнение проверки запрещённых слов: цикл по словам и одно выражение.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.profanity --words 10000 --text-size 65536
+"""
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+from news.profanity import build_pattern
+
+# Общий для обоих проектов код лежит в корне репозитория.
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from yacommon import bench  # noqa: E402
+
+
+def loop_search(words, text):
+    lowered_text = text.lower()
+    for word in words:
+        if word in lowered_text:
+            return word
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--words', type=int, default=10_000)
+    parser.add_argument('--text-size', type=int, default=64 * 1024)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = {bench.random_word(rng, 6, 10) for _ in range(args.words)}
+    chunks = []
+    size = 0
+    while size < args.text_size:
+        chunk = bench.random_word(rng, 2, 5)
+        if not any(word in chunk for word in words):
+            chunks.append(chunk)
+            size += len(chunk) + 1
+    # Худший случай: в чистом тексте нужно проверить все позиции.
+    text = ' '.join(chunks)[:args.text_size]
+
+    build_time = min(timeit.repeat(
+        lambda: build_pattern(words), number=1, repeat=args.repeat
+    ))
+    pattern = build_pattern(words)
+    assert (pattern.search(text.lower()) is None) == (
+        loop_search(words, text) is None
+    )
+    loop_time = min(timeit.repeat(
+        lambda: loop_search(words, text), number=1, repeat=args.repeat
+    ))
+    pattern_time = min(timeit.repeat(
+        lambda: pattern.search(text.lower()), number=1, repeat=args.repeat
+    ))
+    print(f'слов: {len(words)}, текст: {len(text)} символов')
+    print(f'сборка выражения: {build_time * 1000:.1f} мс (один раз)')
+    print(f'цикл по словам:   {loop_time * 1000:.1f} мс')
+    print(f'одно выражение:   {pattern_time * 1000:.1f} мс')
+    print(f'ускорение:        {loop_time / pattern_time:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
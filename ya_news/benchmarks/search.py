@@ -0,0 +1,112 @@
+"""
+Поиск по новостям: индекс FTS5 против icontains на миллионе новостей.
+
+Новости создаются во временной базе SQLite, рабочая база не меняется.
+Запуск из каталога ya_news:
+    python -m benchmarks.search --news 1000000 --queries 200
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Общий для обоих проектов код лежит в корне репозитория.
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from yacommon import bench  # noqa: E402
+
+
+def seed(count, vocabulary, rng, batch_size=20_000):
+    from django.db import connection, transaction
+
+    from news.search import get_backend
+
+    today = date.today()
+    for start in range(0, count, batch_size):
+        rows = []
+        for pk in range(start + 1, min(start + batch_size, count) + 1):
+            words = [
+                rng.choice(vocabulary) + rng.choice(bench.ENDINGS)
+                for _ in range(40)
+            ]
+            rows.append((
+                pk, ' '.join(words[:4]), ' '.join(words),
+                (today - timedelta(days=rng.randrange(3650))).isoformat(), 0,
+            ))
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO news_news '
+                '(id, title, text, date, comment_count, updated) '
+                'VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)',
+                rows,
+            )
+        print(f'\rновостей: {start + len(rows)}', end='', flush=True)
+    print()
+    started = time.perf_counter()
+    with transaction.atomic():
+        get_backend().rebuild()
+    print(f'индексация: {time.perf_counter() - started:.1f} с')
+
+
+def measure(function, queries):
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        function(query)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return (
+        statistics.median(timings),
+        timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--news', type=int, default=1_000_000)
+    parser.add_argument('--vocabulary', type=int, default=50_000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        bench.setup_django(
+            'yanews.settings', 'YANEWS',
+            os.path.join(directory, 'bench.sqlite3'),
+        )
+        from news.models import News
+        from news.search import get_backend, search_news
+
+        rng = random.Random(args.seed)
+        vocabulary = [
+            bench.random_word(rng, 5, 9) for _ in range(args.vocabulary)
+        ]
+        seed(args.news, vocabulary, rng)
+        queries = [
+            ' '.join(
+                rng.choice(vocabulary) + rng.choice(bench.ENDINGS)
+                for _ in range(rng.randint(1, 2))
+            )
+            for _ in range(args.queries)
+        ]
+
+        def icontains(query):
+            list(News.objects.filter(
+                text__icontains=query.split()[0]
+            ).order_by('-date')[:10])
+
+        def indexed(query):
+            search_news(query, limit=10)
+
+        print(f'индекс: {type(get_backend()).__name__}')
+        for name, function in (('icontains', icontains), ('индекс', indexed)):
+            p50, p99 = measure(function, queries)
+            print(f'{name:>10}: p50 {p50:.2f} мс, p99 {p99:.2f} мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+"""
+Нагрузочный тест чтения: WSGI-приложение (wsgi.py) против ASGI (asgi.py).
+
+Оба приложения работают в одном процессе на одной временной базе:
+WSGI — в gunicorn с воркером gthread на WSGI_THREADS потоков,
+ASGI — в uvicorn с асинхронными страницами из yanews.urls_async.
+Клиент держит заданное число keep-alive соединений и запрашивает
+ленту и страницы новостей от имени вошедшего пользователя, чтобы
+ответы не брались из кэша страниц. --db-latency-ms добавляет паузу
+к каждому запросу в базу, как у базы по сети. Запуск из каталога
+ya_news (gunicorn и uvicorn ставятся из requirements-bench.txt:
+pip install -r ../requirements-bench.txt):
+    python -m benchmarks.servers --connections 10 100 400 --seconds 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+HOST = '127.0.0.1'
+WSGI_THREADS = 10
+
+
+def configure():
+    from django.conf import settings
+    from django.db.backends.signals import connection_created
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = [HOST]
+    settings.MODERATION_WORKERS = 0
+    latency = float(os.environ.get('BENCH_DB_LATENCY', 0))
+
+    def delay(execute, sql, params, many, context):
+        time.sleep(latency)
+        return execute(sql, params, many, context)
+
+    def add_delay(sender, connection, **kwargs):
+        if latency and delay not in connection.execute_wrappers:
+            connection.execute_wrappers.append(delay)
+
+    connection_created.connect(add_delay, weak=False)
+
+
+def wsgi_application():
+    """Фабрика приложения для сервера."""
+    from yanews.wsgi import application
+
+    configure()
+    return application
+
+
+def asgi_application():
+    from yanews.asgi import application
+
+    configure()
+    return application
+
+
+def seed(args):
+    """Готовит базу и печатает ключ сессии и id новостей."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    import django
+
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.test import Client
+
+    from news.models import Comment, News
+
+    call_command('migrate', verbosity=0)
+    user = get_user_model().objects.create(username='reader')
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Текст новости. ' * 20)
+        for index in range(args.news)
+    )
+    news_ids = list(News.objects.values_list('pk', flat=True))
+    Comment.objects.bulk_create(
+        Comment(news_id=news_id, author=user, text='Комментарий',
+                status=Comment.Status.APPROVED)
+        for news_id in news_ids
+        for _ in range(args.comments)
+    )
+    News.objects.recount_comments()
+    client = Client()
+    client.force_login(user)
+    print(json.dumps({
+        'session': client.cookies['sessionid'].value, 'news': news_ids,
+    }))
+
+
+async def fetch(reader, writer, path, session):
+    writer.write(
+        f'GET {path} HTTP/1.1\r\nHost: {HOST}\r\n'
+        f'Cookie: sessionid={session}\r\n\r\n'.encode()
+    )
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = 0
+    for line in head.split(b'\r\n')[1:]:
+        name, _, value = line.partition(b':')
+        if name.strip().lower() == b'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def load(port, connections, seconds, paths, session):
+    """Держит connections соединений до конца срока; задержки и ошибки."""
+    deadline = time.monotonic() + seconds
+    latencies = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        stream = None
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                if stream is None:
+                    stream = await asyncio.open_connection(HOST, port)
+                status = await fetch(*stream, random.choice(paths), session)
+                ok = status == 200
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                ok = False
+                stream = None
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+        if stream is not None:
+            stream[1].close()
+
+    started = time.monotonic()
+    await asyncio.gather(*(client() for _ in range(connections)))
+    elapsed = time.monotonic() - started
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': (len(latencies) - errors) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('Сервер завершился при запуске.')
+        try:
+            socket.create_connection((HOST, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('Сервер не начал принимать соединения.')
+
+
+def server_command(interface, port):
+    if interface == 'wsgi':
+        return [
+            sys.executable, '-m', 'gunicorn',
+            'benchmarks.servers:wsgi_application()',
+            '--worker-class', 'gthread', '--threads', str(WSGI_THREADS),
+            '--bind', f'{HOST}:{port}', '--log-level', 'warning',
+        ]
+    return [
+        sys.executable, '-m', 'uvicorn', '--factory',
+        'benchmarks.servers:asgi_application',
+        '--host', HOST, '--port', str(port),
+        '--log-level', 'warning', '--no-access-log',
+    ]
+
+
+def run_server(interface, args, env, data):
+    process = subprocess.Popen(server_command(interface, args.port), env=env)
+    paths = ['/'] + [f'/news/{pk}/' for pk in data['news']]
+    try:
+        wait_for_port(args.port, process)
+        for connections in args.connections:
+            result = asyncio.run(load(
+                args.port, connections, args.seconds, paths, data['session']
+            ))
+            print(
+                f'{interface} {connections:>5} соединений: '
+                f'{result["rps"]:7.1f} запросов/с, '
+                f'ошибок {result["errors"]}/{result["requests"]}, '
+                f'p50 {result["p50_ms"]:.1f} мс, '
+                f'p99 {result["p99_ms"]:.1f} мс'
+            )
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--connections', type=int, nargs='+',
+                        default=[10, 100, 400])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--db-latency-ms', type=float, default=2)
+    parser.add_argument('--news', type=int, default=1000)
+    parser.add_argument('--comments', type=int, default=5)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--seed', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.seed:
+        return seed(args)
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(
+            os.environ,
+            YANEWS_DATABASE_URL='sqlite:///' + os.path.join(
+                directory, 'bench.sqlite3'
+            ),
+            BENCH_DB_LATENCY=str(args.db_latency_ms / 1000),
+        )
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.servers', '--seed',
+             '--news', str(args.news), '--comments', str(args.comments)],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        data = json.loads(output.splitlines()[-1])
+        print(
+            f'новостей: {args.news}, задержка базы '
+            f'{args.db_latency_ms:g} мс, {args.seconds:.0f} с на замер'
+        )
+        for interface in ('wsgi', 'asgi'):
+            run_server(interface, args, env, data)
+
+
+if __name__ == '__main__':
+    main()
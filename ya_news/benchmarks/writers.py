@@ -0,0 +1,133 @@
+"""
+Нагрузочный тест записи: POST комментариев из параллельных потоков.
+
+Каждый профиль базы запускается в отдельном процессе на временной
+базе, рабочая база не меняется. Запуск из каталога ya_news:
+    python -m benchmarks.writers --writers 16 --seconds 10
+    python -m benchmarks.writers --postgres postgres://u:p@localhost/bench
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+PROFILES = {
+    'sqlite': 'sqlite:///{path}?pragmas=off',
+    'sqlite-wal': 'sqlite:///{path}',
+}
+
+
+def run_worker(args):
+    """Один профиль: готовит базу и пишет комментарии из потоков."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    import django
+    from django.conf import settings
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['testserver']
+    settings.MODERATION_WORKERS = 0
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+
+    from news.models import News
+
+    call_command('migrate', verbosity=0)
+    news = News.objects.create(title='Новость', text='Текст')
+    users = [
+        get_user_model().objects.create(username=f'writer{index}')
+        for index in range(args.writers)
+    ]
+    connection.close()
+    url = reverse('news:detail', args=(news.pk,))
+    deadline = time.monotonic() + args.seconds
+    results = []
+    barrier = threading.Barrier(args.writers)
+
+    def write(user):
+        client = Client()
+        client.force_login(user)
+        latencies, errors = [], 0
+        barrier.wait()
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                response = client.post(url, {'text': 'Комментарий'})
+                ok = response.status_code == 302
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+        connection.close()
+        results.append((latencies, errors))
+
+    threads = [
+        threading.Thread(target=write, args=(user,)) for user in users
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    latencies = sorted(value for items, _ in results for value in items)
+    errors = sum(errors for _, errors in results)
+    print(json.dumps({
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': (len(latencies) - errors) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--writers', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--postgres', help='Адрес пустой базы PostgreSQL.')
+    # Меньше, чем потоков: потоки ждут свободного соединения в пуле.
+    parser.add_argument('--pool-max', type=int, default=4,
+                        help='Размер пула профиля postgres-pool.')
+    parser.add_argument('--worker', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return run_worker(args)
+
+    profiles = dict(PROFILES)
+    if args.postgres:
+        profiles['postgres'] = args.postgres
+        profiles['postgres-pool'] = (
+            args.postgres + ('&' if '?' in args.postgres else '?')
+            + f'pool_max={args.pool_max}'
+        )
+    print(f'потоков записи: {args.writers}, {args.seconds:.0f} с на профиль')
+    for name, url in profiles.items():
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, YANEWS_DATABASE_URL=url.format(
+                path=os.path.join(directory, 'bench.sqlite3')
+            ))
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.writers', '--worker',
+                 '--writers', str(args.writers),
+                 '--seconds', str(args.seconds)],
+                env=env, capture_output=True, text=True, check=True,
+            ).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(
+            f'{name:>14}: {result["rps"]:7.1f} POST/с, '
+            f'ошибок {result["errors"]}/{result["requests"]}, '
+            f'p50 {result["p50_ms"]:.1f} мс, p99 {result["p99_ms"]:.1f} мс'
+        )
+
+
+if __name__ == '__main__':
+    main()
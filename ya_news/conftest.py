@@ -0,0 +1,2 @@
+# Плагин подсчёта запросов из общего кода (pythonpath в pytest.ini).
+pytest_plugins = ['yacommon.pytest_plugin']
@@ -5,3 +5,12 @@ class NewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'news'
     verbose_name = 'Новости'
+
+    def ready(self):
+        from yacommon.perf import registry
+
+        from . import signals  # noqa: F401
+        from .moderation import moderation_metrics
+
+        # Очередь модерации видна персоналу в /admin/perf/.
+        registry.add_gauge('moderation', moderation_metrics)
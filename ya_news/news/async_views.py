@@ -0,0 +1,99 @@
+"""
+Асинхронные версии страниц для чтения.
+
+Подключаются адресами yanews.urls_async, которые использует
+ASGI-приложение. Запросы к базе и кэшу идут через
+yacommon.aio.database_sync_to_async, шаблон рендерится в корутине.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponseNotAllowed
+from django.shortcuts import get_object_or_404, render
+
+from yacommon.aio import database_sync_to_async
+from yacommon.http import conditional_page
+from yacommon.pagination import KeysetPaginator
+
+from .cache import (
+    FEED_VERSION_KEY, NEWS_VERSION_KEY, cached_page, page_cache_key,
+    store_page
+)
+from .forms import CommentForm
+from .models import News
+from .views import NewsDetailView, comments_page, news_updated
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+@database_sync_to_async
+def cached_anonymous_page(request, version_key):
+    """
+    Ключ и ответ из кэша страниц, как в AnonymousPageCacheMixin.
+
+    Заодно загружает пользователя; для вошедших кэш не используется
+    и возвращается (None, None).
+    """
+    if request.user.is_authenticated:
+        return None, None
+    key = page_cache_key(request, version_key)
+    return key, cached_page(key)
+
+
+async def render_with_page_cache(request, version_key, load, template, **kw):
+    """
+    Страница из кэша или по контексту load(request, **kw).
+
+    load выполняется в пуле потоков и может обращаться к базе.
+    """
+    key, response = await cached_anonymous_page(request, version_key)
+    if response is None:
+        context = await database_sync_to_async(load)(request, **kw)
+        response = render(request, template, context)
+        if key is not None and response.status_code == 200:
+            await database_sync_to_async(store_page)(key, response)
+    return response
+
+
+def load_news_list(request, cursor):
+    page = KeysetPaginator(
+        News.objects.all(), '-date', settings.NEWS_COUNT_ON_HOME_PAGE
+    ).get_page(cursor)
+    return {
+        'page': page,
+        'object_list': page.object_list,
+        'news_list': page.object_list,
+    }
+
+
+def load_news_detail(request, pk):
+    news = get_object_or_404(News, pk=pk)
+    context = {'object': news, 'news': news, 'page': comments_page(news.pk)}
+    if request.user.is_authenticated:
+        context['form'] = CommentForm()
+    return context
+
+
+async def news_list(request):
+    """Список новостей, как NewsList."""
+    if request.method not in SAFE_METHODS:
+        return HttpResponseNotAllowed(SAFE_METHODS)
+    return await render_with_page_cache(
+        request, FEED_VERSION_KEY, load_news_list, 'news/home.html',
+        cursor=request.GET.get('cursor'),
+    )
+
+
+@conditional_page(news_updated)
+async def news_detail(request, pk):
+    """Новость с первой страницей комментариев, как NewsDetail."""
+    if request.method == 'POST':
+        # Комментарий — запись, её обрабатывает синхронное представление.
+        return await sync_to_async(NewsDetailView.comment_view)(
+            request, pk=pk
+        )
+    if request.method not in SAFE_METHODS:
+        return HttpResponseNotAllowed(('POST', *SAFE_METHODS))
+    return await render_with_page_cache(
+        request, NEWS_VERSION_KEY.format(pk=pk), load_news_detail,
+        'news/detail.html', pk=pk,
+    )
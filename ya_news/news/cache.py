@@ -0,0 +1,116 @@
+import hashlib
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+FEED_VERSION_KEY = 'news:feed:version'
+NEWS_VERSION_KEY = 'news:{pk}:version'
+COMMENT_FRAGMENT_KEY = 'news:comment:{pk}:{version}'
+
+
+def page_cache():
+    return caches[settings.NEWS_PAGE_CACHE_ALIAS]
+
+
+def get_version(key):
+    """Текущая версия группы страниц; заводится при первом обращении."""
+    cache = page_cache()
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_feed():
+    """Делает недоступными все закэшированные страницы ленты."""
+    page_cache().set(FEED_VERSION_KEY, uuid4().hex, None)
+
+
+def invalidate_news(pk):
+    """Делает недоступными закэшированные страницы одной новости."""
+    page_cache().set(NEWS_VERSION_KEY.format(pk=pk), uuid4().hex, None)
+
+
+def render_comments(comments):
+    """
+    Подставляет в comment.html общий для всех пользователей HTML.
+
+    Готовые фрагменты берутся из кэша одним запросом, шаблон рендерится
+    только для промахов. Ссылки автора добавляются поверх фрагмента.
+    """
+    cache = page_cache()
+    by_key = {
+        COMMENT_FRAGMENT_KEY.format(pk=comment.pk, version=comment.version):
+            comment
+        for comment in comments
+    }
+    cached = cache.get_many(by_key)
+    missing = {}
+    for key, comment in by_key.items():
+        html = cached.get(key)
+        if html is None:
+            html = missing[key] = render_to_string(
+                'news/includes/comment.html', {'comment': comment}
+            )
+        comment.html = mark_safe(html)
+    if missing:
+        cache.set_many(missing, settings.NEWS_FRAGMENT_CACHE_TIMEOUT)
+    return comments
+
+
+def page_cache_key(request, version_key):
+    """Ключ страницы: версия её группы и полный адрес запроса."""
+    return 'news:page:{}:{}:{}'.format(
+        version_key,
+        get_version(version_key),
+        hashlib.md5(request.get_full_path().encode()).hexdigest(),
+    )
+
+
+def cached_page(key):
+    cached = page_cache().get(key)
+    if cached is None:
+        return None
+    content, content_type = cached
+    return HttpResponse(content, content_type=content_type)
+
+
+def store_page(key, response):
+    page_cache().set(
+        key,
+        (response.content, response['Content-Type']),
+        settings.NEWS_PAGE_CACHE_TIMEOUT,
+    )
+
+
+class AnonymousPageCacheMixin:
+    """
+    Кэширует страницу целиком для анонимных GET-запросов.
+
+    Ключ страницы включает версию её группы, поэтому сброс версии
+    при изменении данных сразу отключает все старые записи;
+    таймаут только освобождает место.
+    """
+
+    def get_page_cache_version_key(self):
+        raise NotImplementedError
+
+    def dispatch(self, request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(request, self.get_page_cache_version_key())
+        cached = cached_page(key)
+        if cached is not None:
+            return cached
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda rendered: store_page(key, rendered)
+            )
+        return response
@@ -0,0 +1,112 @@
+import csv
+import zlib
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, News
+
+# Поля выгрузки: первое — pk, остальные совпадают с полями
+# записей loaddata, которые понимает import_news.
+FIELDS = {
+    'news': (News, ('id', 'title', 'text', 'date')),
+    'comment': (
+        Comment,
+        ('id', 'news', 'author', 'text', 'created', 'status'),
+    ),
+}
+FORMATS = ('ndjson', 'csv')
+BUFFER_SIZE = 64 * 1024
+
+
+def iter_rows(model_name, chunk_size=None):
+    """Строки таблицы кортежами, порциями по chunk_size через курсор."""
+    model, fields = FIELDS[model_name]
+    return model.objects.order_by('pk').values_list(*fields).iterator(
+        chunk_size=chunk_size or settings.NEWS_EXPORT_CHUNK_SIZE
+    )
+
+
+def ndjson_lines(model_names, chunk_size=None):
+    """
+    Записи в формате loaddata, по одной на строку.
+
+    Такой файл загружается обратно командой import_news.
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for model_name in model_names:
+        model, (_, *fields) = FIELDS[model_name]
+        label = model._meta.label_lower
+        for pk, *values in iter_rows(model_name, chunk_size):
+            yield encoder.encode({
+                'model': label, 'pk': pk, 'fields': dict(zip(fields, values)),
+            }) + '\n'
+
+
+class _Echo:
+    """Файл для csv.writer, который просто возвращает записанное."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(model_name, chunk_size=None):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(FIELDS[model_name][1])
+    for row in iter_rows(model_name, chunk_size):
+        yield writer.writerow(row)
+
+
+def encode_chunks(lines, compress=False):
+    """
+    Строки, склеенные в блоки байтов около BUFFER_SIZE.
+
+    С compress=True блоки сжимаются gzip на лету: в памяти только
+    текущий блок и состояние компрессора.
+    """
+    compressor = (
+        zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        if compress else None
+    )
+    buffer = []
+    size = 0
+    for line in lines:
+        data = line.encode()
+        buffer.append(data)
+        size += len(data)
+        if size >= BUFFER_SIZE:
+            chunk = b''.join(buffer)
+            buffer = []
+            size = 0
+            if compressor is not None:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+    chunk = b''.join(buffer)
+    if compressor is not None:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def export_chunks(model_name, data_format, compress=False, chunk_size=None):
+    """
+    Выгрузка одной таблицы или обеих (model_name='all', только NDJSON).
+
+    Комментарии идут после новостей, на которые ссылаются.
+    """
+    if data_format not in FORMATS:
+        raise ValueError(f'Неизвестный формат: {data_format}')
+    if model_name == 'all':
+        if data_format != 'ndjson':
+            raise ValueError('Обе таблицы выгружаются только в NDJSON.')
+        model_names = tuple(FIELDS)
+    elif model_name in FIELDS:
+        model_names = (model_name,)
+    else:
+        raise ValueError(f'Неизвестная таблица: {model_name}')
+    if data_format == 'ndjson':
+        lines = ndjson_lines(model_names, chunk_size)
+    else:
+        lines = csv_lines(model_name, chunk_size)
+    return encode_chunks(lines, compress)
@@ -0,0 +1,41 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news.export import FORMATS, export_chunks
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает новости и комментарии в NDJSON (формат import_news) '
+        'или CSV потоком, не собирая выгрузку в памяти.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output', help='Файл выгрузки; - для стандартного вывода.'
+        )
+        parser.add_argument(
+            '--model', choices=('all', 'news', 'comment'), default='all'
+        )
+        parser.add_argument('--format', choices=FORMATS, default='ndjson')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument('--chunk-size', type=int)
+
+    def handle(self, *args, **options):
+        try:
+            chunks = export_chunks(
+                options['model'], options['format'],
+                compress=options['gzip'], chunk_size=options['chunk_size'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        if options['output'] == '-':
+            self.write(chunks, sys.stdout.buffer)
+        else:
+            with open(options['output'], 'wb') as output:
+                self.write(chunks, output)
+
+    def write(self, chunks, output):
+        for chunk in chunks:
+            output.write(chunk)
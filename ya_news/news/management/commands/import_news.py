@@ -0,0 +1,254 @@
+import json
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from news.cache import page_cache
+from news.models import Comment, News
+from news.search import get_backend
+
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_json_array(stream):
+    """
+    Объекты JSON-массива по одному, без чтения файла целиком.
+
+    В памяти держится только текущий кусок файла и объект,
+    который ещё не дочитан до конца.
+    """
+    decoder = json.JSONDecoder()
+    buffer = read_array_start(stream)
+    position = 0
+    eof = False
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position < len(buffer):
+            if buffer[position] == ']':
+                return
+            try:
+                record, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                pass
+            else:
+                yield record
+                continue
+        if eof:
+            raise CommandError('Файл обрывается посреди записи.')
+        chunk = stream.read(CHUNK_SIZE)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def read_array_start(stream):
+    """Пропускает всё до открывающей скобки массива."""
+    head = ''
+    while not head.strip():
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        head += chunk
+    head = head.lstrip()
+    if not head.startswith('['):
+        raise CommandError('Файл не содержит JSON-массив.')
+    return head[1:]
+
+
+def iter_ndjson(stream):
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+class BatchInserter:
+    """
+    Вставка пачки строк одним executemany.
+
+    bulk_create в Django 3.2 тратит большую часть времени на компиляцию
+    INSERT и подготовку каждого значения; здесь SQL собирается один раз
+    на набор колонок, а значения приходят уже подготовленными.
+    """
+
+    def __init__(self, model, columns):
+        self.model = model
+        self.columns = columns
+        self.rows = {}
+
+    def add(self, pk, values):
+        with_pk = pk is not None
+        row = (pk, *values) if with_pk else tuple(values)
+        self.rows.setdefault(with_pk, []).append(row)
+
+    def flush(self, cursor):
+        quote = connection.ops.quote_name
+        for with_pk, rows in self.rows.items():
+            columns = (('id',) if with_pk else ()) + self.columns
+            cursor.executemany(
+                'INSERT INTO {} ({}) VALUES ({})'.format(
+                    quote(self.model._meta.db_table),
+                    ', '.join(map(quote, columns)),
+                    ', '.join(['%s'] * len(columns)),
+                ),
+                rows,
+            )
+        self.rows = {}
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает новости и комментарии из JSON (формат loaddata) '
+        'или NDJSON пачками в транзакциях. Прерванную загрузку можно '
+        'продолжить с последней сохранённой пачки ключом --resume.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=Path)
+        parser.add_argument(
+            '--format', choices=('auto', 'json', 'ndjson'), default='auto'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Пропустить записи, загруженные прошлым запуском.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        batch_size = options['batch_size']
+        state_path = path.with_name(path.name + '.import-state')
+        skip = 0
+        if options['resume'] and state_path.exists():
+            skip = json.loads(state_path.read_text())['records']
+        self.news = BatchInserter(
+            News, ('title', 'text', 'date', 'comment_count', 'updated')
+        )
+        self.comments = BatchInserter(
+            Comment,
+            ('news_id', 'author_id', 'text', 'created', 'version', 'status')
+        )
+        # Новости, получившие комментарии в текущей пачке.
+        self.commented = set()
+        self.ops = connection.ops
+        self.dates = {}
+        self.today = self.ops.adapt_datefield_value(date.today())
+        self.now = self.ops.adapt_datetimefield_value(timezone.now())
+        done = skip
+        pending = 0
+        started = time.monotonic()
+        with open(path, encoding='utf-8') as stream:
+            for index, record in enumerate(self.read(stream, path, options)):
+                if index < skip:
+                    continue
+                self.add(record)
+                pending += 1
+                if pending >= batch_size:
+                    self.flush()
+                    done += pending
+                    pending = 0
+                    state_path.write_text(json.dumps({'records': done}))
+            self.flush()
+            done += pending
+        elapsed = time.monotonic() - started
+        imported = done - skip
+        # Вставка идёт мимо моделей: сверяем счётчики, индекс и кэш вручную.
+        self.reset_sequences()
+        News.objects.recount_comments()
+        with transaction.atomic():
+            get_backend().rebuild()
+        page_cache().clear()
+        if state_path.exists():
+            state_path.unlink()
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено записей: {imported} за {elapsed:.2f} с '
+            f'({imported / elapsed if elapsed else 0:,.0f} записей/с)'
+        ))
+
+    def read(self, stream, path, options):
+        data_format = options['format']
+        if data_format == 'auto':
+            data_format = (
+                'ndjson' if path.suffix in ('.ndjson', '.jsonl') else 'json'
+            )
+        if data_format == 'ndjson':
+            return iter_ndjson(stream)
+        return iter_json_array(stream)
+
+    def add(self, record):
+        fields = record.get('fields', {})
+        model = record.get('model')
+        try:
+            if model == 'news.news':
+                self.news.add(record.get('pk'), (
+                    fields['title'],
+                    fields['text'],
+                    self.parse_date(fields.get('date')),
+                    0,
+                    self.now,
+                ))
+            elif model == 'news.comment':
+                self.commented.add(fields['news'])
+                self.comments.add(record.get('pk'), (
+                    fields['news'],
+                    fields['author'],
+                    fields['text'],
+                    self.parse_datetime(fields.get('created')),
+                    1,
+                    fields.get('status', Comment.Status.APPROVED),
+                ))
+            else:
+                raise CommandError(f'Неизвестная модель в записи: {model!r}')
+        except (KeyError, ValueError) as error:
+            raise CommandError(f'Неверная запись {record!r}: {error}')
+
+    def parse_date(self, value):
+        if not value:
+            return self.today
+        # Дат у новостей немного, а разбор каждой заметен на 100k строк.
+        if value not in self.dates:
+            self.dates[value] = self.ops.adapt_datefield_value(
+                date.fromisoformat(value)
+            )
+        return self.dates[value]
+
+    def parse_datetime(self, value):
+        if not value:
+            return self.now
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return self.ops.adapt_datetimefield_value(value)
+
+    def reset_sequences(self):
+        """
+        Сдвигает последовательности id за загруженные строки, как loaddata.
+
+        Строки с явным id последовательность PostgreSQL не продвигают,
+        и следующий create() упал бы на уже занятом ключе.
+        """
+        statements = self.ops.sequence_reset_sql(no_style(), [News, Comment])
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def flush(self):
+        # Новости вставляются раньше комментариев, которые на них ссылаются.
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                self.news.flush(cursor)
+                self.comments.flush(cursor)
+            # Комментарии вставлены мимо сигнала comment_saved: время
+            # изменения их новостей обновляется здесь, иначе страницы
+            # отвечали бы 304 со старым списком. В той же транзакции,
+            # чтобы --resume не пропустил уже загруженные пачки.
+            if self.commented:
+                News.objects.filter(pk__in=self.commented).touch()
+            self.commented = set()
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from news.models import Comment
+from news.moderation import moderate_comment
+
+
+class Command(BaseCommand):
+    help = (
+        'Проверяет комментарии, оставшиеся на модерации, например '
+        'после перезапуска процесса с непустой очередью.'
+    )
+
+    def handle(self, *args, **options):
+        pending = Comment.objects.filter(
+            status=Comment.Status.PENDING
+        ).values_list('pk', flat=True)
+        count = 0
+        for comment_id in pending.iterator():
+            moderate_comment(comment_id)
+            count += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Проверено комментариев: {count}')
+        )
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.15 on 2026-10-18 17:50
+
+from django.db import migrations, models
+
+
+def approve_existing(apps, schema_editor):
+    """Комментарии, написанные до модерации, уже видны читателям."""
+    Comment = apps.get_model('news', 'Comment')
+    Comment.objects.update(status='approved')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_badword'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='comment_news_created_idx',
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='status',
+            field=models.CharField(choices=[('pending', 'На модерации'), ('approved', 'Одобрен'), ('rejected', 'Отклонён')], default='pending', max_length=10),
+        ),
+        migrations.RunPython(approve_existing, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['news', 'status', 'created', 'id'], name='comment_news_status_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import OperationalError, migrations
+
+
+def create_fts_tables(apps, schema_editor):
+    """Таблицы FTS5 нужны, только если SQLite собран с этим модулем."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE news_news_fts USING fts5('
+            'title, text, day UNINDEXED, '
+            'tokenize = "unicode61 remove_diacritics 2", '
+            "prefix = '3 4 5')"
+        )
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE news_comment_fts USING fts5('
+            'news_id UNINDEXED, text, '
+            'tokenize = "unicode61 remove_diacritics 2", '
+            "prefix = '3 4 5')"
+        )
+    except OperationalError:
+        return
+    schema_editor.execute(
+        'INSERT INTO news_news_fts (rowid, title, text, day) '
+        'SELECT id, title, text, julianday(date) FROM news_news'
+    )
+    schema_editor.execute(
+        'INSERT INTO news_comment_fts (rowid, news_id, text) '
+        "SELECT id, news_id, text FROM news_comment WHERE status = 'approved'"
+    )
+
+
+def drop_fts_tables(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS news_news_fts')
+        schema_editor.execute('DROP TABLE IF EXISTS news_comment_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_comment_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_tables, drop_fts_tables),
+    ]
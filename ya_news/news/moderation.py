@@ -0,0 +1,206 @@
+import logging
+import queue
+import re
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+
+from .cache import invalidate_feed
+from .forms import bad_words
+from .models import Comment, News
+
+logger = logging.getLogger(__name__)
+
+# Латинские буквы и цифры, которыми подменяют похожие русские.
+LOOKALIKES = str.maketrans(
+    'aeopcyxkmtbhu30346',
+    'аеорсухкмтвнизозчб',
+)
+SEPARATORS = re.compile(r'[\W_]+')
+
+
+class WorkerPool:
+    """
+    Пул потоков с ограниченной локальной очередью.
+
+    Если очередь заполнена, задача выполняется в вызывающем потоке:
+    запрос замедляется, но задача не теряется. Упавшая задача
+    повторяется до retries раз с удваивающейся паузой.
+    """
+
+    def __init__(self, handler, workers, maxsize, retries, retry_delay):
+        self.handler = handler
+        self.workers = workers
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._queue = queue.Queue(maxsize)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self.processed = 0
+        self.failed = 0
+        self.retried = 0
+        self.inline = 0
+
+    def submit(self, item):
+        self._ensure_started()
+        enqueued = time.monotonic()
+        try:
+            self._queue.put_nowait((item, enqueued))
+        except queue.Full:
+            with self._lock:
+                self.inline += 1
+            self._process(item, enqueued)
+
+    def join(self):
+        """Ждёт, пока очередь опустеет; нужно тестам и остановке."""
+        self._queue.join()
+
+    def metrics(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            metrics = {
+                'queue_depth': self._queue.qsize(),
+                'workers': sum(
+                    thread.is_alive() for thread in self._threads
+                ),
+                'processed': self.processed,
+                'failed': self.failed,
+                'retried': self.retried,
+                'inline': self.inline,
+            }
+        if latencies:
+            metrics.update(
+                latency_avg=sum(latencies) / len(latencies),
+                latency_p95=latencies[int(len(latencies) * 0.95)],
+                latency_max=latencies[-1],
+            )
+        return metrics
+
+    def _ensure_started(self):
+        with self._lock:
+            self._threads = [
+                thread for thread in self._threads if thread.is_alive()
+            ]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._run,
+                    name=f'moderation-{len(self._threads)}',
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self):
+        while True:
+            item, enqueued = self._queue.get()
+            close_old_connections()
+            try:
+                self._process(item, enqueued)
+            finally:
+                close_old_connections()
+                self._queue.task_done()
+
+    def _process(self, item, enqueued):
+        for attempt in range(self.retries + 1):
+            try:
+                self.handler(item)
+            except Exception:
+                logger.exception('Ошибка обработки %r, попытка %s',
+                                 item, attempt + 1)
+                if attempt == self.retries:
+                    with self._lock:
+                        self.failed += 1
+                    return
+                with self._lock:
+                    self.retried += 1
+                time.sleep(self.retry_delay * 2 ** attempt)
+            else:
+                with self._lock:
+                    self.processed += 1
+                    self._latencies.append(time.monotonic() - enqueued)
+                return
+
+
+def normalize(text):
+    """
+    Снимает подмену букв латиницей и разделители между буквами.
+
+    Склеиваются только слова, написанные по одной букве
+    («р.е.д.и.с.к.а», «p e д»); обычные слова остаются разделены
+    пробелом, чтобы «среди скал» не превращалось в «средискал».
+    """
+    words = []
+    letters = []
+    for word in SEPARATORS.split(text.lower().translate(LOOKALIKES)):
+        if len(word) == 1:
+            letters.append(word)
+            continue
+        if letters:
+            words.append(''.join(letters))
+            letters = []
+        if word:
+            words.append(word)
+    if letters:
+        words.append(''.join(letters))
+    return ' '.join(words)
+
+
+def is_acceptable(text):
+    return bad_words.search(normalize(text)) is None
+
+
+def moderate_comment(comment_id):
+    """Одобряет или отклоняет комментарий, ожидающий модерации."""
+    with transaction.atomic():
+        comment = Comment.objects.select_for_update().filter(
+            pk=comment_id, status=Comment.Status.PENDING
+        ).first()
+        if comment is None:
+            return
+        approved = is_acceptable(comment.text)
+        comment.status = (
+            Comment.Status.APPROVED if approved else Comment.Status.REJECTED
+        )
+        comment.save(update_fields=('status', 'version'))
+        if approved:
+            News.objects.filter(pk=comment.news_id).update(
+                comment_count=F('comment_count') + 1
+            )
+            transaction.on_commit(invalidate_feed)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_moderation_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool(
+                moderate_comment,
+                workers=settings.MODERATION_WORKERS,
+                maxsize=settings.MODERATION_QUEUE_SIZE,
+                retries=settings.MODERATION_RETRIES,
+                retry_delay=settings.MODERATION_RETRY_DELAY,
+            )
+        return _pool
+
+
+def moderation_metrics():
+    """Показатели пула этого процесса; None, пока он не запущен."""
+    pool = _pool
+    return None if pool is None else pool.metrics()
+
+
+def submit_for_moderation(comment_id):
+    """Ставит комментарий в очередь; без воркеров проверяет сразу."""
+    if not settings.MODERATION_WORKERS:
+        moderate_comment(comment_id)
+        return
+    get_moderation_pool().submit(comment_id)
@@ -0,0 +1,123 @@
+import os
+import re
+import threading
+import time
+
+from django.conf import settings
+
+
+def build_pattern(words):
+    """
+    Собирает слова в одно регулярное выражение в форме префиксного дерева.
+
+    На каждом уровне дерева альтернативы различаются первой буквой,
+    поэтому в каждой позиции текста проверяется одна ветка, а не все
+    слова списка. Весь текст просматривается за один проход.
+    """
+    trie = {}
+    for word in words:
+        word = word.strip().lower()
+        if not word:
+            continue
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        # Более длинные слова с той же основой уже ничего не добавят.
+        node.clear()
+        node[''] = None
+    if not trie:
+        return None
+    return re.compile(_trie_to_regex(trie))
+
+
+def _trie_to_regex(node):
+    if '' in node:
+        return ''
+    branches = [
+        re.escape(char) + _trie_to_regex(child)
+        for char, child in sorted(node.items())
+    ]
+    if len(branches) == 1:
+        return branches[0]
+    return '(?:{})'.format('|'.join(branches))
+
+
+def read_words_file(path):
+    """Слова из файла: по одному на строке, # начинает комментарий."""
+    with open(path, encoding='utf-8') as words_file:
+        for line in words_file:
+            word = line.split('#', 1)[0].strip()
+            if word:
+                yield word
+
+
+class BadWordsMatcher:
+    """
+    Поиск запрещённых слов одним скомпилированным выражением.
+
+    Слова собираются из переданного списка, файла BAD_WORDS_FILE
+    и таблицы BadWord. Выражение пересобирается без перезапуска:
+    после invalidate(), при изменении файла и не реже чем раз
+    в BAD_WORDS_RELOAD_INTERVAL секунд, чтобы увидеть правки
+    из других процессов.
+    """
+
+    def __init__(self, words=()):
+        self.words = tuple(words)
+        self._lock = threading.Lock()
+        self._pattern = None
+        self._loaded_at = None
+        self._file_mtime = None
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def search(self, text):
+        """Первое найденное слово или None."""
+        pattern = self._get_pattern()
+        if pattern is None:
+            return None
+        match = pattern.search(text.lower())
+        return match.group() if match else None
+
+    def find_all(self, text):
+        """Все вхождения запрещённых слов в тексте."""
+        pattern = self._get_pattern()
+        if pattern is None:
+            return []
+        return pattern.findall(text.lower())
+
+    def _get_pattern(self):
+        if self._is_stale():
+            with self._lock:
+                if self._is_stale():
+                    self._file_mtime = self._words_file_mtime()
+                    self._pattern = build_pattern(self._load_words())
+                    self._loaded_at = time.monotonic()
+        return self._pattern
+
+    def _is_stale(self):
+        if self._loaded_at is None:
+            return True
+        if (time.monotonic() - self._loaded_at
+                > settings.BAD_WORDS_RELOAD_INTERVAL):
+            return True
+        return self._words_file_mtime() != self._file_mtime
+
+    def _words_file_mtime(self):
+        path = settings.BAD_WORDS_FILE
+        if not path:
+            return None
+        try:
+            return os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _load_words(self):
+        from .models import BadWord
+
+        words = list(self.words)
+        if self._file_mtime is not None:
+            words.extend(read_words_file(settings.BAD_WORDS_FILE))
+        words.extend(BadWord.objects.values_list('word', flat=True))
+        return words
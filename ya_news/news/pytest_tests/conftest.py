@@ -1,9 +1,25 @@
 import pytest
 
+from news.forms import bad_words
 from news.models import News, Comment
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    bad_words.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def moderate_inline(settings):
+    settings.MODERATION_WORKERS = 0
 
 
 @pytest.fixture
@@ -32,6 +48,7 @@ def comment(news, author):
         news=news,
         author=author,
         text='Comment',
+        status=Comment.Status.APPROVED,
     )
     return comment
 
@@ -73,8 +90,103 @@ def comments(news, author):
         comment = Comment.objects.create(
             news=news,
             author=author,
-            text=f'Текст {index}'
+            text=f'Текст {index}',
+            status=Comment.Status.APPROVED,
         )
         comment.created = now + timedelta(days=index)
         comment.save()
     return comments
+
+
+def take_snapshot(queryset, *overridden):
+    """
+    Строки queryset как есть в базе, без первичного ключа и столбцов
+    overridden: их значения задаются при восстановлении.
+    """
+    model = queryset.model
+    fields = [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key and field.attname not in overridden
+    ]
+    sql, params = queryset.order_by('pk').values_list(
+        *(field.attname for field in fields)
+    ).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return model, [field.column for field in fields], rows
+
+
+def restore_snapshot(snapshot, **overridden):
+    """Вставляет строки снимка одним executemany, без моделей."""
+    model, columns, rows = snapshot
+    columns = [*overridden, *columns]
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(map(quote, columns)),
+        ', '.join(['%s'] * len(columns)),
+    )
+    values = tuple(overridden.values())
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [values + row for row in rows])
+
+
+@pytest.fixture(scope='session')
+def snapshot_builder(django_db_setup, django_db_blocker):
+    """
+    Большие наборы данных строятся через ORM один раз за сессию
+    (в каждом воркере xdist — в своей базе) и сразу откатываются.
+    Тесты получают их из снимка в своей транзакции, так что данные
+    видят только тесты, запросившие фикстуру.
+    """
+    @contextmanager
+    def build():
+        with django_db_blocker.unblock(), transaction.atomic():
+            yield
+            transaction.set_rollback(True)
+    return build
+
+
+@pytest.fixture(scope='session')
+def many_news_snapshot(snapshot_builder):
+    today = datetime.today()
+    with snapshot_builder():
+        News.objects.bulk_create(
+            News(
+                title=f'Новость {index}',
+                text='Просто текст.',
+                date=today - timedelta(days=index // 3)
+            ) for index in range(settings.NEWS_COUNT_ON_HOME_PAGE * 1000)
+        )
+        return take_snapshot(News.objects.all())
+
+
+@pytest.fixture(scope='session')
+def crowded_news_snapshot(snapshot_builder):
+    with snapshot_builder():
+        news = News.objects.create(title='Заголовок', text='Текст новости')
+        author = get_user_model().objects.create(username='Автор')
+        Comment.objects.bulk_create(
+            Comment(
+                news=news,
+                author=author,
+                text=f'Комментарий {index}',
+                status=Comment.Status.APPROVED,
+            ) for index in range(50_000)
+        )
+        return take_snapshot(Comment.objects.all(), 'news_id', 'author_id')
+
+
+@pytest.fixture
+def many_news(many_news_snapshot):
+    restore_snapshot(many_news_snapshot)
+
+
+@pytest.fixture
+def crowded_news(news, author, crowded_news_snapshot):
+    restore_snapshot(
+        crowded_news_snapshot, news_id=news.pk, author_id=author.pk
+    )
+    News.objects.filter(pk=news.pk).recount_comments()
+    return news
@@ -0,0 +1,73 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.test import AsyncClient
+from django.urls import resolve, reverse
+
+from news.models import Comment
+
+# Запросы к базе идут из потоков пула со своими соединениями,
+# поэтому данные теста должны быть закоммичены.
+pytestmark = [
+    pytest.mark.urls('yanews.urls_async'),
+    pytest.mark.django_db(transaction=True),
+]
+
+
+def get(client, url, **extra):
+    """GET через ASGI-обработчик с асинхронными middleware."""
+    async def request():
+        return await client.get(url, **extra)
+    return async_to_sync(request)()
+
+
+@pytest.mark.parametrize('name', ('news:home', 'news:detail'))
+def test_read_views_are_async(name):
+    '''Тест подключения асинхронных страниц в адресах ASGI.'''
+    url = reverse(name, args=(1,) if name == 'news:detail' else ())
+    assert asyncio.iscoroutinefunction(resolve(url).func)
+
+
+def test_async_home(list_news):
+    '''Тест главной: первая страница новостей и кэш для анонимов.'''
+    client = AsyncClient()
+    response = get(client, reverse('news:home'))
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.context['object_list']) == (
+        settings.NEWS_COUNT_ON_HOME_PAGE
+    )
+    assert get(client, reverse('news:home')).content == response.content
+
+
+def test_async_detail(author, news, comment):
+    '''Тест новости: комментарии для всех, форма только для автора.'''
+    url = reverse('news:detail', args=(news.id,))
+    anonymous = get(AsyncClient(), url)
+    assert comment.text in anonymous.content.decode()
+    assert 'form' not in anonymous.context
+    client = AsyncClient()
+    client.force_login(author)
+    assert 'form' in get(client, url).context
+    missing = get(client, reverse('news:detail', args=(news.id + 1,)))
+    assert missing.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_async_detail_not_modified(news):
+    '''Тест ответа 304 асинхронной страницы новости.'''
+    url = reverse('news:detail', args=(news.id,))
+    client = AsyncClient()
+    etag = get(client, url)['ETag']
+    # AsyncClient в Django 3.2 передаёт именованные аргументы заголовками.
+    response = get(client, url, **{'if-none-match': etag})
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_async_detail_accepts_comment(author_client, news):
+    '''Тест отправки комментария на адрес асинхронной страницы.'''
+    url = reverse('news:detail', args=(news.id,))
+    response = author_client.post(url, {'text': 'Новый'})
+    assert response.status_code == HTTPStatus.FOUND
+    assert Comment.objects.get().text == 'Новый'
@@ -0,0 +1,35 @@
+import pytest
+
+from yacommon.bench import MIN_REQUESTS, compare, summarize
+
+
+def results(rps=100, p95_ms=10, queries=3, requests=MIN_REQUESTS):
+    return {'routes': {'GET news:home': {
+        'requests': requests, 'rps': rps, 'p95_ms': p95_ms,
+        'queries': queries,
+    }}}
+
+
+def test_summarize_counts_failures():
+    '''Тест сводки маршрута: перцентили, ошибки и запросы к базе.'''
+    samples = [('GET x', index / 1000, 2, 200) for index in range(1, 101)]
+    samples += [('GET x', 0.5, 1, 404), ('GET x', 0.5, 0, 'OperationalError')]
+    summary = summarize(samples, elapsed=2)
+    assert summary['requests'] == 102
+    assert summary['errors'] == 2
+    assert summary['failures'] == {'404': 1, 'OperationalError': 1}
+    assert summary['rps'] == 50
+    assert summary['p50_ms'] == 52
+    assert summary['p99_ms'] == 500
+
+
+@pytest.mark.parametrize('current, regressions', (
+    (results(rps=85, p95_ms=11.5, queries=3.5), 0),
+    (results(rps=70), 1),
+    (results(p95_ms=13), 1),
+    (results(queries=4), 1),
+    (results(rps=10, requests=MIN_REQUESTS - 1), 0),
+))
+def test_compare_with_threshold(current, regressions):
+    '''Тест сравнения с прошлым запуском по порогу в процентах.'''
+    assert len(compare(results(), current, threshold=20)) == regressions
@@ -0,0 +1,79 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import Client
+from django.urls import reverse
+
+from news.models import Comment
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def detail_url(news):
+    return reverse('news:detail', args=(news.id,))
+
+
+def test_repeat_visit_is_not_modified(detail_url, django_assert_num_queries):
+    '''Тест ответа 304 по ETag и Last-Modified для анонима.'''
+    client = Client()
+    response = client.get(detail_url)
+    assert response.has_header('Last-Modified')
+    assert 'no-cache' in response['Cache-Control']
+    # Только чтение времени изменения, без новости и комментариев.
+    with django_assert_num_queries(1):
+        repeat = client.get(
+            detail_url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+    assert repeat.status_code == HTTPStatus.NOT_MODIFIED
+    assert repeat['ETag'] == response['ETag']
+    repeat = client.get(
+        detail_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    )
+    assert repeat.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_user_gets_own_etag(author_client, detail_url):
+    '''Тест: страница вошедшего пользователя не совпадает с анонимной.'''
+    anonymous = Client().get(detail_url)
+    response = author_client.get(detail_url)
+    assert response['ETag'] != anonymous['ETag']
+    assert not response.has_header('Last-Modified')
+    assert 'private' in response['Cache-Control']
+    repeat = author_client.get(
+        detail_url, HTTP_IF_NONE_MATCH=anonymous['ETag']
+    )
+    assert repeat.status_code == HTTPStatus.OK
+
+
+@pytest.mark.parametrize(
+    'change',
+    (
+        lambda comment: Comment.objects.create(
+            news=comment.news, author=comment.author, text='Новый',
+            status=Comment.Status.APPROVED,
+        ),
+        lambda comment: setattr(comment, 'text', 'Правка') or comment.save(),
+        lambda comment: comment.delete(),
+        lambda comment: comment.news.save(),
+    ),
+    ids=('comment-added', 'comment-edited', 'comment-deleted', 'news-saved'),
+)
+def test_changes_invalidate_etag(comment, detail_url, change):
+    '''Тест: изменения новости и её комментариев меняют ETag.'''
+    client = Client()
+    etag = client.get(detail_url)['ETag']
+    change(comment)
+    response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+def test_pending_comment_keeps_etag(comment, detail_url):
+    '''Тест: комментарий на модерации страницу не меняет.'''
+    client = Client()
+    etag = client.get(detail_url)['ETag']
+    Comment.objects.create(news=comment.news, author=comment.author,
+                           text='Ждёт')
+    response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
@@ -1,8 +1,15 @@
+import tracemalloc
+from http import HTTPStatus
+
 import pytest
 
+from django.db import connection
 from django.urls import reverse
 from django.conf import settings
 
+from news.models import Comment, News
+from yacommon.pagination import KeysetPaginator
+
 
 @pytest.mark.django_db
 @pytest.mark.parametrize(
@@ -29,6 +36,9 @@ def test_news_count(client, name, list):
          ),
     ),
 )
+# Три запроса страницы и два на comment_set в самом тесте: лишний
+# запрос на автора каждого комментария сразу выйдет за бюджет.
+@pytest.mark.query_budget(5)
 def test_comments_order(client, name, args, list_comments):
     '''Тест упорядочивания комментариев.'''
     url = reverse(name, args=args)
@@ -47,6 +57,7 @@ def test_comments_order(client, name, args, list_comments):
          pytest.lazy_fixture('form_data')),
     ),
 )
+@pytest.mark.query_budget(3)
 def test_anonymous_client_has_no_form(client, name, args, form):
     '''Тест отстутсвия формы аноноимного пользователя.'''
     url = reverse(name, args=args)
@@ -63,6 +74,7 @@ def test_anonymous_client_has_no_form(client, name, args, form):
          pytest.lazy_fixture('author_client')),
     ),
 )
+@pytest.mark.query_budget(5)
 def test_authorized_client_has_form(client,
                                     name,
                                     args,
@@ -72,3 +84,192 @@ def test_authorized_client_has_form(client,
     url = reverse(name, args=args)
     response = client.get(url)
     assert 'form' in response.context
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('list_news')
+def test_feed_pages_by_cursor(client):
+    '''Тест перехода по страницам ленты курсорами.'''
+    url = reverse('news:home')
+    first_page = client.get(url).context['page']
+    assert first_page.previous_cursor is None
+    second_page = client.get(
+        url, {'cursor': first_page.next_cursor}
+    ).context['page']
+    assert len(first_page) + len(second_page) == News.objects.count()
+    assert not set(first_page.object_list) & set(second_page.object_list)
+    assert first_page.object_list[-1].date >= second_page.object_list[0].date
+    assert second_page.next_cursor is None
+    back_page = client.get(
+        url, {'cursor': second_page.previous_cursor}
+    ).context['page']
+    assert back_page.object_list == first_page.object_list
+
+
+@pytest.mark.django_db
+def test_feed_invalid_cursor(client):
+    '''Тест ответа на испорченный курсор.'''
+    response = client.get(reverse('news:home'), {'cursor': 'не курсор'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def count_vm_steps(queryset):
+    '''Число шагов виртуальной машины SQLite на выполнение запроса.'''
+    steps = 0
+
+    def step():
+        nonlocal steps
+        steps += 1
+
+    connection.ensure_connection()
+    connection.connection.set_progress_handler(step, 1)
+    try:
+        list(queryset)
+    finally:
+        connection.connection.set_progress_handler(None, 1)
+    return steps
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('many_news')
+def test_deep_page_costs_same_as_first(client, django_assert_num_queries):
+    '''Тест: тысячная страница не дороже первой.'''
+    paginator = KeysetPaginator(
+        News.objects.all(), '-date', settings.NEWS_COUNT_ON_HOME_PAGE
+    )
+    ordered = News.objects.order_by('-date', '-pk')
+    deep_cursor = paginator.cursor_after(
+        ordered[settings.NEWS_COUNT_ON_HOME_PAGE * 999 - 1]
+    )
+    url = reverse('news:home')
+    with django_assert_num_queries(1):
+        client.get(url)
+    with django_assert_num_queries(1):
+        response = client.get(url, {'cursor': deep_cursor})
+    assert list(response.context['object_list']) == list(
+        ordered[settings.NEWS_COUNT_ON_HOME_PAGE * 999:][
+            :settings.NEWS_COUNT_ON_HOME_PAGE
+        ]
+    )
+    deep_queryset = paginator.page_queryset(deep_cursor)
+    assert 'news_date_id_idx' in deep_queryset.explain()
+    first_steps = count_vm_steps(paginator.page_queryset())
+    deep_steps = count_vm_steps(deep_queryset)
+    assert deep_steps < first_steps * 2
+
+
+@pytest.mark.django_db
+def test_feed_does_not_load_comments(client, crowded_news,
+                                     django_assert_num_queries):
+    '''Тест: лента считает комментарии, не загружая их.'''
+    url = reverse('news:home')
+    tracemalloc.start()
+    try:
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert response.context['object_list'][0].comment_count == 50_000
+    assert 'Комментариев: 50000' in response.content.decode()
+    assert peak < 2 * 1024 * 1024
+
+
+@pytest.mark.django_db
+def test_detail_renders_first_comment_page(client, crowded_news,
+                                           django_assert_num_queries):
+    '''Тест: страница новости не зависит от числа комментариев.'''
+    url = reverse('news:detail', args=(crowded_news.id,))
+    with django_assert_num_queries(3):
+        response = client.get(url)
+    page = response.context['page']
+    assert len(page) == settings.COMMENTS_COUNT_ON_PAGE
+    assert len(response.content) < 16 * 1024
+    fragment = client.get(
+        reverse('news:comments', args=(crowded_news.id,)),
+        {'cursor': page.next_cursor}
+    )
+    next_page = fragment.context['page']
+    assert len(next_page) == settings.COMMENTS_COUNT_ON_PAGE
+    assert page.object_list[-1].pk < next_page.object_list[0].pk
+    assert 'Показать ещё комментарии' in fragment.content.decode()
+
+
+@pytest.mark.django_db
+def test_anonymous_pages_are_cached(client, news, django_assert_num_queries):
+    '''Тест кэширования страниц для анонимного пользователя.'''
+    # Страница новости читает время изменения для ответа 304.
+    for url, queries in ((reverse('news:home'), 0),
+                         (reverse('news:detail', args=(news.id,)), 1)):
+        first = client.get(url)
+        with django_assert_num_queries(queries):
+            second = client.get(url)
+        assert second.content == first.content
+
+
+def test_authorized_pages_are_not_cached(author_client, news):
+    '''Тест: авторизованный пользователь получает свежую страницу.'''
+    url = reverse('news:detail', args=(news.id,))
+    author_client.get(url)
+    response = author_client.get(url)
+    assert 'form' in response.context
+
+
+def test_page_cache_invalidation(
+        client, author, news, django_capture_on_commit_callbacks
+):
+    '''Тест сброса кэша при изменении новости и комментариев.'''
+    detail_url = reverse('news:detail', args=(news.id,))
+    home_url = reverse('news:home')
+    client.get(detail_url)
+    client.get(home_url)
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.create(
+            news=news,
+            author=author,
+            text='Свежий',
+            status=Comment.Status.APPROVED,
+        )
+    assert 'Свежий' in client.get(detail_url).content.decode()
+    with django_capture_on_commit_callbacks(execute=True):
+        news.title = 'Новый заголовок'
+        news.save()
+    assert 'Новый заголовок' in client.get(home_url).content.decode()
+
+
+def test_page_cache_is_invalidated_after_commit(
+        client, news, django_capture_on_commit_callbacks
+):
+    '''Тест сброса кэша только после коммита транзакции записи.'''
+    home_url = reverse('news:home')
+    client.get(home_url)
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        news.title = 'Новый заголовок'
+        news.save()
+        # До коммита читатели получают прежнюю страницу из кэша.
+        assert 'Новый заголовок' not in client.get(home_url).content.decode()
+    for callback in callbacks:
+        callback()
+    assert 'Новый заголовок' in client.get(home_url).content.decode()
+
+
+def test_comment_fragments_are_cached(author_client, admin_client,
+                                      comment, news):
+    '''Тест кэширования HTML комментариев и его сброса после правки.'''
+    url = reverse('news:detail', args=(news.id,))
+    fragment = 'news/includes/comment.html'
+    response = author_client.get(url)
+    assert fragment in [template.name for template in response.templates]
+    response = admin_client.get(url)
+    assert fragment not in [template.name for template in response.templates]
+    assert reverse('news:edit', args=(comment.id,)) not in (
+        response.content.decode()
+    )
+    author_client.post(
+        reverse('news:edit', args=(comment.id,)), data={'text': 'Правка'}
+    )
+    response = author_client.get(url)
+    assert 'Правка' in response.content.decode()
+    assert reverse('news:edit', args=(comment.id,)) in (
+        response.content.decode()
+    )
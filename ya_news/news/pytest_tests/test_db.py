@@ -0,0 +1,167 @@
+import threading
+
+import psycopg2
+import pytest
+from django.db import connection
+
+from yacommon.backends.postgresql import base as postgres
+from yacommon.db import (
+    SQLITE_PRAGMAS, database_config, parse_database_url, replica_aliases
+)
+
+
+class FakeConnection:
+    """Соединение psycopg2: SELECT 1 проходит, только если alive."""
+
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.closed = 0
+        self.autocommit = True
+        self.isolation_level = None
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, sql):
+        if not self.alive:
+            raise psycopg2.OperationalError('server closed the connection')
+
+    def rollback(self):
+        pass
+
+
+class FakePool:
+    """ThreadedConnectionPool: выдаёт заранее заданные соединения."""
+
+    connections = []
+
+    def __init__(self, min_size, max_size, **conn_params):
+        self.returned = []
+
+    def getconn(self):
+        return self.connections.pop(0)
+
+    def putconn(self, connection, close=False):
+        self.returned.append((connection, close))
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    monkeypatch.setattr(postgres.pool, 'ThreadedConnectionPool', FakePool)
+    monkeypatch.setattr(FakePool, 'connections', [])
+    return FakePool.connections
+
+
+def pooled_wrapper(health_checks):
+    return postgres.DatabaseWrapper({
+        'NAME': 'news', 'OPTIONS': {}, 'HEALTH_CHECKS': health_checks,
+        'POOL': {'min_size': 1, 'max_size': 2, 'timeout': 0.1},
+    }, alias=f'pool-{health_checks}')
+
+
+def test_default_is_tuned_sqlite(tmp_path):
+    '''Тест настроек по умолчанию: SQLite с прагмами.'''
+    config = database_config('TEST', tmp_path / 'db.sqlite3', environ={})
+    default = config['default']
+    assert default['ENGINE'] == 'yacommon.backends.sqlite3'
+    assert default['PRAGMAS'] == SQLITE_PRAGMAS
+    assert default['TRANSACTION_MODE'] == 'IMMEDIATE'
+    # По умолчанию у каждого воркера xdist своя тестовая база в памяти.
+    assert default['TEST'] == {'NAME': ':memory:'}
+
+
+def test_replica_urls(tmp_path):
+    '''Тест реплик из переменной окружения.'''
+    config = database_config('TEST', tmp_path / 'db.sqlite3', environ={
+        'TEST_REPLICA_URLS': 'sqlite:////tmp/r1.sqlite3, sqlite:////tmp/r2',
+    })
+    assert replica_aliases(config) == ['replica1', 'replica2']
+    assert config['replica2']['NAME'] == '/tmp/r2'
+    assert config['replica1']['TEST'] == {'MIRROR': 'default'}
+
+
+def test_parse_urls():
+    '''Тест разбора адресов SQLite и PostgreSQL.'''
+    plain = parse_database_url('sqlite:////tmp/db.sqlite3?pragmas=off')
+    assert (plain['NAME'], plain['PRAGMAS']) == ('/tmp/db.sqlite3', {})
+    postgres = parse_database_url(
+        'postgres://user:p%40ss@db:6432/news'
+        '?conn_max_age=60&health_checks=1&pool_max=10'
+    )
+    assert postgres['ENGINE'] == 'yacommon.backends.postgresql'
+    assert (postgres['USER'], postgres['PASSWORD']) == ('user', 'p@ss')
+    assert (postgres['HOST'], postgres['PORT'], postgres['NAME']) == (
+        'db', '6432', 'news'
+    )
+    assert postgres['HEALTH_CHECKS'] is True
+    assert postgres['POOL'] == {
+        'min_size': 1, 'max_size': 10, 'timeout': 30,
+    }
+    # Соединения держит пул, постоянные соединения потоков не нужны.
+    assert postgres['CONN_MAX_AGE'] == 0
+    with pytest.raises(ValueError):
+        parse_database_url('mysql://localhost/news')
+
+
+@pytest.mark.django_db
+def test_pragmas_applied():
+    '''Тест прагм, заданных соединению при подключении.'''
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA busy_timeout')
+        assert cursor.fetchone()[0] == SQLITE_PRAGMAS['busy_timeout']
+        cursor.execute('PRAGMA synchronous')
+        # 1 — NORMAL.
+        assert cursor.fetchone()[0] == 1
+
+
+def test_pool_waits_for_connection_and_times_out(fake_pool):
+    '''Тест пула: поток ждёт свободного соединения, а не падает сразу.'''
+    fake_pool.extend(FakeConnection() for _ in range(3))
+    connection_pool = postgres.BlockingConnectionPool(1, 2, timeout=5)
+    first = connection_pool.getconn()
+    connection_pool.getconn()
+    waiting = []
+    thread = threading.Thread(
+        target=lambda: waiting.append(connection_pool.getconn())
+    )
+    thread.start()
+    thread.join(0.1)
+    assert waiting == []
+    connection_pool.putconn(first)
+    thread.join(5)
+    assert len(waiting) == 1
+    connection_pool.timeout = 0.01
+    with pytest.raises(psycopg2.pool.PoolError, match='исчерпан'):
+        connection_pool.getconn()
+
+
+# django_db: pytest-django запрещает ensure_connection() без доступа к базе.
+@pytest.mark.django_db
+@pytest.mark.parametrize('health_checks, returned', ((True, 2), (False, 1)))
+def test_pool_checkout_skips_dead_connections(fake_pool, health_checks,
+                                              returned):
+    '''Тест выдачи из пула: закрытые и оборванные соединения отбрасываются.'''
+    closed = FakeConnection()
+    closed.closed = 1
+    dead, alive = FakeConnection(alive=False), FakeConnection()
+    fake_pool.extend((closed, dead, alive))
+    wrapper = pooled_wrapper(health_checks)
+    try:
+        connection_pool = wrapper.get_pool({})
+        checked_out = wrapper.checkout(connection_pool)
+        assert checked_out is (alive if health_checks else dead)
+        assert connection_pool._pool.returned[:returned] == [
+            (closed, True), (dead, True)
+        ][:returned]
+        # Закрытое соединение возвращается в пул, а не закрывается.
+        wrapper.connection = checked_out
+        wrapper._close()
+        assert connection_pool._pool.returned[-1] == (checked_out, False)
+    finally:
+        postgres._pools.pop(wrapper.alias, None)
@@ -0,0 +1,90 @@
+import csv
+import gzip
+import io
+import json
+import tracemalloc
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+
+from news.export import export_chunks
+from news.models import Comment, News
+
+
+def consume(chunks):
+    return b''.join(chunks)
+
+
+@pytest.mark.django_db
+def test_ndjson_export_imports_back(tmp_path, comment):
+    '''Тест: выгрузка NDJSON загружается обратно командой import_news.'''
+    path = tmp_path / 'dump.ndjson'
+    call_command('export_news', str(path))
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record['model'] for record in records] == [
+        'news.news', 'news.comment'
+    ]
+    news = News.objects.values('title', 'text', 'date').get()
+    News.objects.all().delete()
+    call_command('import_news', str(path), stdout=StringIO())
+    assert News.objects.values('title', 'text', 'date').get() == news
+    imported = Comment.objects.get()
+    assert (imported.text, imported.author_id, imported.status) == (
+        comment.text, comment.author_id, comment.status
+    )
+
+
+@pytest.mark.django_db
+def test_csv_and_gzip_export(comments):
+    '''Тест выгрузки в CSV и сжатия на лету.'''
+    plain = consume(export_chunks('comment', 'csv'))
+    rows = list(csv.reader(io.StringIO(plain.decode())))
+    assert rows[0] == ['id', 'news', 'author', 'text', 'created', 'status']
+    assert [row[3] for row in rows[1:]] == ['Текст 0', 'Текст 1']
+    compressed = consume(export_chunks('comment', 'csv', compress=True))
+    assert gzip.decompress(compressed) == plain
+
+
+@pytest.mark.django_db
+def test_export_unknown_options():
+    '''Тест отказа на неизвестные таблицу и формат.'''
+    for model_name, data_format in (('user', 'csv'), ('news', 'xml'),
+                                    ('all', 'csv')):
+        with pytest.raises(ValueError):
+            export_chunks(model_name, data_format)
+
+
+@pytest.mark.django_db
+def test_export_memory_is_flat(crowded_news):
+    '''Тест: память выгрузки не растёт с числом комментариев.'''
+    tracemalloc.start()
+    try:
+        size = sum(
+            len(chunk)
+            for chunk in export_chunks('comment', 'ndjson', compress=True)
+        )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert size > 0
+    assert peak < 2 * 1024 * 1024
+
+
+@pytest.mark.django_db
+def test_export_view_is_for_staff(author_client, admin_client, news):
+    '''Тест доступа к выгрузке и ответа потоком.'''
+    url = reverse('news:export')
+    assert Client().get(url).status_code == HTTPStatus.FOUND
+    assert author_client.get(url).status_code == HTTPStatus.FORBIDDEN
+    response = admin_client.get(url, {'model': 'news', 'gzip': '1'})
+    assert response.status_code == HTTPStatus.OK
+    assert response.streaming
+    assert response['Content-Type'] == 'application/gzip'
+    lines = gzip.decompress(consume(response.streaming_content)).splitlines()
+    assert json.loads(lines[0])['fields']['title'] == news.title
+    response = admin_client.get(url, {'format': 'csv'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,112 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.utils import timezone
+
+from news.management.commands.import_news import iter_json_array
+from news.models import Comment, News
+
+
+def make_records(author):
+    records = [
+        {'model': 'news.news', 'pk': index,
+         'fields': {'title': f'Новость {index}', 'text': 'Текст',
+                    'date': f'2022-10-{index:02}'}}
+        for index in range(1, 6)
+    ]
+    records.extend(
+        {'model': 'news.comment',
+         'fields': {'news': 1, 'author': author.id, 'text': f'Коммент {index}',
+                    'created': f'2022-10-0{index}T10:00:00Z'}}
+        for index in range(1, 4)
+    )
+    return records
+
+
+@pytest.mark.parametrize('suffix', ('.json', '.ndjson'))
+def test_import_news(tmp_path, author, suffix):
+    '''Тест загрузки новостей и комментариев.'''
+    records = make_records(author)
+    path = tmp_path / f'news{suffix}'
+    if suffix == '.json':
+        path.write_text(json.dumps(records, ensure_ascii=False, indent=1))
+    else:
+        path.write_text('\n'.join(
+            json.dumps(record, ensure_ascii=False) for record in records
+        ))
+    out = StringIO()
+    call_command('import_news', str(path), '--batch-size', '3', stdout=out)
+    assert 'Загружено записей: 8' in out.getvalue()
+    assert News.objects.count() == 5
+    assert News.objects.get(pk=1).comment_count == 3
+    first = Comment.objects.first()
+    assert first.status == Comment.Status.APPROVED
+    assert first.created.isoformat() == '2022-10-01T10:00:00+00:00'
+    assert not (tmp_path / f'news{suffix}.import-state').exists()
+
+
+def test_import_news_resume(tmp_path, author):
+    '''Тест продолжения прерванной загрузки.'''
+    records = make_records(author)
+    path = tmp_path / 'news.ndjson'
+    path.write_text('\n'.join(json.dumps(record) for record in records))
+    News.objects.create(pk=1, title='Новость 1', text='Текст')
+    News.objects.create(pk=2, title='Новость 2', text='Текст')
+    (tmp_path / 'news.ndjson.import-state').write_text('{"records": 2}')
+    call_command('import_news', str(path), '--resume', stdout=StringIO())
+    assert News.objects.count() == 5
+    assert Comment.objects.count() == 3
+
+
+def test_import_news_resets_sequences(tmp_path, author, monkeypatch):
+    '''Тест сдвига последовательностей id после загрузки с явными id.'''
+    reset_models = []
+
+    def sequence_reset_sql(style, model_list):
+        reset_models.extend(model_list)
+        return ['SELECT 1']
+
+    monkeypatch.setattr(
+        connection.ops, 'sequence_reset_sql', sequence_reset_sql
+    )
+    path = tmp_path / 'news.ndjson'
+    path.write_text('\n'.join(
+        json.dumps(record) for record in make_records(author)
+    ))
+    call_command('import_news', str(path), stdout=StringIO())
+    assert reset_models == [News, Comment]
+    assert News.objects.create(title='После', text='Текст').pk == 6
+
+
+def test_import_comments_touch_existing_news(tmp_path, author, news):
+    '''Тест: комментарии к старой новости меняют время её изменения.'''
+    old = timezone.now() - timedelta(days=1)
+    News.objects.filter(pk=news.pk).update(updated=old)
+    other = News.objects.create(title='Без комментариев', text='Текст')
+    News.objects.filter(pk=other.pk).update(updated=old)
+    path = tmp_path / 'comments.ndjson'
+    path.write_text(json.dumps(
+        {'model': 'news.comment',
+         'fields': {'news': news.pk, 'author': author.id, 'text': 'Новый'}}
+    ))
+    call_command('import_news', str(path), stdout=StringIO())
+    assert News.objects.get(pk=news.pk).updated > old
+    assert News.objects.get(pk=other.pk).updated == old
+
+
+def test_iter_json_array_reads_in_chunks(monkeypatch):
+    '''Тест разбора массива, записи которого пересекают границы кусков.'''
+    monkeypatch.setattr(
+        'news.management.commands.import_news.CHUNK_SIZE', 7
+    )
+    records = [{'text': 'ё' * index, 'list': [1, {'a': ']'}]}
+               for index in range(20)]
+    stream = StringIO(' \n' + json.dumps(records, ensure_ascii=False))
+    assert list(iter_json_array(stream)) == records
+    with pytest.raises(CommandError):
+        list(iter_json_array(StringIO('[{"a": 1}, {"b":')))
@@ -1,9 +1,13 @@
+import os
 from http import HTTPStatus
+from io import StringIO
+from django.core.management import call_command
 from django.urls import reverse
-from news.models import Comment
+from news.models import BadWord, Comment, News
+from news.profanity import build_pattern
 import pytest
 from pytest_django.asserts import assertRedirects, assertFormError
-from news.forms import BAD_WORDS, WARNING
+from news.forms import BAD_WORDS, WARNING, bad_words
 
 
 @pytest.mark.django_db
@@ -108,3 +112,86 @@ def test_user_cant_edit_comment_of_another_user(
     assert response.status_code == HTTPStatus.NOT_FOUND
     comment.refresh_from_db()
     assert comment.text == old_comment_text
+
+
+def test_comment_count_follows_create_and_delete(
+        author_client, form_data, news, django_capture_on_commit_callbacks
+):
+    '''Тест счётчика комментариев при создании и удалении.'''
+    url = reverse('news:detail', args=(news.id,))
+    with django_capture_on_commit_callbacks(execute=True):
+        author_client.post(url, data=form_data)
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    comment = Comment.objects.get()
+    author_client.post(reverse('news:delete', args=(comment.id,)))
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+def test_comment_count_follows_admin_inline(admin_client, author, news):
+    '''Тест счётчика комментариев при правке новости в админке.'''
+    url = reverse('admin:news_news_change', args=(news.id,))
+    response = admin_client.post(url, data={
+        'title': news.title,
+        'text': news.text,
+        'date': news.date.strftime('%d.%m.%Y'),
+        'comment_set-TOTAL_FORMS': 2,
+        'comment_set-INITIAL_FORMS': 0,
+        'comment_set-MIN_NUM_FORMS': 0,
+        'comment_set-MAX_NUM_FORMS': 1000,
+        'comment_set-0-author': author.id,
+        'comment_set-0-text': 'Из админки',
+        'comment_set-0-status': Comment.Status.APPROVED,
+        'comment_set-1-author': author.id,
+        'comment_set-1-text': 'Ещё один',
+        'comment_set-1-status': Comment.Status.APPROVED,
+    })
+    assert response.status_code == HTTPStatus.FOUND
+    news.refresh_from_db()
+    assert news.comment_count == 2
+
+
+@pytest.mark.usefixtures('comment')
+def test_recount_comments_repairs_drift(news):
+    '''Тест команды пересчёта счётчиков.'''
+    News.objects.filter(pk=news.pk).update(comment_count=99)
+    call_command('recount_comments', stdout=StringIO())
+    news.refresh_from_db()
+    assert news.comment_count == 1
+
+
+def test_bad_words_from_database_without_restart(author_client, news):
+    '''Тест: новое слово из базы действует сразу.'''
+    url = reverse('news:detail', args=(news.id,))
+    bad_words.search('')
+    BadWord.objects.create(word='Бяка')
+    response = author_client.post(url, data={'text': 'Ну ты и бяка!'})
+    assertFormError(response, form='form', field='text', errors=WARNING)
+    assert Comment.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_bad_words_file_is_reloaded(settings, tmp_path):
+    '''Тест перечитывания файла со словами после его изменения.'''
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('# модерация\nзлыдень\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = str(words_file)
+    assert bad_words.search('Какой злыдень!') == 'злыдень'
+    assert bad_words.search('Какой вредина!') is None
+    words_file.write_text('вредин\n', encoding='utf-8')
+    stat = words_file.stat()
+    os.utime(words_file, (stat.st_atime, stat.st_mtime + 10))
+    assert bad_words.search('Какой вредина!') == 'вредин'
+    assert bad_words.find_all(
+        f'{BAD_WORDS[0]} и {BAD_WORDS[1]}, опять {BAD_WORDS[0]}'
+    ) == [BAD_WORDS[0], BAD_WORDS[1], BAD_WORDS[0]]
+
+
+def test_build_pattern_matches_like_substring_search():
+    '''Тест совпадения результатов с поиском подстрок.'''
+    words = ('аб', 'абв', 'бв', 'в.г', 'где')
+    pattern = build_pattern(words)
+    for text in ('xабвy', 'бв', 'в.г', 'вxг', 'гд', 'ага', 'гдеаб'):
+        expected = any(word in text for word in words)
+        assert bool(pattern.search(text)) == expected, text
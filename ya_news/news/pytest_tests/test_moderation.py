@@ -0,0 +1,124 @@
+import threading
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from news import moderation
+from news.models import Comment
+from news.moderation import WorkerPool, is_acceptable, normalize
+
+
+def test_pool_processes_and_retries():
+    '''Тест обработки очереди и повтора упавших задач.'''
+    done = []
+    attempts = {}
+
+    def handler(item):
+        attempts[item] = attempts.get(item, 0) + 1
+        if item == 'сбой' and attempts[item] < 3:
+            raise RuntimeError(item)
+        done.append(item)
+
+    pool = WorkerPool(handler, workers=2, maxsize=10,
+                      retries=2, retry_delay=0)
+    for item in ('раз', 'два', 'сбой'):
+        pool.submit(item)
+    pool.join()
+    metrics = pool.metrics()
+    assert sorted(done) == ['два', 'раз', 'сбой']
+    assert metrics['processed'] == 3
+    assert metrics['retried'] == 2
+    assert metrics['failed'] == 0
+    assert metrics['queue_depth'] == 0
+    assert metrics['latency_max'] >= metrics['latency_avg']
+
+
+def test_pool_runs_inline_when_queue_is_full():
+    '''Тест обратного давления: при полной очереди задача идёт в запросе.'''
+    started = threading.Event()
+    release = threading.Event()
+    done = []
+
+    def handler(item):
+        if item == 'долгая':
+            started.set()
+            release.wait(5)
+        done.append((item, threading.current_thread().name))
+
+    pool = WorkerPool(handler, workers=1, maxsize=1,
+                      retries=0, retry_delay=0)
+    pool.submit('долгая')
+    started.wait(5)
+    pool.submit('в очереди')
+    pool.submit('лишняя')
+    assert done == [('лишняя', threading.current_thread().name)]
+    release.set()
+    pool.join()
+    assert pool.metrics()['inline'] == 1
+    assert len(done) == 3
+
+
+@pytest.mark.django_db
+def test_metrics_are_shown_to_staff(admin_client, monkeypatch):
+    '''Тест: показатели запущенного пула видны в /admin/perf/.'''
+    url = reverse('perf')
+    assert admin_client.get(url).json()['gauges']['moderation'] is None
+    pool = WorkerPool(lambda item: None, workers=1, maxsize=10,
+                      retries=0, retry_delay=0)
+    monkeypatch.setattr(moderation, '_pool', pool)
+    pool.submit('раз')
+    pool.join()
+    metrics = admin_client.get(url).json()['gauges']['moderation']
+    assert metrics['processed'] == 1
+    assert metrics['queue_depth'] == 0
+
+
+def test_normalize_undoes_lookalikes():
+    '''Тест снятия маскировки латиницей и разделителями.'''
+    assert normalize('P.e.д и c-к_a') == 'редиска'
+    assert normalize('Ну ты, p e д и с к а!') == 'ну ты редиска'
+
+
+@pytest.mark.django_db
+def test_neighbour_words_are_not_joined():
+    '''Тест: соседние слова не склеиваются в запрещённое.'''
+    text = 'Отдыхали среди скал всё лето'
+    assert normalize(text) == 'отдыхали среди скал всё лето'
+    assert is_acceptable(text)
+
+
+@pytest.mark.parametrize(
+    'text, status',
+    (
+        ('Отличная новость', Comment.Status.APPROVED),
+        ('Ну ты p.e.д.и.c.к.a', Comment.Status.REJECTED),
+    ),
+)
+def test_comment_is_moderated_after_commit(
+        author_client, news, text, status,
+        django_capture_on_commit_callbacks
+):
+    '''Тест модерации комментария после сохранения.'''
+    url = reverse('news:detail', args=(news.id,))
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        author_client.post(url, data={'text': text})
+    comment = Comment.objects.get()
+    assert comment.status == Comment.Status.PENDING
+    assert text not in author_client.get(url).content.decode()
+    for callback in callbacks:
+        callback()
+    comment.refresh_from_db()
+    news.refresh_from_db()
+    assert comment.status == status
+    approved = status == Comment.Status.APPROVED
+    assert news.comment_count == int(approved)
+    assert (text in author_client.get(url).content.decode()) == approved
+
+
+def test_moderate_pending_command(news, author):
+    '''Тест команды дообработки комментариев на модерации.'''
+    Comment.objects.create(news=news, author=author, text='Забытый')
+    call_command('moderate_pending', stdout=StringIO())
+    assert Comment.objects.get().status == Comment.Status.APPROVED
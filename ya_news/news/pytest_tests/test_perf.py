@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import AsyncClient, Client, RequestFactory
+from django.urls import reverse
+
+from news.models import News
+from yacommon import perf
+from yacommon.middleware import PerformanceMiddleware
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    perf.registry.reset()
+
+
+def view_stats(name):
+    return perf.registry.snapshot()['views'][name]
+
+
+def test_request_is_recorded(news):
+    '''Тест замера страницы: время, запросы, шаблон и размер ответа.'''
+    response = Client().get(reverse('news:detail', args=(news.id,)))
+    stats = view_stats('news:detail')
+    assert stats['requests'] == 1
+    assert stats['queries']['max'] == 3
+    assert stats['db_ms']['max'] > 0
+    assert 0 < stats['template_ms']['max'] < stats['wall_ms']['max']
+    assert stats['response_bytes']['max'] == len(response.content)
+    assert stats['n_plus_one'] == []
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.urls('yanews.urls_async')
+def test_async_request_is_recorded(list_news):
+    '''Тест замера асинхронной страницы: запросы идут из пула потоков.'''
+    async def request():
+        return await AsyncClient().get(reverse('news:home'))
+    async_to_sync(request)()
+    stats = view_stats('news:home')
+    assert stats['queries']['max'] > 0
+    assert stats['template_ms']['max'] > 0
+
+
+@pytest.mark.parametrize('repeats, detected', (
+    (settings.PERF_N_PLUS_ONE_THRESHOLD, True),
+    (settings.PERF_N_PLUS_ONE_THRESHOLD - 1, False),
+))
+def test_n_plus_one_detected(list_news, repeats, detected):
+    '''Тест: один запрос с разными параметрами много раз — это N+1.'''
+    def view(request):
+        for news in News.objects.all()[:repeats]:
+            News.objects.get(pk=news.pk)
+        return HttpResponse()
+
+    PerformanceMiddleware(view)(RequestFactory().get('/'))
+    n_plus_one = view_stats(perf.UNRESOLVED)['n_plus_one']
+    assert bool(n_plus_one) is detected
+    if detected:
+        assert n_plus_one[0]['max_repeats'] == repeats
+        assert '"news_news"."id" = ?' in n_plus_one[0]['sql']
+
+
+@pytest.mark.parametrize('first, second', (
+    ('SELECT a FROM t WHERE id IN (%s, %s)',
+     'SELECT a FROM t WHERE id IN (?)'),
+    ("SELECT a FROM t WHERE b = 'x' AND c = 2", 'SELECT a FROM t\n'
+     'WHERE b = %s AND c = %s'),
+))
+def test_fingerprint_ignores_values(first, second):
+    '''Тест отпечатка SQL: значения и длина списка IN не важны.'''
+    assert perf.fingerprint(first) == perf.fingerprint(second)
+
+
+@pytest.mark.parametrize('is_staff, status', (
+    (True, HTTPStatus.OK),
+    (False, HTTPStatus.FOUND),
+))
+def test_stats_endpoint_for_staff(author, client, is_staff, status):
+    '''Тест: статистику видит только персонал.'''
+    author.is_staff = is_staff
+    author.save()
+    client.force_login(author)
+    Client().get(reverse('news:home'))
+    response = client.get(reverse('perf'))
+    assert response.status_code == status
+    if is_staff:
+        assert response.json()['views']['news:home']['requests'] == 1
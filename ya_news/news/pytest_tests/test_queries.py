@@ -0,0 +1,47 @@
+import pytest
+
+from django.urls import reverse
+
+from news.forms import bad_words
+
+# Минимальное число запросов для каждого адреса news.urls.
+# Для авторизованного клиента два запроса уходят на сессию и пользователя,
+# удаление дополнительно оборачивается в SAVEPOINT. Модерация нового
+# комментария запускается после коммита и в бюджет запроса не входит.
+# Правка и удаление одобренного комментария обновляют поисковый индекс
+# и время изменения новости. Страница новости начинается с чтения этого
+# времени для ответа 304. Выгрузка для персонала считается вместе
+# с чтением потока ответа.
+QUERY_BUDGETS = (
+    ('client', 'get', 'news:home', None, None, 1),
+    ('client', 'get', 'news:detail', 'news', None, 3),
+    ('author_client', 'get', 'news:detail', 'news', None, 5),
+    ('author_client', 'post', 'news:detail', 'news', {'text': 'Новый'}, 4),
+    ('client', 'get', 'news:comments', 'news', None, 2),
+    ('client', 'get', 'news:search', None, {'q': 'Текст'}, 2),
+    ('author_client', 'get', 'news:edit', 'comment', None, 3),
+    ('author_client', 'post', 'news:edit', 'comment', {'text': 'Правка'}, 7),
+    ('author_client', 'get', 'news:delete', 'comment', None, 3),
+    ('author_client', 'post', 'news:delete', 'comment', None, 9),
+    ('admin_client', 'get', 'news:export', None, {'model': 'news'}, 3),
+    ('admin_client', 'get', 'news:export', None, {'model': 'comment'}, 3),
+)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'client_name, method, name, target, data, expected', QUERY_BUDGETS
+)
+def test_query_count(request, django_assert_num_queries, comment,
+                     client_name, method, name, target, data, expected):
+    '''Тест числа запросов к базе для каждого адреса.'''
+    client = request.getfixturevalue(client_name)
+    args = (request.getfixturevalue(target).id,) if target else None
+    url = reverse(name, args=args)
+    # Списки запрещённых слов загружаются один раз на процесс.
+    bad_words.search('')
+    with django_assert_num_queries(expected):
+        response = getattr(client, method)(url, data=data)
+        if response.streaming:
+            # Выгрузка читает базу, пока отдаётся ответ.
+            b''.join(response.streaming_content)
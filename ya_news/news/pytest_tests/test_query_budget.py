@@ -0,0 +1,46 @@
+from yacommon.pytest_plugin import (
+    QueryRecorder, compare, cost_problems, request_n_plus_one
+)
+
+SUSPECT = {
+    'view': 'news:detail', 'sql': 'SELECT * FROM t WHERE id = ?',
+    'repeats': 5,
+}
+
+
+def test_recorder_counts_queries_and_slow_ones():
+    '''Тест стоимости теста: число запросов и медленные запросы.'''
+    recorder = QueryRecorder(slow_query_ms=100)
+    recorder.add('SELECT * FROM t WHERE id = %s', 0.001)
+    recorder.add('SELECT 1', 0.2)
+    cost = recorder.cost(budget=3, n_plus_one=[])
+    assert cost['queries'] == 2
+    assert cost['budget'] == 3
+    assert cost['slow'] == [{'sql': 'SELECT ?', 'ms': 200.0}]
+
+
+def test_n_plus_one_from_request_stats():
+    '''Тест: подозрения на N+1 берутся по страницам из yacommon.perf.'''
+    snapshot = {'views': {'news:detail': {'n_plus_one': [
+        {'sql': SUSPECT['sql'], 'requests': 2, 'max_repeats': 5},
+    ]}, 'news:home': {'n_plus_one': []}}}
+    assert request_n_plus_one(snapshot) == [SUSPECT]
+
+
+def test_cost_problems():
+    '''Тест: тест падает сверх бюджета и, по ключу, из-за N+1.'''
+    cost = {'queries': 4, 'budget': 3, 'n_plus_one': [SUSPECT]}
+    assert len(cost_problems(cost, fail_on_n_plus_one=False)) == 1
+    assert len(cost_problems(cost, fail_on_n_plus_one=True)) == 2
+    assert cost_problems(
+        dict(cost, budget=4, n_plus_one=[]), fail_on_n_plus_one=True
+    ) == []
+
+
+def test_compare_reports():
+    '''Тест сравнения отчётов: только тесты с другим числом запросов.'''
+    old = {'a': {'queries': 3}, 'b': {'queries': 1}, 'c': {'queries': 2}}
+    new = {'a': {'queries': 5}, 'b': {'queries': 1}, 'd': {'queries': 1}}
+    assert compare(old, new) == [
+        'a: 3 -> 5', 'c: 2 -> None', 'd: None -> 1',
+    ]
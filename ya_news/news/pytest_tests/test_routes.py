@@ -16,7 +16,8 @@ def test_home_availability_for_anonymous_user(client):
 @pytest.mark.django_db
 @pytest.mark.parametrize(
     'name',
-    ('news:home', 'users:login', 'users:logout', 'users:signup')
+    ('news:home', 'news:search', 'users:login', 'users:logout',
+     'users:signup')
 )
 def test_pages_availability_for_anonymous_user(client, name):
     '''Тест доступности страниц анонимному пользователю.'''
@@ -72,3 +73,12 @@ def test_redirects(client, name, args):
     expected_url = f'{login_url}?next={url}'
     response = client.get(url)
     assertRedirects(response, expected_url)
+
+
+@pytest.mark.django_db
+def test_comments_fragment_availability(client, news):
+    '''Тест доступности фрагмента комментариев.'''
+    url = reverse('news:comments', args=(news.id,))
+    assert client.get(url).status_code == HTTPStatus.OK
+    missing_url = reverse('news:comments', args=(news.id + 1,))
+    assert client.get(missing_url).status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,160 @@
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from news import search
+from news.models import Comment, News
+
+
+@pytest.fixture
+def search_news(author):
+    today = date.today()
+    return {
+        'title': News.objects.create(
+            title='Выборы мэра', text='Итоги голосования.',
+            date=today - timedelta(days=1),
+        ),
+        'text': News.objects.create(
+            title='Погода', text='В день выборов ожидается дождь.',
+            date=today - timedelta(days=1),
+        ),
+        'old': News.objects.create(
+            title='Выборы прошлых лет', text='Архив.',
+            date=today - timedelta(days=3650),
+        ),
+    }
+
+
+def found(query, **kwargs):
+    return [
+        result.news.pk
+        for result in search.search_news(query, limit=10, **kwargs)
+    ]
+
+
+@pytest.mark.django_db
+def test_query_terms_are_stems():
+    '''Тест сведения форм слова к общей основе.'''
+    assert search.query_terms('Выборами выборы') == ['выбор']
+    assert search.query_terms('мэр') == ['мэр']
+    # Стеммер общий с заметками: те же окончания глаголов.
+    assert search.query_terms('решишь решите') == ['реш']
+
+
+@pytest.mark.django_db
+def test_ranking(search_news):
+    '''Тест: совпадение в заголовке весит больше совпадения в тексте.'''
+    assert found('выборы')[0] == search_news['title'].pk
+    assert set(found('выборы')) == {news.pk for news in search_news.values()}
+    assert found('выборы итоги') == [search_news['title'].pk]
+
+
+@pytest.mark.django_db
+def test_recency_boost(search_news):
+    '''Тест подъёма свежей новости при равной текстовой оценке.'''
+    News.objects.filter(pk=search_news['old'].pk).update(
+        title='Выборы мэра', text='Итоги голосования.'
+    )
+    call_command('rebuild_search_index', stdout=StringIO())
+    assert found('выборы мэра') == [
+        search_news['title'].pk, search_news['old'].pk
+    ]
+
+
+@pytest.mark.django_db
+def test_snippets_are_highlighted_and_escaped(search_news):
+    '''Тест подсветки совпадений и экранирования HTML.'''
+    search_news['text'].text = '<b>Выборы</b> в <script>'
+    search_news['text'].save()
+    result = search.search_news('script', limit=10)[0]
+    assert '&lt;<mark>script</mark>&gt;' in result.snippet_html
+    title = search.search_news('мэра', limit=10)[0].title_html
+    assert title == 'Выборы <mark>мэра</mark>'
+
+
+@pytest.mark.django_db
+def test_index_follows_changes(search_news, author):
+    '''Тест обновления индекса при правке и удалении новости.'''
+    news = search_news['text']
+    news.text = 'Солнечно.'
+    news.save()
+    assert news.pk not in found('выборы')
+    assert found('солнечно') == [news.pk]
+    news.delete()
+    assert found('солнечно') == []
+
+
+@pytest.mark.django_db
+def test_comments_searched_only_when_asked(search_news, author):
+    '''Тест поиска по одобренным комментариям.'''
+    news = search_news['text']
+    comment = Comment.objects.create(
+        news=news, author=author, text='Будет гроза',
+        status=Comment.Status.PENDING,
+    )
+    assert found('гроза', with_comments=True) == []
+    comment.status = Comment.Status.APPROVED
+    comment.save()
+    assert found('гроза') == []
+    result, = search.search_news('гроза', limit=10, with_comments=True)
+    assert result.news == news
+    assert result.snippet_html == 'Будет <mark>гроза</mark>'
+    comment.delete()
+    assert found('гроза', with_comments=True) == []
+
+
+@pytest.mark.django_db
+def test_comment_matches_are_limited_per_news(news, author):
+    '''Тест: много совпадений в одной новости не вытесняют другие.'''
+    other = News.objects.create(title='Другая', text='Просто текст')
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Гроза {index}',
+                status=Comment.Status.APPROVED)
+        for index in range(15)
+    )
+    # Длинный комментарий оценивается хуже всех коротких.
+    Comment.objects.create(
+        news=other, author=author,
+        text='Вчера над городом до самой ночи шла сильная гроза',
+        status=Comment.Status.APPROVED,
+    )
+    search.get_backend().rebuild()
+    results = search.search_news('гроза', limit=10, with_comments=True)
+    assert {result.news for result in results} == {news, other}
+
+
+@pytest.mark.django_db
+def test_admin_edit_updates_index(admin_client, search_news):
+    '''Тест обновления индекса при правке новости в админке.'''
+    news = search_news['title']
+    admin_client.post(
+        reverse('admin:news_news_change', args=(news.pk,)),
+        {
+            'title': 'Референдум', 'text': news.text,
+            'date': news.date.strftime('%d.%m.%Y'),
+            'comment_set-TOTAL_FORMS': 0, 'comment_set-INITIAL_FORMS': 0,
+        },
+    )
+    assert found('референдум') == [news.pk]
+
+
+@pytest.mark.django_db
+def test_like_backend(search_news):
+    '''Тест запасного поиска подстрокой без FTS5.'''
+    with mock.patch.object(search, 'fts_available', return_value=False):
+        assert found('голосования') == [search_news['title'].pk]
+        assert found('дождь итоги') == []
+
+
+@pytest.mark.django_db
+def test_search_page(client, search_news):
+    '''Тест страницы поиска с разбивкой результатов.'''
+    url = reverse('news:search')
+    response = client.get(url, {'q': 'выборы'})
+    assert len(response.context['object_list']) == len(search_news)
+    assert not response.context['has_next']
+    assert client.get(url, {'q': 'выборы', 'page': 'x'}).status_code == 404
@@ -0,0 +1,257 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+
+from yacommon.stemming import tokenize
+
+from .models import Comment, News
+
+NEWS_TABLE = 'news_news_fts'
+COMMENT_TABLE = 'news_comment_fts'
+TITLE_WEIGHT = 3.0
+# Совпадение в комментарии весит меньше совпадения в самой новости.
+COMMENT_WEIGHT = 0.5
+SNIPPET_WORDS = 16
+# Маркеры совпадений в тексте FTS5, которые заменяются на <mark>
+# уже после экранирования HTML.
+MARK_START = '\x02'
+MARK_END = '\x03'
+_fts_tables = {}
+
+
+def query_terms(query):
+    """
+    Основы слов запроса.
+
+    В индексе хранится исходный текст, чтобы строить по нему сниппеты,
+    поэтому формы слова сводятся на стороне запроса: основа ищется
+    как префикс («новостями» → «новост*»).
+    """
+    terms = []
+    for term in tokenize(query):
+        if term not in terms:
+            terms.append(term)
+    return terms
+
+
+def recency_boost(day_column):
+    """
+    Множитель релевантности: свежие новости поднимаются выше.
+
+    bm25() в SQLite отрицателен, чем меньше — тем лучше, поэтому
+    множитель больше единицы улучшает позицию. Прирост вдвое
+    уменьшается каждые NEWS_SEARCH_RECENCY_HALF_LIFE дней.
+    """
+    return (
+        f'(1.0 + {settings.NEWS_SEARCH_RECENCY_WEIGHT:f} / (1.0 + '
+        f"max(julianday('now') - {day_column}, 0) / "
+        f'{settings.NEWS_SEARCH_RECENCY_HALF_LIFE:f}))'
+    )
+
+
+def highlight(text):
+    if text is None:
+        return ''
+    return escape(text).replace(MARK_START, '<mark>').replace(
+        MARK_END, '</mark>'
+    )
+
+
+def fts_available():
+    """Таблицы FTS5 создаются миграцией, только если SQLite их умеет."""
+    if connection.vendor != 'sqlite':
+        return False
+    name = connection.settings_dict['NAME']
+    if name not in _fts_tables:
+        _fts_tables[name] = (
+            NEWS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_tables[name]
+
+
+class SearchResult:
+    """Найденная новость с подсвеченными заголовком и фрагментом текста."""
+
+    def __init__(self, news, score, title_html, snippet_html):
+        self.news = news
+        self.score = score
+        self.title_html = title_html
+        self.snippet_html = snippet_html
+
+
+class Fts5Backend:
+    """
+    Индекс в таблицах FTS5: новости и одобренные комментарии отдельно.
+
+    rowid строки индекса совпадает с id новости или комментария,
+    поэтому правка и удаление обходятся одним запросом по ключу.
+    Дата новости хранится в индексе юлианским днём, чтобы оценка
+    с поправкой на свежесть считалась без обращения к news_news.
+    """
+
+    def index_news(self, news, replace=True):
+        with connection.cursor() as cursor:
+            if replace:
+                self._delete(cursor, NEWS_TABLE, news.pk)
+            cursor.execute(
+                f'INSERT INTO {NEWS_TABLE} (rowid, title, text, day) '
+                'VALUES (%s, %s, %s, julianday(%s))',
+                (news.pk, news.title, news.text, self.news_day(news)),
+            )
+
+    def news_day(self, news):
+        # По умолчанию News.date — datetime.today(), время не нужно.
+        return News._meta.get_field('date').to_python(news.date).isoformat()
+
+    def index_comment(self, comment, replace=True):
+        with connection.cursor() as cursor:
+            if replace:
+                self._delete(cursor, COMMENT_TABLE, comment.pk)
+            cursor.execute(
+                f'INSERT INTO {COMMENT_TABLE} (rowid, news_id, text) '
+                'VALUES (%s, %s, %s)',
+                (comment.pk, comment.news_id, comment.text),
+            )
+
+    def remove_news(self, news_id):
+        with connection.cursor() as cursor:
+            self._delete(cursor, NEWS_TABLE, news_id)
+
+    def remove_comment(self, comment_id):
+        with connection.cursor() as cursor:
+            self._delete(cursor, COMMENT_TABLE, comment_id)
+
+    def rebuild(self):
+        """Заполняет индекс заново одним INSERT ... SELECT на таблицу."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {NEWS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {NEWS_TABLE} (rowid, title, text, day) '
+                'SELECT id, title, text, julianday(date) FROM news_news'
+            )
+            cursor.execute(f'DELETE FROM {COMMENT_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {COMMENT_TABLE} (rowid, news_id, text) '
+                'SELECT id, news_id, text FROM news_comment '
+                'WHERE status = %s',
+                (Comment.Status.APPROVED,),
+            )
+
+    def search(self, terms, limit, with_comments):
+        match = ' AND '.join('"{}"*'.format(term) for term in terms)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, '
+                f'bm25({NEWS_TABLE}, {TITLE_WEIGHT:f}, 1.0, 0) * '
+                f'{recency_boost("day")} AS score, '
+                f"highlight({NEWS_TABLE}, 0, '{MARK_START}', '{MARK_END}'), "
+                f"snippet({NEWS_TABLE}, 1, '{MARK_START}', '{MARK_END}', "
+                f"'…', {SNIPPET_WORDS}) "
+                f'FROM {NEWS_TABLE} '
+                f'WHERE {NEWS_TABLE} MATCH %s ORDER BY score LIMIT %s',
+                (match, limit),
+            )
+            rows = cursor.fetchall()
+            if with_comments:
+                # Лучший комментарий каждой новости: LIMIT считается по
+                # новостям, а не по комментариям, иначе одна новость
+                # с множеством совпадений заняла бы всё окно. Сниппет
+                # берётся из строки с MIN(score) (так SQLite выбирает
+                # значения остальных столбцов при MIN).
+                cursor.execute(
+                    'SELECT news_id, MIN(score), NULL, snippet FROM ('
+                    'SELECT c.news_id AS news_id, '
+                    f'bm25({COMMENT_TABLE}) * {COMMENT_WEIGHT:f} * '
+                    f'{recency_boost("julianday(n.date)")} AS score, '
+                    f"snippet({COMMENT_TABLE}, 1, '{MARK_START}', "
+                    f"'{MARK_END}', '…', {SNIPPET_WORDS}) AS snippet "
+                    f'FROM {COMMENT_TABLE} AS c '
+                    'JOIN news_news AS n ON n.id = c.news_id '
+                    f'WHERE {COMMENT_TABLE} MATCH %s '
+                    # LIMIT -1 не даёт SQLite развернуть подзапрос:
+                    # bm25() и snippet() работают только в запросе FTS.
+                    'LIMIT -1'
+                    ') GROUP BY news_id ORDER BY MIN(score) LIMIT %s',
+                    (match, limit),
+                )
+                rows.extend(cursor.fetchall())
+        return rows
+
+    def _delete(self, cursor, table, rowid):
+        cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', (rowid,))
+
+
+class LikeBackend:
+    """
+    Поиск подстрокой, если FTS5 недоступен: без индекса и ранжирования,
+    свежие новости первыми.
+    """
+
+    def index_news(self, news, replace=True):
+        pass
+
+    def index_comment(self, comment, replace=True):
+        pass
+
+    def remove_news(self, news_id):
+        pass
+
+    def remove_comment(self, comment_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def search(self, terms, limit, with_comments):
+        condition = Q()
+        for term in terms:
+            term_condition = Q(title__icontains=term) | Q(text__icontains=term)
+            if with_comments:
+                term_condition |= Q(pk__in=Comment.objects.filter(
+                    text__icontains=term, status=Comment.Status.APPROVED
+                ).values('news_id'))
+            condition &= term_condition
+        news_ids = News.objects.filter(condition).order_by(
+            '-date', '-pk'
+        ).values_list('pk', flat=True)[:limit]
+        return [
+            (news_id, -position, None, None)
+            for position, news_id in enumerate(news_ids, start=1)
+        ]
+
+
+def get_backend():
+    return Fts5Backend() if fts_available() else LikeBackend()
+
+
+def search_news(query, limit, offset=0, with_comments=False):
+    """
+    Новости по запросу, от самых подходящих к менее подходящим.
+
+    Совпадения в новости и в её комментариях ранжируются вместе:
+    для новости берётся лучшая оценка и её сниппет.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+    rows = get_backend().search(terms, offset + limit, with_comments)
+    best = {}
+    for news_id, score, title_html, snippet_html in sorted(
+        rows, key=lambda row: (row[1], row[0])
+    ):
+        if news_id not in best:
+            best[news_id] = (score, title_html, snippet_html)
+    page = list(best.items())[offset:offset + limit]
+    news = News.objects.in_bulk([news_id for news_id, _ in page])
+    return [
+        SearchResult(
+            news[news_id], score,
+            highlight(title_html) if title_html else escape(
+                news[news_id].title
+            ),
+            highlight(snippet_html),
+        )
+        for news_id, (score, title_html, snippet_html) in page
+        if news_id in news
+    ]
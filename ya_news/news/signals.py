@@ -0,0 +1,62 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_feed, invalidate_news
+from .forms import bad_words
+from .models import BadWord, Comment, News
+from .search import get_backend
+
+
+def after_commit(invalidate, *args):
+    """
+    Сброс кэша после коммита. Сброшенный раньше, внутри транзакции
+    записи, кэш успел бы заполнить анонимный запрос со старыми строками
+    под новой версией, и она держалась бы до истечения кэша.
+    """
+    transaction.on_commit(lambda: invalidate(*args))
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def news_changed(sender, instance, **kwargs):
+    after_commit(invalidate_feed)
+    after_commit(invalidate_news, instance.pk)
+
+
+@receiver(post_save, sender=News)
+def news_saved(sender, instance, created, **kwargs):
+    get_backend().index_news(instance, replace=not created)
+
+
+@receiver(post_delete, sender=News)
+def news_deleted(sender, instance, **kwargs):
+    get_backend().remove_news(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    # Ленту меняет только счётчик, его сбрасывает модерация.
+    after_commit(invalidate_news, instance.news_id)
+    # Новый комментарий на модерации страницу новости не меняет.
+    if not created or instance.status == Comment.Status.APPROVED:
+        News.objects.filter(pk=instance.news_id).touch()
+    # В поиск попадают только одобренные комментарии.
+    if instance.status == Comment.Status.APPROVED:
+        get_backend().index_comment(instance, replace=not created)
+    elif not created:
+        get_backend().remove_comment(instance.pk)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    after_commit(invalidate_news, instance.news_id)
+    News.objects.filter(pk=instance.news_id).touch()
+    after_commit(invalidate_feed)
+    get_backend().remove_comment(instance.pk)
+
+
+@receiver(post_save, sender=BadWord)
+@receiver(post_delete, sender=BadWord)
+def bad_words_changed(sender, **kwargs):
+    bad_words.invalidate()
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from news import async_views, urls
+
+app_name = urls.app_name
+
+# Асинхронные страницы стоят первыми и перекрывают синхронные.
+urlpatterns = [
+    path('', async_views.news_list, name='home'),
+    path('news/<int:pk>/', async_views.news_detail, name='detail'),
+    *urls.urlpatterns,
+]
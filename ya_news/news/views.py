@@ -1,47 +1,156 @@
 from django.conf import settings
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.db import transaction
+from django.db.models import F
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views import generic
 
+from yacommon.http import conditional_page
+from yacommon.pagination import KeysetPaginator
+
+from .cache import (
+    FEED_VERSION_KEY, NEWS_VERSION_KEY, AnonymousPageCacheMixin,
+    render_comments
+)
+from .export import export_chunks
 from .forms import CommentForm
 from .models import Comment, News
+from .moderation import submit_for_moderation
+from .search import search_news
 
 
-class NewsList(generic.ListView):
+class NewsList(AnonymousPageCacheMixin, generic.ListView):
     """Список новостей."""
     model = News
     template_name = 'news/home.html'
 
+    def get_page_cache_version_key(self):
+        return FEED_VERSION_KEY
+
     def get_queryset(self):
         """
-        Выводим только несколько последних новостей.
+        Выводим одну страницу новостей, начиная с переданного курсора.
 
-        Их количество определяется в настройках проекта.
+        Размер страницы определяется в настройках проекта.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        paginator = KeysetPaginator(
+            self.model.objects.all(),
+            '-date',
+            settings.NEWS_COUNT_ON_HOME_PAGE,
+        )
+        self.page = paginator.get_page(self.request.GET.get('cursor'))
+        return self.page.object_list
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page'] = self.page
+        return context
+
+
+class NewsSearch(generic.ListView):
+    """Поиск по новостям и, по желанию, по комментариям к ним."""
+    template_name = 'news/search.html'
+
+    def get_queryset(self):
+        """
+        Страница результатов по убыванию релевантности.
+
+        Запрашивается на один результат больше страницы,
+        чтобы узнать, есть ли следующая.
+        """
+        self.query = self.request.GET.get('q', '').strip()
+        self.with_comments = bool(self.request.GET.get('comments'))
+        try:
+            self.page_number = max(int(self.request.GET.get('page', 1)), 1)
+        except ValueError:
+            raise Http404('Неверный номер страницы.')
+        per_page = settings.NEWS_SEARCH_RESULTS_ON_PAGE
+        results = search_news(
+            self.query, per_page + 1,
+            offset=(self.page_number - 1) * per_page,
+            with_comments=self.with_comments,
+        )
+        self.has_next = len(results) > per_page
+        return results[:per_page]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(
+            query=self.query,
+            with_comments=self.with_comments,
+            page_number=self.page_number,
+            has_next=self.has_next,
+        )
+        return context
+
+
+def comments_page(news_id, cursor=None):
+    """Страница комментариев к новости по (created, id) с готовым HTML."""
+    page = KeysetPaginator(
+        Comment.objects.filter(
+            news_id=news_id, status=Comment.Status.APPROVED
+        ).select_related('author'),
+        'created',
+        settings.COMMENTS_COUNT_ON_PAGE,
+    ).get_page(cursor)
+    render_comments(page.object_list)
+    return page
+
+
+def news_updated(request, pk):
+    """
+    Время изменения страницы новости, без загрузки самой новости.
+
+    News.updated сдвигают и правка новости, и изменения её
+    комментариев (см. signals), поэтому хватает чтения по ключу.
+    """
+    return News.objects.filter(pk=pk).values_list(
+        'updated', flat=True
+    ).first()
 
 
-class NewsDetail(generic.DetailView):
+@method_decorator(conditional_page(news_updated), name='dispatch')
+class NewsDetail(AnonymousPageCacheMixin, generic.DetailView):
     model = News
     template_name = 'news/detail.html'
 
+    def get_page_cache_version_key(self):
+        return NEWS_VERSION_KEY.format(pk=self.kwargs['pk'])
+
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
-        return obj
+        return get_object_or_404(self.model, pk=self.kwargs['pk'])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context['page'] = comments_page(self.object.pk)
         if self.request.user.is_authenticated:
             context['form'] = CommentForm()
         return context
 
 
+class CommentList(AnonymousPageCacheMixin, generic.ListView):
+    """Следующие страницы комментариев к новости в виде HTML-фрагмента."""
+    template_name = 'news/includes/comments.html'
+
+    def get_page_cache_version_key(self):
+        return NEWS_VERSION_KEY.format(pk=self.kwargs['pk'])
+
+    def get_queryset(self):
+        news_id = self.kwargs['pk']
+        if not News.objects.filter(pk=news_id).exists():
+            raise Http404('Новость не найдена.')
+        self.page = comments_page(news_id, self.request.GET.get('cursor'))
+        return self.page.object_list
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(page=self.page, news_id=self.kwargs['pk'])
+        return context
+
+
 class NewsComment(
         LoginRequiredMixin,
         generic.detail.SingleObjectMixin,
@@ -55,27 +164,34 @@ class NewsComment(
         self.object = self.get_object()
         return super().post(request, *args, **kwargs)
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page'] = comments_page(self.object.pk)
+        return context
+
     def form_valid(self, form):
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
         comment.save()
+        transaction.on_commit(lambda: submit_for_moderation(comment.pk))
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
 
 class NewsDetailView(generic.View):
+    detail_view = staticmethod(NewsDetail.as_view())
+    comment_view = staticmethod(NewsComment.as_view())
 
     def get(self, request, *args, **kwargs):
-        view = NewsDetail.as_view()
-        return view(request, *args, **kwargs)
+        return self.detail_view(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
-        view = NewsComment.as_view()
-        return view(request, *args, **kwargs)
+        return self.comment_view(request, *args, **kwargs)
 
 
 class CommentBase(LoginRequiredMixin):
@@ -83,14 +199,15 @@ class CommentBase(LoginRequiredMixin):
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
         """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        return self.model.objects.filter(
+            author=self.request.user
+        ).select_related('news')
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
@@ -102,3 +219,47 @@ class CommentUpdate(CommentBase, generic.UpdateView):
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+    def delete(self, request, *args, **kwargs):
+        with transaction.atomic():
+            response = super().delete(request, *args, **kwargs)
+            # В счётчике учтены только одобренные комментарии.
+            if self.object.status == Comment.Status.APPROVED:
+                News.objects.filter(
+                    pk=self.object.news_id, comment_count__gt=0
+                ).update(
+                    comment_count=F('comment_count') - 1
+                )
+        return response
+
+
+class NewsExport(UserPassesTestMixin, generic.View):
+    """
+    Выгрузка новостей и комментариев для аналитики, только для персонала.
+
+    Параметры: model — news, comment или all; format — ndjson или csv;
+    gzip=1 сжимает ответ. Строки читаются из базы порциями и сразу
+    уходят клиенту, поэтому память не зависит от размера выгрузки.
+    """
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        model_name = request.GET.get('model', 'all')
+        data_format = request.GET.get('format', 'ndjson')
+        compress = request.GET.get('gzip') == '1'
+        try:
+            chunks = export_chunks(model_name, data_format, compress)
+        except ValueError as error:
+            return HttpResponseBadRequest(str(error))
+        filename = f'{model_name}.{data_format}'
+        content_type = (
+            'text/csv' if data_format == 'csv' else 'application/x-ndjson'
+        )
+        if compress:
+            filename += '.gz'
+            content_type = 'application/gzip'
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
@@ -1,9 +1,15 @@
+import os
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Общий для обоих проектов код лежит в корне репозитория.
+sys.path.append(str(BASE_DIR.parent))
+from yacommon.db import database_config, replica_aliases  # noqa: E402
+
 SECRET_KEY = 'django-insecure-7)dgs++2!#==aye4rd=5)c)bw0eokiyqx0hts6#t80!$c&$s+('
 
 DEBUG = True
@@ -21,7 +27,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yacommon.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'yacommon.middleware.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -30,11 +38,13 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'yanews.urls'
+# asgi.py подставляет yanews.urls_async с асинхронными страницами чтения.
+ROOT_URLCONF = os.environ.get('YANEWS_URLCONF', 'yanews.urls')
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Как DjangoTemplates, но с замером рендера для PerformanceMiddleware.
+        'BACKEND': 'yacommon.templates.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -51,11 +61,35 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+# База задаётся переменной YANEWS_DATABASE_URL, см. yacommon.db.
+DATABASES = database_config('YANEWS', BASE_DIR / 'db.sqlite3')
+# Реплики для чтения — переменная YANEWS_REPLICA_URLS.
+DATABASE_REPLICAS = replica_aliases(DATABASES)
+DATABASE_ROUTERS = ['yacommon.routers.ReplicaRouter']
+# Сколько секунд после записи пользователь читает из основной базы.
+REPLICA_PIN_SECONDS = 5
+# Потоки для запросов к базе из асинхронных представлений, см. yacommon.aio.
+ASYNC_DB_THREADS = 32
+
+# Бэкенд кэша выбирается переменной окружения YANEWS_CACHE:
+# locmem — в памяти процесса, file — общий для процессов каталог,
+# db — таблица news_cache (создаётся командой createcachetable).
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'news_cache',
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[os.environ.get('YANEWS_CACHE', 'locmem')],
 }
 
 
@@ -80,3 +114,33 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+COMMENTS_COUNT_ON_PAGE = 20
+
+NEWS_SEARCH_RESULTS_ON_PAGE = 10
+# Свежая новость получает к оценке до +100%, прирост вдвое
+# уменьшается каждые NEWS_SEARCH_RECENCY_HALF_LIFE дней.
+NEWS_SEARCH_RECENCY_WEIGHT = 1.0
+NEWS_SEARCH_RECENCY_HALF_LIFE = 30
+
+NEWS_PAGE_CACHE_ALIAS = 'default'
+NEWS_PAGE_CACHE_TIMEOUT = 60 * 15
+NEWS_FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Сколько строк выгрузки читать из базы за один запрос курсора.
+NEWS_EXPORT_CHUNK_SIZE = 2000
+
+# Дополнительный список запрещённых слов: по одному на строке.
+BAD_WORDS_FILE = os.environ.get('YANEWS_BAD_WORDS_FILE')
+BAD_WORDS_RELOAD_INTERVAL = 60
+
+# Модерация комментариев после сохранения: 0 воркеров — проверка в запросе.
+MODERATION_WORKERS = 2
+MODERATION_QUEUE_SIZE = 1000
+MODERATION_RETRIES = 3
+MODERATION_RETRY_DELAY = 0.5
+
+# Замеры запросов по представлениям: /admin/perf/ для персонала.
+PERF_ENABLED = os.environ.get('YANEWS_PERF', '1') == '1'
+# Столько одинаковых запросов в одном HTTP-запросе считаются N+1.
+PERF_N_PLUS_ONE_THRESHOLD = 5
@@ -0,0 +1,10 @@
+"""Адреса для ASGI: страницы чтения новостей — асинхронные."""
+from django.urls import include, path
+
+from yanews import urls
+
+urlpatterns = [
+    path('', include('news.urls_async'))
+    if getattr(pattern, 'app_name', None) == 'news' else pattern
+    for pattern in urls.urlpatterns
+]
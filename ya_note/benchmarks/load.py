@@ -0,0 +1,221 @@
+"""
+Нагрузочный замер всех адресов notes.urls смесью чтения и записи.
+
+База SQLite заполняется заметками обычных авторов (по умолчанию
+миллион на тысячу авторов) и «тяжёлых» авторов — читателей, от чьего
+имени идёт нагрузка, по --notes-per-reader заметок у каждого. Потоки
+открывают, ищут, создают, правят и удаляют свои заметки, в том числе
+пачками через JSON. Результаты — по маршрутам, см. yacommon.bench.
+Запуск из каталога ya_note:
+    python -m benchmarks.load --database /tmp/notes.sqlite3 \\
+        --output results.json --baseline previous.json
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Общий для обоих проектов код лежит в корне репозитория.
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from yacommon import bench  # noqa: E402
+
+BULK_SIZE = 20
+
+
+def index_batch(batch):
+    from notes.models import Note
+    from notes.search import index_notes
+
+    index_notes([
+        Note(pk=pk, title=title, text=text, slug=slug, author_id=author_id)
+        for pk, title, text, slug, author_id, _ in batch
+    ], replace=False)
+
+
+def seed_notes(rng, vocabulary, author_ids, count):
+    from django.db import connection
+
+    from notes.models import Note
+
+    start = (Note.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first() or 0) + 1
+    updated = connection.ops.adapt_datetimefield_value(
+        datetime.now(timezone.utc)
+    )
+    return bench.insert_rows(
+        'notes_note',
+        ('id', 'title', 'text', 'slug', 'author_id', 'updated'),
+        (
+            (pk, bench.sentence(rng, vocabulary, 3),
+             bench.sentence(rng, vocabulary, rng.randint(10, 60)),
+             f'note-{pk}', rng.choice(author_ids), updated)
+            for pk in range(start, start + count)
+        ),
+        after_batch=index_batch,
+    )
+
+
+def seed(args, rng):
+    """Заполняет пустую базу; возвращает читателей."""
+    from django.contrib.auth import get_user_model
+
+    from notes.models import Note
+
+    User = get_user_model()
+    vocabulary = [bench.random_word(rng) for _ in range(args.vocabulary)]
+    if not Note.objects.exists():
+        User.objects.bulk_create(
+            User(username=f'author{index}') for index in range(args.authors)
+        )
+        seed_notes(
+            rng, vocabulary,
+            list(User.objects.values_list('pk', flat=True)), args.notes,
+        )
+    readers = []
+    for index in range(args.concurrency):
+        reader, _ = User.objects.get_or_create(username=f'reader{index}')
+        missing = args.notes_per_reader - reader.note_set.count()
+        if missing > 0:
+            seed_notes(rng, vocabulary, [reader.pk], missing)
+        readers.append(reader)
+    print(f'заметок: {Note.objects.count()}')
+    return readers, vocabulary
+
+
+def make_workers(args, readers, vocabulary):
+    from django.test import Client
+
+    # Адреса пачек не должны совпасть с созданными прошлым запуском.
+    run_id = format(int(time.time()), 'x')
+    workers = []
+    for index, reader in enumerate(readers):
+        clients = {'anonymous': Client(), 'user': Client()}
+        clients['user'].force_login(reader)
+        workers.append(bench.Worker(
+            clients, args.seed + index,
+            vocabulary=vocabulary,
+            slugs=list(reader.note_set.values_list('slug', flat=True)),
+            new_slugs=map(
+                f'bench-{run_id}-{index}-{{}}'.format, itertools.count()
+            ),
+        ))
+    return workers
+
+
+def url(name):
+    def build(worker):
+        from django.urls import reverse
+
+        return {'path': reverse(name)}
+    return build
+
+
+def note_url(name, data=None, remove=False):
+    def build(worker):
+        from django.urls import reverse
+
+        if not worker.slugs:
+            return None
+        index = worker.rng.randrange(len(worker.slugs))
+        slug = worker.slugs.pop(index) if remove else worker.slugs[index]
+        kwargs = {'path': reverse(name, args=(slug,))}
+        if data is not None:
+            kwargs['data'] = data(worker, slug)
+        return kwargs
+    return build
+
+
+def note_form(worker, slug=''):
+    return {
+        'title': bench.sentence(worker.rng, worker.vocabulary, 3),
+        'text': bench.sentence(worker.rng, worker.vocabulary, 30),
+        'slug': slug,
+    }
+
+
+def add_note(worker):
+    return dict(url('notes:add')(worker), data=note_form(worker))
+
+
+def search(worker):
+    return dict(url('notes:search')(worker),
+                data={'q': worker.rng.choice(worker.vocabulary)})
+
+
+def bulk_create(worker):
+    notes = [
+        dict(note_form(worker), slug=next(worker.new_slugs))
+        for _ in range(BULK_SIZE)
+    ]
+    worker.slugs.extend(note['slug'] for note in notes)
+    return dict(url('notes:bulk_create')(worker),
+                data=json.dumps(notes), content_type='application/json')
+
+
+def bulk_delete(worker):
+    if not worker.slugs:
+        return None
+    slugs = [worker.slugs.pop() for _ in range(min(10, len(worker.slugs)))]
+    return dict(url('notes:bulk_delete')(worker),
+                data=json.dumps({'slugs': slugs}),
+                content_type='application/json')
+
+
+ROUTES = [
+    bench.Route('notes:home', 'GET', 5, url('notes:home'),
+                client='anonymous'),
+    bench.Route('notes:list', 'GET', 20, url('notes:list')),
+    bench.Route('notes:detail', 'GET', 20, note_url('notes:detail')),
+    bench.Route('notes:search', 'GET', 10, search),
+    bench.Route('notes:add', 'GET', 3, url('notes:add')),
+    bench.Route('notes:add', 'POST', 5, add_note),
+    bench.Route('notes:success', 'GET', 1, url('notes:success')),
+    bench.Route('notes:edit', 'GET', 3, note_url('notes:edit')),
+    bench.Route('notes:edit', 'POST', 5, note_url('notes:edit', note_form)),
+    bench.Route('notes:delete', 'GET', 1, note_url('notes:delete')),
+    bench.Route('notes:delete', 'POST', 2, note_url(
+        'notes:delete', remove=True
+    )),
+    bench.Route('notes:bulk_create', 'POST', 2, bulk_create),
+    bench.Route('notes:bulk_delete', 'POST', 1, bulk_delete),
+    bench.Route('notes:export', 'GET', 1, url('notes:export')),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    bench.add_arguments(parser)
+    parser.add_argument('--notes', type=int, default=1_000_000)
+    parser.add_argument('--authors', type=int, default=1000)
+    parser.add_argument('--notes-per-reader', type=int, default=50_000)
+    parser.add_argument('--vocabulary', type=int, default=5000)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        bench.setup_django(
+            'yanote.settings', 'YANOTE',
+            args.database or os.path.join(directory, 'bench.sqlite3'),
+        )
+        readers, vocabulary = seed(args, rng)
+        workers = make_workers(args, readers, vocabulary)
+        print(f'нагрузка: {args.concurrency} потоков, {args.seconds:g} с')
+        results = bench.run(ROUTES, workers, args.seconds)
+    results.update(
+        project='ya_note', environment=bench.environment(),
+        config=vars(args),
+    )
+    return bench.finish(results, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Поиск по заметкам: индекс против icontains на большом числе заметок.
+
+Заметки создаются во временной базе SQLite, рабочая база не меняется.
+Запуск из каталога ya_note:
+    python -m benchmarks.search --notes 1000000 --queries 200
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Общий для обоих проектов код лежит в корне репозитория.
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from yacommon import bench  # noqa: E402
+
+
+def seed(count, vocabulary, rng, batch_size=10_000):
+    from django.contrib.auth import get_user_model
+    from django.db import connection, transaction
+
+    from notes.models import Note
+    from notes.search import index_notes
+
+    authors = [
+        get_user_model().objects.create(username=f'user{index}')
+        for index in range(10)
+    ]
+    for start in range(0, count, batch_size):
+        notes = []
+        for pk in range(start + 1, min(start + batch_size, count) + 1):
+            words = [
+                rng.choice(vocabulary) + rng.choice(bench.ENDINGS)
+                for _ in range(30)
+            ]
+            notes.append(Note(
+                pk=pk, title=' '.join(words[:3]), text=' '.join(words),
+                slug=f'note-{pk}', author_id=rng.choice(authors).pk,
+            ))
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    'INSERT INTO notes_note (id, title, text, slug, '
+                    'author_id, updated) '
+                    'VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)',
+                    [(note.pk, note.title, note.text, note.slug,
+                      note.author_id) for note in notes],
+                )
+            index_notes(notes, replace=False)
+        print(f'\rзаметок: {start + len(notes)}', end='', flush=True)
+    print()
+    return authors
+
+
+def measure(function, queries):
+    timings = []
+    for author, query in queries:
+        started = time.perf_counter()
+        function(author, query)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return (
+        statistics.median(timings),
+        timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=1_000_000)
+    parser.add_argument('--vocabulary', type=int, default=50_000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        bench.setup_django(
+            'yanote.settings', 'YANOTE',
+            os.path.join(directory, 'bench.sqlite3'),
+        )
+        from notes.models import Note
+        from notes.search import get_backend, search_notes
+
+        rng = random.Random(args.seed)
+        vocabulary = [
+            bench.random_word(rng, 4, 9) for _ in range(args.vocabulary)
+        ]
+        started = time.perf_counter()
+        authors = seed(args.notes, vocabulary, rng)
+        print(f'загрузка и индексация: {time.perf_counter() - started:.1f} с')
+        queries = [
+            (rng.choice(authors),
+             rng.choice(vocabulary) + rng.choice(bench.ENDINGS))
+            for _ in range(args.queries)
+        ]
+
+        def icontains(author, query):
+            list(Note.objects.filter(
+                author=author, text__icontains=query
+            ).only('title', 'slug')[:20])
+
+        def indexed(author, query):
+            search_notes(author, query, limit=20)
+
+        print(f'индекс: {type(get_backend()).__name__}')
+        for name, function in (('icontains', icontains), ('индекс', indexed)):
+            p50, p99 = measure(function, queries)
+            print(f'{name:>10}: p50 {p50:.2f} мс, p99 {p99:.2f} мс')
+
+
+if __name__ == '__main__':
+    main()
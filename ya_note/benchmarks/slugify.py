@@ -0,0 +1,65 @@
+"""
+Цена адреса заметки из заголовка: slugify на каждую запись и кэш.
+
+Запуск из каталога ya_note:
+    python -m benchmarks.slugify --titles 1000 --creates 100000
+"""
+import argparse
+import os
+import random
+import timeit
+
+TYPICAL_TITLES = (
+    'Список покупок', 'Дела на неделю', 'Идеи для отпуска',
+    'Заметка', 'Встреча с командой', 'Прочитать',
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=1000,
+                        help='Сколько разных заголовков повторяется.')
+    parser.add_argument('--creates', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    import django
+
+    django.setup()
+    from pytils.translit import slugify
+
+    from notes.slugs import _cached_slug, make_slug, slug_cache_info
+
+    rng = random.Random(args.seed)
+    long_titles = [
+        ' '.join(rng.choice(TYPICAL_TITLES) for _ in range(8))[:100]
+        for _ in range(args.titles)
+    ]
+    typical_titles = [
+        f'{rng.choice(TYPICAL_TITLES)} {index}'
+        for index in range(args.titles)
+    ]
+    for name, titles in (('обычный', typical_titles),
+                         ('100 символов', long_titles)):
+        stream = [rng.choice(titles) for _ in range(args.creates)]
+        _cached_slug.cache_clear()
+        plain = min(timeit.repeat(
+            lambda: [slugify(title)[:100] for title in stream],
+            number=1, repeat=args.repeat,
+        ))
+        _cached_slug.cache_clear()
+        cached = min(timeit.repeat(
+            lambda: [make_slug(title, 100) for title in stream],
+            number=1, repeat=args.repeat,
+        ))
+        per_plain = plain / len(stream) * 1e6
+        per_cached = cached / len(stream) * 1e6
+        print(f'{name}: slugify {per_plain:.2f} мкс, '
+              f'кэш {per_cached:.2f} мкс на запись '
+              f'({per_plain / per_cached:.1f}x), {slug_cache_info()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class NotesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notes'
+
+    def ready(self):
+        from yacommon.perf import registry
+
+        from . import signals  # noqa: F401
+        from .slugs import slug_cache_metrics
+
+        # Кэш адресов заметок виден персоналу в /admin/perf/.
+        registry.add_gauge('slug_cache', slug_cache_metrics)
@@ -0,0 +1,70 @@
+"""
+Асинхронные версии страниц для чтения.
+
+Подключаются адресами yanote.urls_async, которые использует
+ASGI-приложение. Запросы к базе идут через
+yacommon.aio.database_sync_to_async, шаблон рендерится в корутине.
+"""
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.http import HttpResponseNotAllowed
+from django.shortcuts import get_object_or_404, render
+
+from yacommon.aio import database_sync_to_async, load_user
+from yacommon.http import conditional_page
+from yacommon.pagination import paginate_by_pk
+
+from .models import Note
+from .views import note_updated
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+@database_sync_to_async
+def load_notes_page(user, after, before):
+    return paginate_by_pk(
+        Note.objects.filter(author=user).only('title', 'slug'),
+        settings.NOTES_COUNT_ON_LIST_PAGE,
+        after=after,
+        before=before,
+    )
+
+
+@database_sync_to_async
+def load_note(user, slug):
+    return get_object_or_404(Note, author=user, slug=slug)
+
+
+def login_required(view):
+    """Асинхронный аналог LoginRequiredMixin, только для GET и HEAD."""
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return HttpResponseNotAllowed(SAFE_METHODS)
+        user = await load_user(request)
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, user, *args, **kwargs)
+    return wrapper
+
+
+@login_required
+async def notes_list(request, user):
+    """Список заметок пользователя, как NotesList."""
+    page = await load_notes_page(
+        user, request.GET.get('after'), request.GET.get('before')
+    )
+    return render(request, 'notes/list.html', {
+        'page': page,
+        'object_list': page.object_list,
+        'note_list': page.object_list,
+    })
+
+
+@conditional_page(note_updated)
+@login_required
+async def note_detail(request, user, slug):
+    """Заметка подробно, как NoteDetail."""
+    note = await load_note(user, slug)
+    return render(
+        request, 'notes/detail.html', {'object': note, 'note': note}
+    )
@@ -1,5 +1,3 @@
-from pytils.translit import slugify
-
 from django import forms
 from django.core.exceptions import ValidationError
 
@@ -15,15 +13,24 @@ class NoteForm(forms.ModelForm):
         model = Note
         fields = ('title', 'text', 'slug')
 
-    def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
-        cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
-        if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
-        if Note.objects.filter(
-                slug=slug
-        ).exclude(id=self.instance.pk).exists():
-            raise ValidationError(slug + WARNING)
-        return slug
+    def add_slug_conflict(self):
+        """Ошибка формы, если заданный адрес уже занят."""
+        self.add_error('slug', self.instance.slug + WARNING)
+
+    def validate_unique(self):
+        """
+        Уникальность slug проверяет индекс при сохранении,
+        без отдельного запроса; пустой slug подбирает Note.save.
+
+        Остальные уникальные поля проверяются, как в ModelForm:
+        без полей вне формы и полей, уже не прошедших проверку.
+        """
+        exclude = {
+            field.name for field in Note._meta.get_fields()
+            if field.name not in self.fields or field.name in self.errors
+        }
+        exclude.add('slug')
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except ValidationError as error:
+            self.add_error(None, error)
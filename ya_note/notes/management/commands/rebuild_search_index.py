@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from notes.models import Note
+from notes.search import index_notes
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс заметок пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch = []
+        count = 0
+        for note in Note.objects.order_by('pk').iterator():
+            batch.append(note)
+            if len(batch) >= options['batch_size']:
+                count += self.flush(batch)
+        count += self.flush(batch)
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано заметок: {count}')
+        )
+
+    def flush(self, batch):
+        with transaction.atomic():
+            index_notes(batch)
+        count = len(batch)
+        batch.clear()
+        return count
@@ -1,7 +1,12 @@
+from contextlib import nullcontext
+
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
+
+from .slugs import make_slug, next_free_slug
 
-from pytils.translit import slugify
+# Сколько раз подбирать новый адрес, если его заняли параллельно.
+SLUG_ATTEMPTS = 10
 
 
 class Note(models.Model):
@@ -27,12 +32,65 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    updated = models.DateTimeField('Изменена', auto_now=True)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+        )
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """
+        Сохраняет заметку; пустой slug получается из заголовка.
+
+        Занятость адреса проверяет уникальный индекс, а не отдельный
+        запрос перед записью. Для адреса из заголовка при конфликте
+        подбирается суффикс -2, -3…; заданный вручную занятый адрес
+        приводит к IntegrityError.
+        """
+        if self.slug:
+            with self._savepoint():
+                return super().save(*args, **kwargs)
+        max_slug_length = self._meta.get_field('slug').max_length
+        base = make_slug(self.title, max_slug_length)
+        # Сначала пробуем сам адрес: обычно он свободен.
+        self.slug = base
+        for attempt in range(SLUG_ATTEMPTS):
+            try:
+                with self._savepoint():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                if attempt + 1 == SLUG_ATTEMPTS:
+                    self.slug = ''
+                    raise
+            self.slug = next_free_slug(
+                Note.objects.all(), base, max_slug_length, spread=attempt
+            )
+
+    def _savepoint(self):
+        """
+        Точка сохранения, чтобы ошибка INSERT не ломала внешнюю
+        транзакцию; вне транзакции она не нужна.
+        """
+        if transaction.get_connection().in_atomic_block:
+            return transaction.atomic()
+        return nullcontext()
+
+
+class NoteTerm(models.Model):
+    """Запись обратного индекса поиска, если в SQLite нет FTS5."""
+    note = models.ForeignKey(Note, on_delete=models.CASCADE)
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+    term = models.CharField(max_length=100)
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'term'), name='noteterm_term_idx'),
+        )
@@ -0,0 +1,146 @@
+from collections import Counter
+
+from django.db import connection
+from django.db.models import Count, Sum
+
+from yacommon.stemming import tokenize
+
+from .models import Note, NoteTerm
+
+FTS_TABLE = 'notes_note_fts'
+TITLE_WEIGHT = 2
+_fts_tables = {}
+
+
+def fts_available():
+    """
+    Индекс FTS5 создаётся миграцией, только если SQLite его умеет.
+
+    Ответ запоминается для каждой базы, чтобы не читать схему
+    при каждом сохранении заметки.
+    """
+    if connection.vendor != 'sqlite':
+        return False
+    name = connection.settings_dict['NAME']
+    if name not in _fts_tables:
+        _fts_tables[name] = (
+            FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_tables[name]
+
+
+class Fts5Backend:
+    """
+    Индекс во встроенной в SQLite таблице FTS5 с ранжированием BM25.
+
+    rowid строки совпадает с id заметки, а автор хранится токеном
+    в отдельной колонке: обновление и отбор заметок автора идут
+    по индексу, а не перебором таблицы.
+    """
+
+    def index(self, notes, replace=True):
+        notes = list(notes)
+        if replace:
+            self.remove(note.pk for note in notes)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, author, title, text) '
+                'VALUES (%s, %s, %s, %s)',
+                [
+                    (note.pk, self.author_token(note.author_id),
+                     ' '.join(tokenize(note.title)),
+                     ' '.join(tokenize(note.text)))
+                    for note in notes
+                ],
+            )
+
+    def remove(self, note_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(note_id,) for note_id in note_ids],
+            )
+
+    def search(self, author_id, terms, limit, offset):
+        match = 'author:{} AND {{title text}}: ({})'.format(
+            self.author_token(author_id),
+            ' AND '.join('"{}"'.format(term) for term in terms),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}, 0, {TITLE_WEIGHT}, 1), rowid '
+                'LIMIT %s OFFSET %s',
+                (match, limit, offset),
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def author_token(self, author_id):
+        return f'u{author_id}'
+
+
+class InvertedIndexBackend:
+    """
+    Обратный индекс в обычной таблице NoteTerm, если FTS5 недоступен.
+
+    Вес термина — число его вхождений, в заголовке с коэффициентом
+    TITLE_WEIGHT; заметка должна содержать все термины запроса.
+    """
+
+    def index(self, notes, replace=True):
+        notes = list(notes)
+        if replace:
+            self.remove(note.pk for note in notes)
+        NoteTerm.objects.bulk_create(
+            NoteTerm(note=note, author_id=note.author_id,
+                     term=term, weight=weight)
+            for note in notes
+            for term, weight in self.weights(note).items()
+        )
+
+    def weights(self, note):
+        weights = Counter(tokenize(note.text))
+        for term in tokenize(note.title):
+            weights[term] += TITLE_WEIGHT
+        return weights
+
+    def remove(self, note_ids):
+        NoteTerm.objects.filter(note_id__in=list(note_ids)).delete()
+
+    def search(self, author_id, terms, limit, offset):
+        return list(
+            NoteTerm.objects.filter(
+                author_id=author_id, term__in=terms
+            ).values('note').annotate(
+                score=Sum('weight'), matched=Count('term')
+            ).filter(
+                matched=len(terms)
+            ).order_by('-score', 'note').values_list(
+                'note', flat=True
+            )[offset:offset + limit]
+        )
+
+
+def get_backend():
+    return Fts5Backend() if fts_available() else InvertedIndexBackend()
+
+
+def index_notes(notes, replace=True):
+    """Индексирует заметки; replace=False — для ещё не индексированных."""
+    get_backend().index(notes, replace=replace)
+
+
+def remove_notes(note_ids):
+    get_backend().remove(note_ids)
+
+
+def search_notes(author, query, limit, offset=0):
+    """Заметки автора по запросу, от самых подходящих."""
+    terms = sorted(set(tokenize(query)))
+    if not terms:
+        return []
+    note_ids = get_backend().search(author.pk, terms, limit, offset)
+    notes = Note.objects.filter(author=author).only(
+        'title', 'slug'
+    ).in_bulk(note_ids)
+    return [notes[note_id] for note_id in note_ids if note_id in notes]
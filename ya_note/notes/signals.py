@@ -0,0 +1,41 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Note
+from .search import index_notes, remove_notes
+
+# Заметки, удалённые внутри removing_in_batch().
+_removed = ContextVar('removed_notes', default=None)
+
+
+@contextmanager
+def removing_in_batch():
+    """
+    Заметки, удалённые в блоке, снимаются с индекса одним запросом
+    в конце, а не запросом на каждую.
+    """
+    removed = []
+    token = _removed.set(removed)
+    try:
+        yield
+    finally:
+        _removed.reset(token)
+    if removed:
+        remove_notes(removed)
+
+
+@receiver(post_save, sender=Note)
+def note_saved(sender, instance, created, **kwargs):
+    index_notes([instance], replace=not created)
+
+
+@receiver(post_delete, sender=Note)
+def note_deleted(sender, instance, **kwargs):
+    removed = _removed.get()
+    if removed is None:
+        remove_notes([instance.pk])
+    else:
+        removed.append(instance.pk)
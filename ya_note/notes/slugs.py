@@ -0,0 +1,132 @@
+import random
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import Q
+from pytils.translit import slugify
+
+# Сколько диапазонов base-* объединять в одном запросе: длинная цепочка
+# OR упирается в предел глубины выражения SQLite.
+SLUG_RANGES_PER_QUERY = 100
+
+
+def make_slug(title, max_length):
+    """
+    Адрес заметки из заголовка.
+
+    Транслитерация заметна в профиле записи, а заголовки повторяются,
+    поэтому результат запоминается. Пробелы по краям и внутри
+    заголовка на адрес не влияют и из ключа кэша убираются.
+    """
+    return _cached_slug(' '.join(title.split()), max_length)
+
+
+@lru_cache(maxsize=settings.NOTES_SLUG_CACHE_SIZE)
+def _cached_slug(title, max_length):
+    return slugify(title)[:max_length]
+
+
+def slug_cache_info():
+    """Попадания, промахи и размер кэша адресов."""
+    return _cached_slug.cache_info()
+
+
+def slug_cache_metrics():
+    """Показатели кэша адресов для снимка yacommon.perf."""
+    return slug_cache_info()._asdict()
+
+
+def slug_range(base):
+    """Условие на base и все base-*: диапазон уникального индекса."""
+    return Q(slug=base) | Q(slug__gt=base + '-', slug__lt=base + '.')
+
+
+def next_free_slug(queryset, base, max_length, spread=0):
+    """
+    Первый свободный адрес вида base, base-2, base-3…
+
+    Занятые варианты читаются одним запросом по диапазону уникального
+    индекса slug: все адреса base-* лежат в нём между 'base-' и 'base.'.
+    Свободный на момент запроса адрес может занять параллельный
+    запрос, поэтому вызывающий код полагается на уникальный индекс
+    и при конфликте просит адрес заново. Чтобы повторные попытки
+    параллельных запросов не выбирали снова один и тот же номер,
+    spread разносит их случайно по следующим spread номерам.
+    """
+    taken = set(
+        queryset.filter(slug_range(base)).values_list('slug', flat=True)
+    )
+    slug = free_slug(base, taken, max_length, spread)
+    if slug is None:
+        # Укороченная основа — уже другой адрес, её занятость
+        # проверяем заново.
+        suffix = '-{}'.format(suffix_number(base, taken, spread))
+        return next_free_slug(
+            queryset, base[:max_length - len(suffix)], max_length, spread
+        )
+    return slug
+
+
+def suffix_number(base, taken, spread=0):
+    suffix_pattern = re.compile(re.escape(base) + r'-(\d+)')
+    suffixes = [
+        int(match.group(1))
+        for match in map(suffix_pattern.fullmatch, taken) if match
+    ]
+    return max(suffixes, default=1) + 1 + random.randint(0, spread)
+
+
+def free_slug(base, taken, max_length, spread=0):
+    """
+    Свободный адрес по уже известному множеству занятых.
+
+    None, если адрес с номером не помещается в поле и основу
+    придётся укоротить.
+    """
+    if base not in taken:
+        return base
+    slug = '{}-{}'.format(base, suffix_number(base, taken, spread))
+    return slug if len(slug) <= max_length else None
+
+
+def assign_slugs(queryset, notes, max_length):
+    """
+    Адреса для пачки новых заметок без запроса на каждую.
+
+    Все адреса проверяются одним запросом slug IN (...). Только для
+    адресов из заголовков, которые уже заняты, вторым запросом
+    читаются их варианты с номерами. Возвращает словарь
+    {номер заметки в пачке: занятый адрес} для заданных вручную
+    адресов, которые заняты в базе или повторяются в пачке.
+    """
+    bases = {
+        index: make_slug(note.title, max_length)
+        for index, note in enumerate(notes) if not note.slug
+    }
+    taken = set(queryset.filter(
+        slug__in={note.slug for note in notes if note.slug}
+        | set(bases.values())
+    ).values_list('slug', flat=True))
+    conflicts = []
+    for index, note in enumerate(notes):
+        if not note.slug:
+            continue
+        if note.slug in taken:
+            conflicts.append(index)
+        taken.add(note.slug)
+    busy = sorted({base for base in bases.values() if base in taken})
+    for start in range(0, len(busy), SLUG_RANGES_PER_QUERY):
+        condition = Q()
+        for base in busy[start:start + SLUG_RANGES_PER_QUERY]:
+            condition |= slug_range(base)
+        taken.update(
+            queryset.filter(condition).values_list('slug', flat=True)
+        )
+    for index, base in bases.items():
+        slug = free_slug(base, taken, max_length)
+        if slug is None:
+            slug = next_free_slug(queryset, base, max_length)
+        notes[index].slug = slug
+        taken.add(slug)
+    return {index: notes[index].slug for index in conflicts}
@@ -0,0 +1,64 @@
+import asyncio
+from http import HTTPStatus
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TransactionTestCase, override_settings
+from django.urls import resolve, reverse
+
+from notes.models import Note
+
+User = get_user_model()
+
+
+@override_settings(ROOT_URLCONF='yanote.urls_async')
+class TestAsyncViews(TransactionTestCase):
+    """
+    Асинхронные страницы через ASGI-обработчик.
+
+    Запросы к базе идут из потоков пула со своими соединениями,
+    поэтому данные теста должны быть закоммичены.
+    """
+
+    def setUp(self):
+        self.author = User.objects.create(username='Автор')
+        self.reader = User.objects.create(username='Читатель')
+        self.note = Note.objects.create(
+            title='Заголовок', text='Текст', slug='note', author=self.author
+        )
+
+    def get(self, url, user=None):
+        client = AsyncClient()
+        if user is not None:
+            client.force_login(user)
+
+        async def request():
+            return await client.get(url)
+        return async_to_sync(request)()
+
+    def test_views_are_async(self):
+        for url in (reverse('notes:list'),
+                    reverse('notes:detail', args=(self.note.slug,))):
+            with self.subTest(url=url):
+                self.assertTrue(
+                    asyncio.iscoroutinefunction(resolve(url).func)
+                )
+
+    def test_list_and_detail(self):
+        response = self.get(reverse('notes:list'), self.author)
+        self.assertEqual(list(response.context['object_list']), [self.note])
+        response = self.get(
+            reverse('notes:detail', args=(self.note.slug,)), self.author
+        )
+        self.assertEqual(response.context['note'], self.note)
+
+    def test_only_author_and_only_logged_in(self):
+        url = reverse('notes:detail', args=(self.note.slug,))
+        self.assertEqual(
+            self.get(url, self.reader).status_code, HTTPStatus.NOT_FOUND
+        )
+        login_url = reverse('users:login')
+        self.assertRedirects(
+            self.get(url), f'{login_url}?next={url}',
+            fetch_redirect_response=False,
+        )
@@ -0,0 +1,121 @@
+import json
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from pytils.translit import slugify
+
+from notes.models import Note
+from notes.search import search_notes
+
+User = get_user_model()
+
+
+class TestBulkNotes(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.reader = User.objects.create(username='Читатель')
+        cls.foreign = Note.objects.create(
+            title='Чужая', text='Текст', slug='foreign', author=cls.reader
+        )
+        cls.create_url = reverse('notes:bulk_create')
+        cls.delete_url = reverse('notes:bulk_delete')
+        cls.export_url = reverse('notes:export')
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def post(self, url, data):
+        return self.client.post(
+            url, json.dumps(data), content_type='application/json'
+        )
+
+    def test_create_batch(self):
+        items = [
+            {'title': 'Покупки', 'text': 'Хлеб'},
+            {'title': 'Покупки', 'text': 'Молоко'},
+            {'title': 'Своя', 'text': 'Текст', 'slug': 'own'},
+        ]
+        response = self.post(self.create_url, items)
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        base = slugify('Покупки')
+        self.assertEqual(
+            response.json()['created'], [base, f'{base}-2', 'own']
+        )
+        self.assertEqual(Note.objects.filter(author=self.author).count(), 3)
+        self.assertEqual(
+            [note.slug for note in search_notes(self.author, 'молоко', 10)],
+            [f'{base}-2']
+        )
+
+    def test_query_count_does_not_grow_with_batch(self):
+        # Сессия, пользователь, проверка адресов, вставка двумя пачками
+        # (в SQLite не больше 999 параметров на запрос), id для индекса,
+        # индекс и SAVEPOINT с RELEASE вокруг записи.
+        items = [
+            {'title': f'Заметка {index}', 'text': 'Текст'}
+            for index in range(200)
+        ]
+        with self.assertNumQueries(9):
+            response = self.post(self.create_url, items)
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+
+    def test_batch_is_all_or_nothing(self):
+        items = [
+            {'title': 'Новая', 'text': 'Текст'},
+            {'title': 'Занятый адрес', 'text': 'Текст', 'slug': 'foreign'},
+            {'title': 'Повтор', 'text': 'Текст', 'slug': 'twice'},
+            {'title': 'Повтор', 'text': 'Текст', 'slug': 'twice'},
+            {'title': 'Без текста'},
+        ]
+        response = self.post(self.create_url, items)
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(
+            sorted(response.json()['errors']), ['1', '3', '4']
+        )
+        self.assertFalse(Note.objects.filter(author=self.author).exists())
+
+    def test_bad_payload(self):
+        for body in ('не json', '{}', json.dumps([{}] * 501)):
+            with self.subTest(body=body[:10]):
+                response = self.client.post(
+                    self.create_url, body, content_type='application/json'
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.BAD_REQUEST
+                )
+
+    def test_delete_only_own_notes(self):
+        Note.objects.create(
+            title='Моя', text='Текст', slug='mine', author=self.author
+        )
+        response = self.post(
+            self.delete_url, {'slugs': ['mine', 'foreign', 'missing']}
+        )
+        self.assertEqual(response.json(), {'deleted': 1})
+        self.assertFalse(Note.objects.filter(slug='mine').exists())
+        self.assertTrue(Note.objects.filter(slug='foreign').exists())
+
+    def test_export_streams_own_notes(self):
+        self.post(self.create_url, [
+            {'title': f'Заметка {index}', 'text': 'Текст'}
+            for index in range(3)
+        ])
+        response = self.client.get(self.export_url)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        notes = [json.loads(line) for line in lines]
+        self.assertEqual(
+            [note['title'] for note in notes],
+            [f'Заметка {index}' for index in range(3)]
+        )
+
+    def test_anonymous_redirected(self):
+        self.client.logout()
+        for url in (self.create_url, self.delete_url, self.export_url):
+            with self.subTest(url=url):
+                response = self.client.post(url)
+                self.assertEqual(response.status_code, HTTPStatus.FOUND)
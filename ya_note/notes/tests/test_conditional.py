@@ -0,0 +1,51 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from notes.models import Note
+
+User = get_user_model()
+
+
+class TestConditionalGet(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.note = Note.objects.create(
+            title='Заголовок', text='Текст', slug='note', author=cls.author
+        )
+        cls.url = reverse('notes:detail', args=(cls.note.slug,))
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def test_repeat_visit_is_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertFalse(response.has_header('Last-Modified'))
+        # Сессия, пользователь и время изменения заметки.
+        with self.assertNumQueries(3):
+            repeat = self.client.get(
+                self.url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        self.assertEqual(repeat.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_edit_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.post(
+            reverse('notes:edit', args=(self.note.slug,)),
+            {'title': 'Правка', 'text': 'Текст', 'slug': self.note.slug},
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'Правка')
+
+    def test_missing_note_is_not_found(self):
+        response = self.client.get(
+            reverse('notes:detail', args=('missing',)),
+            HTTP_IF_NONE_MATCH='*',
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
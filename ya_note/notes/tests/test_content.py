@@ -1,3 +1,6 @@
+from http import HTTPStatus
+
+from django.conf import settings
 from django.test import TestCase
 from django.urls import reverse
 from notes.models import Note
@@ -43,3 +46,50 @@ class TestHomePage(TestCase):
                 self.assertIn('form', response.context)
                 response = self.client.get(self.edit_url)
                 self.assertIn('form', response.context)
+
+
+class TestNotesListPagination(TestCase):
+    NOTES_COUNT = 45
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        Note.objects.bulk_create(
+            Note(title=f'Заметка {index}', text='Длинный текст ' * 100,
+                 slug=f'note-{index}', author=cls.author)
+            for index in range(cls.NOTES_COUNT)
+        )
+        cls.list_url = reverse('notes:list')
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def test_pages_cover_all_notes(self):
+        seen = []
+        params = {}
+        while True:
+            page = self.client.get(self.list_url, params).context['page']
+            self.assertLessEqual(len(page), settings.NOTES_COUNT_ON_LIST_PAGE)
+            seen.extend(note.pk for note in page)
+            if page.next_cursor is None:
+                break
+            params = {'after': page.next_cursor}
+        self.assertEqual(
+            seen,
+            list(Note.objects.order_by('pk').values_list('pk', flat=True))
+        )
+        previous = self.client.get(
+            self.list_url, {'before': page.previous_cursor}
+        ).context['page']
+        self.assertEqual(
+            previous.object_list[-1].pk, page.object_list[0].pk - 1
+        )
+
+    def test_list_does_not_load_text(self):
+        response = self.client.get(self.list_url)
+        for note in response.context['object_list']:
+            self.assertIn('text', note.get_deferred_fields())
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.list_url, {'after': 'abc'})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
@@ -0,0 +1,61 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from notes.models import Note
+from yacommon import perf
+
+User = get_user_model()
+
+
+class TestPerformanceStats(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.staff = User.objects.create(username='Админ', is_staff=True)
+        Note.objects.bulk_create(
+            Note(title=f'Заметка {index}', text='Текст',
+                 slug=f'note-{index}', author=cls.author)
+            for index in range(10)
+        )
+
+    def setUp(self):
+        perf.registry.reset()
+
+    def test_list_is_recorded_without_n_plus_one(self):
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('notes:list'))
+        stats = perf.registry.snapshot()['views']['notes:list']
+        self.assertEqual(stats['requests'], 1)
+        self.assertGreater(stats['queries']['max'], 0)
+        self.assertGreater(stats['template_ms']['max'], 0)
+        self.assertEqual(
+            stats['response_bytes']['max'], len(response.content)
+        )
+        self.assertEqual(stats['n_plus_one'], [])
+
+    def test_stats_only_for_staff(self):
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('perf'))
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('perf'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn('perf', response.json()['views'])
+        response = self.client.post(reverse('perf'), {'reset': 1})
+        self.assertEqual(response.json()['views'], {})
+
+    def test_slug_cache_is_shown_to_staff(self):
+        self.client.force_login(self.staff)
+        self.client.post(reverse('notes:add'), {
+            'title': 'Новая заметка', 'text': 'Текст', 'slug': ''
+        })
+        gauges = self.client.get(reverse('perf')).json()['gauges']
+        self.assertEqual(
+            set(gauges['slug_cache']),
+            {'hits', 'misses', 'maxsize', 'currsize'},
+        )
+        self.assertGreater(gauges['slug_cache']['currsize'], 0)
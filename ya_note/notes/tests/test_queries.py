@@ -0,0 +1,69 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from notes.models import Note
+
+User = get_user_model()
+# Пачка из нескольких заметок: запрос на каждую заметку будет заметен.
+BULK_SIZE = 10
+
+
+class TestQueryCount(TestCase):
+    """Минимальное число запросов к базе для каждого адреса notes.urls."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.note = Note.objects.create(title='Заголовок',
+                                       text='Текст',
+                                       slug='slug',
+                                       author=cls.author)
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def test_query_count(self):
+        # Два запроса любой страницы уходят на сессию и пользователя.
+        slug = (self.note.slug,)
+        bulk = [
+            {'title': f'Пачка {index}', 'text': 'Т', 'slug': f'bulk-{index}'}
+            for index in range(BULK_SIZE)
+        ]
+        cases = (
+            ('get', 'notes:home', None, None, 2),
+            ('get', 'notes:list', None, None, 3),
+            ('get', 'notes:add', None, None, 2),
+            # Сохранение и удаление заметки обновляют поисковый индекс.
+            # Внутри транзакции теста запись заметки идёт через SAVEPOINT
+            # и RELEASE; вне транзакции этих двух запросов нет.
+            ('post', 'notes:add', None, {'title': 'Новая', 'text': 'Т'}, 6),
+            # Заметка начинается с чтения времени изменения для ответа 304.
+            ('get', 'notes:detail', slug, None, 4),
+            ('get', 'notes:edit', slug, None, 3),
+            ('post', 'notes:edit', slug,
+             {'title': 'Правка', 'text': 'Т', 'slug': 'slug'}, 8),
+            ('get', 'notes:delete', slug, None, 3),
+            ('get', 'notes:success', None, None, 2),
+            ('get', 'notes:search', None, {'q': 'правка'}, 4),
+            ('post', 'notes:delete', slug, None, 6),
+            # Адреса пачки проверяются одним запросом, id новых заметок
+            # читаются одним запросом, индекс пополняется одним.
+            ('post', 'notes:bulk_create', None, json.dumps(bulk), 8),
+            ('post', 'notes:bulk_delete', None,
+             json.dumps({'slugs': [note['slug'] for note in bulk]}), 8),
+            ('get', 'notes:export', None, None, 3),
+        )
+        for method, name, args, data, expected in cases:
+            with self.subTest(method=method, name=name):
+                url = reverse(name, args=args)
+                kwargs = {'data': data}
+                if isinstance(data, str):
+                    kwargs['content_type'] = 'application/json'
+                with self.assertNumQueries(expected):
+                    response = getattr(self.client, method)(url, **kwargs)
+                    if response.streaming:
+                        # Запросы выгрузки идут при чтении ответа.
+                        b''.join(response.streaming_content)
@@ -0,0 +1,69 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from notes.models import Note
+from yacommon.middleware import PIN_COOKIE
+
+User = get_user_model()
+
+
+class TestReplicaRouting(TransactionTestCase):
+    """Основная база и реплика — два файла SQLite."""
+
+    def setUp(self):
+        self.author = User.objects.create(username='Автор')
+        Note.objects.create(
+            title='Старая', text='Текст', slug='old', author=self.author
+        )
+        self.writer = Client()
+        self.writer.force_login(self.author)
+        self.reader = Client()
+        self.reader.force_login(self.author)
+        # Реплика — снимок основной базы, дальше она не обновляется.
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        replica_path = Path(directory.name) / 'replica.sqlite3'
+        primary = connections['default']
+        primary.ensure_connection()
+        replica = sqlite3.connect(replica_path)
+        primary.connection.backup(replica)
+        replica.close()
+        connections.databases['replica'] = {
+            'ENGINE': 'yacommon.backends.sqlite3', 'NAME': replica_path,
+        }
+        self.addCleanup(self.remove_replica)
+        replicas = override_settings(
+            DATABASE_REPLICAS=['replica'], REPLICA_PIN_SECONDS=5
+        )
+        replicas.enable()
+        self.addCleanup(replicas.disable)
+
+    def remove_replica(self):
+        connections['replica'].close()
+        del connections['replica']
+        del connections.databases['replica']
+
+    def titles(self, client):
+        response = client.get(reverse('notes:list'))
+        return {note.title for note in response.context['object_list']}
+
+    def test_reads_go_to_replica(self):
+        Note.objects.create(
+            title='Новая', text='Текст', slug='new', author=self.author
+        )
+        self.assertEqual(self.titles(self.reader), {'Старая'})
+
+    def test_writer_is_pinned_to_primary(self):
+        response = self.writer.post(
+            reverse('notes:add'), {'title': 'Новая', 'text': 'Текст'}
+        )
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 5)
+        self.assertEqual(self.titles(self.writer), {'Старая', 'Новая'})
+        self.assertEqual(self.titles(self.reader), {'Старая'})
+        self.assertNotIn(PIN_COOKIE, self.reader.cookies)
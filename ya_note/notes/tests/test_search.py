@@ -0,0 +1,126 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from notes import search
+from notes.models import Note, NoteTerm
+from yacommon.stemming import stem
+
+User = get_user_model()
+
+
+class TestStem(TestCase):
+
+    def test_word_forms_share_stem(self):
+        forms = ('заметка', 'заметки', 'заметкой', 'Заметкам')
+        self.assertEqual(len({stem(word) for word in forms}), 1)
+
+    def test_short_words_kept(self):
+        self.assertEqual(stem('он'), 'он')
+
+
+class SearchMixin:
+    """Одни и те же проверки для обоих способов хранения индекса."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.reader = User.objects.create(username='Читатель')
+        cls.in_title = Note.objects.create(
+            title='Покупки', text='Молоко и хлеб',
+            slug='shopping', author=cls.author
+        )
+        cls.in_text = Note.objects.create(
+            title='Дела', text='Сходить за покупками',
+            slug='todo', author=cls.author
+        )
+        cls.foreign = Note.objects.create(
+            title='Покупка', text='Чужая заметка',
+            slug='foreign', author=cls.reader
+        )
+
+    def search(self, query, user=None):
+        return search.search_notes(user or self.author, query, limit=10)
+
+    def test_title_match_ranks_higher(self):
+        self.assertEqual(self.search('покупки'), [self.in_title, self.in_text])
+
+    def test_only_author_notes_found(self):
+        self.assertNotIn(self.foreign, self.search('покупка'))
+        self.assertEqual(self.search('покупка', self.reader), [self.foreign])
+
+    def test_all_terms_required(self):
+        self.assertEqual(self.search('покупки хлеб'), [self.in_title])
+        self.assertEqual(self.search('хлеб сыр'), [])
+
+    def test_index_follows_edit_and_delete(self):
+        self.in_text.text = 'Купить сыр'
+        self.in_text.save()
+        self.assertEqual(self.search('сыр'), [self.in_text])
+        self.assertEqual(self.search('покупки'), [self.in_title])
+        self.in_title.delete()
+        self.assertEqual(self.search('покупки'), [])
+
+    def test_rebuild_command(self):
+        search.remove_notes(Note.objects.values_list('pk', flat=True))
+        self.assertEqual(self.search('покупки'), [])
+        call_command('rebuild_search_index', stdout=mock.Mock())
+        self.assertEqual(self.search('покупки'), [self.in_title, self.in_text])
+
+
+class TestFts5Search(SearchMixin, TestCase):
+
+    def test_backend(self):
+        self.assertIsInstance(search.get_backend(), search.Fts5Backend)
+
+
+class TestInvertedIndexSearch(SearchMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        with mock.patch.object(search, 'fts_available', return_value=False):
+            super().setUpTestData()
+
+    def setUp(self):
+        patcher = mock.patch.object(
+            search, 'fts_available', return_value=False
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_backend(self):
+        self.assertIsInstance(search.get_backend(),
+                              search.InvertedIndexBackend)
+        self.assertTrue(NoteTerm.objects.filter(note=self.in_title).exists())
+
+
+class TestSearchPage(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        Note.objects.bulk_create(
+            Note(title=f'Заметка {index}', text='Текст',
+                 slug=f'note-{index}', author=cls.author)
+            for index in range(25)
+        )
+        call_command('rebuild_search_index', stdout=mock.Mock())
+        cls.url = reverse('notes:search')
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def test_results_paginated(self):
+        first = self.client.get(self.url, {'q': 'заметки'}).context
+        second = self.client.get(self.url, {'q': 'заметки', 'page': 2}).context
+        self.assertTrue(first['has_next'])
+        self.assertFalse(second['has_next'])
+        found = list(first['object_list']) + list(second['object_list'])
+        self.assertEqual(len(set(found)), 25)
+
+    def test_empty_query(self):
+        response = self.client.get(self.url)
+        self.assertEqual(list(response.context['object_list']), [])
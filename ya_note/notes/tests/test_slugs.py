@@ -0,0 +1,118 @@
+import threading
+import time
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+from pytils.translit import slugify
+
+from notes.models import Note
+from notes.slugs import make_slug, slug_cache_info
+
+User = get_user_model()
+
+
+class TestSlugAllocation(TestCase):
+    TITLE = 'Заголовок'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+
+    def create(self, title=TITLE, slug=''):
+        return Note.objects.create(
+            title=title, text='Текст', slug=slug, author=self.author
+        )
+
+    def test_suffixes_for_same_title(self):
+        base = slugify(self.TITLE)
+        slugs = [self.create().slug for _ in range(3)]
+        self.assertEqual(slugs, [base, f'{base}-2', f'{base}-3'])
+
+    def test_suffix_after_largest_taken(self):
+        base = slugify(self.TITLE)
+        self.create(slug=base)
+        self.create(slug=f'{base}-9')
+        self.create(slug=f'{base}-abc')
+        self.assertEqual(self.create().slug, f'{base}-10')
+
+    def test_long_title_fits_field(self):
+        title = 'Заметка ' * 20
+        slugs = {self.create(title).slug for _ in range(3)}
+        self.assertEqual(len(slugs), 3)
+        for slug in slugs:
+            self.assertLessEqual(len(slug), 100)
+
+    def test_taken_manual_slug_is_form_error(self):
+        self.create(slug='taken')
+        self.client.force_login(self.author)
+        with self.assertNumQueries(6):
+            response = self.client.post(
+                reverse('notes:add'),
+                {'title': 'Другой', 'text': 'Текст', 'slug': 'taken'},
+            )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn('slug', response.context['form'].errors)
+
+
+class TestMakeSlug(TestCase):
+
+    def test_same_as_slugify(self):
+        for title in ('Заголовок', 'Ёжик в тумане!', 'Ж' * 100, 'a_b c-d'):
+            with self.subTest(title=title):
+                self.assertEqual(make_slug(title, 100), slugify(title)[:100])
+
+    def test_spaces_share_cache_entry(self):
+        make_slug('Список покупок', 100)
+        hits = slug_cache_info().hits
+        self.assertEqual(
+            make_slug('  Список   покупок ', 100), slugify('Список покупок')
+        )
+        self.assertEqual(slug_cache_info().hits, hits + 1)
+
+
+class TestConcurrentSlugs(TransactionTestCase):
+    THREADS = 8
+    NOTES_PER_THREAD = 5
+
+    def test_same_title_from_many_threads(self):
+        users = [
+            User.objects.create(username=f'Автор {index}')
+            for index in range(self.THREADS)
+        ]
+        statuses = []
+        timings = []
+        barrier = threading.Barrier(self.THREADS)
+
+        def create_notes(user):
+            client = Client()
+            client.force_login(user)
+            barrier.wait()
+            try:
+                for _ in range(self.NOTES_PER_THREAD):
+                    started = time.monotonic()
+                    response = client.post(
+                        reverse('notes:add'),
+                        {'title': 'Одинаковый заголовок', 'text': 'Текст'},
+                    )
+                    timings.append(time.monotonic() - started)
+                    statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=create_notes, args=(user,))
+            for user in users
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        total = self.THREADS * self.NOTES_PER_THREAD
+        self.assertEqual(statuses, [HTTPStatus.FOUND] * total)
+        slugs = set(Note.objects.values_list('slug', flat=True))
+        self.assertEqual(len(slugs), total)
+        self.assertLess(max(timings), 5)
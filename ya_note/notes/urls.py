@@ -11,5 +11,13 @@ urlpatterns = [
     path('note/<slug:slug>/', views.NoteDetail.as_view(), name='detail'),
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
     path('notes/', views.NotesList.as_view(), name='list'),
+    path('notes/bulk/', views.NoteBulkCreate.as_view(), name='bulk_create'),
+    path(
+        'notes/bulk/delete/',
+        views.NoteBulkDelete.as_view(),
+        name='bulk_delete'
+    ),
+    path('notes/export/', views.NoteExport.as_view(), name='export'),
+    path('search/', views.NoteSearch.as_view(), name='search'),
     path('done/', views.NoteSuccess.as_view(), name='success'),
 ]
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from notes import async_views, urls
+
+app_name = urls.app_name
+
+# Асинхронные страницы стоят первыми и перекрывают синхронные.
+urlpatterns = [
+    path('notes/', async_views.notes_list, name='list'),
+    path('note/<slug:slug>/', async_views.note_detail, name='detail'),
+    *urls.urlpatterns,
+]
@@ -1,9 +1,22 @@
+import json
+from http import HTTPStatus
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import IntegrityError, transaction
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views import generic
 
-from .forms import NoteForm
+from yacommon.http import conditional_page
+from yacommon.pagination import paginate_by_pk
+
+from .forms import WARNING, NoteForm
 from .models import Note
+from .search import index_notes, search_notes
+from .signals import removing_in_batch
+from .slugs import assign_slugs
 
 
 class Home(generic.TemplateView):
@@ -26,22 +39,30 @@ class NoteBase(LoginRequiredMixin):
         return self.model.objects.filter(author=self.request.user)
 
 
-class NoteCreate(NoteBase, generic.CreateView):
-    """Добавление заметки."""
+class NoteFormBase(NoteBase):
+    """Базовый класс для создания и редактирования заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        """Занятый адрес показываем как ошибку формы, а не как 500."""
+        try:
+            return super().form_valid(form)
+        except IntegrityError:
+            form.add_slug_conflict()
+            return self.form_invalid(form)
+
+
+class NoteCreate(NoteFormBase, generic.CreateView):
+    """Добавление заметки."""
+
+    def form_valid(self, form):
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+class NoteUpdate(NoteFormBase, generic.UpdateView):
     """Редактирование заметки."""
-    template_name = 'notes/form.html'
-    form_class = NoteForm
 
 
 class NoteDelete(NoteBase, generic.DeleteView):
@@ -53,7 +74,207 @@ class NotesList(NoteBase, generic.ListView):
     """Список всех заметок пользователя."""
     template_name = 'notes/list.html'
 
+    def get_queryset(self):
+        """
+        Одна страница заметок, начиная с переданного курсора.
+
+        Текст заметки в списке не нужен, он загружается в NoteDetail.
+        """
+        self.page = paginate_by_pk(
+            super().get_queryset().only('title', 'slug'),
+            settings.NOTES_COUNT_ON_LIST_PAGE,
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before'),
+        )
+        return self.page.object_list
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page'] = self.page
+        return context
+
+
+class NoteSearch(NoteBase, generic.ListView):
+    """Поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_queryset(self):
+        """
+        Страница результатов по убыванию релевантности.
+
+        Из индекса берётся на одну заметку больше страницы,
+        чтобы узнать, есть ли следующая.
+        """
+        self.query = self.request.GET.get('q', '').strip()
+        try:
+            self.page_number = max(int(self.request.GET.get('page', 1)), 1)
+        except ValueError:
+            raise Http404('Неверный номер страницы.')
+        per_page = settings.NOTES_COUNT_ON_LIST_PAGE
+        notes = search_notes(
+            self.request.user, self.query, per_page + 1,
+            offset=(self.page_number - 1) * per_page,
+        )
+        self.has_next = len(notes) > per_page
+        return notes[:per_page]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(
+            query=self.query,
+            page_number=self.page_number,
+            has_next=self.has_next,
+        )
+        return context
+
+
+def note_updated(request, slug):
+    """Время изменения заметки автора, без загрузки самой заметки."""
+    if not request.user.is_authenticated:
+        return None
+    return Note.objects.filter(
+        author=request.user, slug=slug
+    ).values_list('updated', flat=True).first()
 
+
+@method_decorator(conditional_page(note_updated), name='dispatch')
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+
+class BadJson(Exception):
+    """Тело запроса не подходит для пакетной операции."""
+
+
+class NoteBulkBase(NoteBase, generic.View):
+    """Базовый класс пакетных операций с заметками в JSON."""
+
+    def read_items(self, key=None):
+        """
+        Список из тела запроса: сам массив или значение поля key.
+
+        Размер пачки ограничен NOTES_BULK_MAX_SIZE.
+        """
+        try:
+            data = json.loads(self.request.body)
+        except ValueError:
+            raise BadJson('Тело запроса — не JSON.')
+        if key is not None:
+            data = data.get(key) if isinstance(data, dict) else None
+        if not isinstance(data, list):
+            raise BadJson('Ожидается JSON-массив.')
+        if len(data) > settings.NOTES_BULK_MAX_SIZE:
+            raise BadJson(
+                f'Не больше {settings.NOTES_BULK_MAX_SIZE} записей за раз.'
+            )
+        return data
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except BadJson as error:
+            return JsonResponse(
+                {'error': str(error)}, status=HTTPStatus.BAD_REQUEST
+            )
+
+
+class NoteBulkCreate(NoteBulkBase):
+    """
+    Создание пачки заметок: [{"title": ..., "text": ..., "slug": ...}].
+
+    Поля проверяются формой NoteForm, адреса всей пачки — одним
+    запросом к базе, заметки вставляются одним bulk_create. Пачка
+    создаётся целиком или не создаётся совсем.
+    """
+
+    def post(self, request, *args, **kwargs):
+        notes = []
+        errors = {}
+        for index, item in enumerate(self.read_items()):
+            form = NoteForm(data=item if isinstance(item, dict) else {})
+            if form.is_valid():
+                form.instance.author = request.user
+                notes.append((index, form.instance))
+            else:
+                errors[index] = {
+                    field: list(messages)
+                    for field, messages in form.errors.items()
+                }
+        conflicts = assign_slugs(
+            Note.objects.all(),
+            [note for _, note in notes],
+            Note._meta.get_field('slug').max_length,
+        )
+        for position, slug in conflicts.items():
+            errors[notes[position][0]] = {'slug': [slug + WARNING]}
+        if errors:
+            return JsonResponse(
+                {'errors': errors}, status=HTTPStatus.BAD_REQUEST
+            )
+        notes = [note for _, note in notes]
+        try:
+            with transaction.atomic():
+                self.create(notes)
+        except IntegrityError:
+            # Адрес успели занять между проверкой и вставкой.
+            return JsonResponse(
+                {'error': 'Адреса заметок заняты, повторите запрос.'},
+                status=HTTPStatus.CONFLICT,
+            )
+        return JsonResponse(
+            {'created': [note.slug for note in notes]},
+            status=HTTPStatus.CREATED,
+        )
+
+    def create(self, notes):
+        Note.objects.bulk_create(notes)
+        if any(note.pk is None for note in notes):
+            # SQLite не возвращает id из bulk_create, а они нужны индексу.
+            pks = dict(
+                self.get_queryset().filter(
+                    slug__in=[note.slug for note in notes]
+                ).values_list('slug', 'pk')
+            )
+            for note in notes:
+                note.pk = pks[note.slug]
+        # bulk_create не посылает post_save, индексируем сами.
+        index_notes(notes, replace=False)
+
+
+class NoteBulkDelete(NoteBulkBase):
+    """Удаление заметок пользователя по списку адресов: {"slugs": [...]}."""
+
+    def post(self, request, *args, **kwargs):
+        slugs = [str(slug) for slug in self.read_items('slugs')]
+        with transaction.atomic(), removing_in_batch():
+            _, deleted = self.get_queryset().filter(slug__in=slugs).delete()
+        return JsonResponse({'deleted': deleted.get(Note._meta.label, 0)})
+
+
+class NoteExport(NoteBase, generic.View):
+    """
+    Все заметки пользователя в NDJSON, по строке на заметку.
+
+    Ответ отдаётся потоком, заметки читаются из базы порциями,
+    поэтому память не растёт с числом заметок.
+    """
+
+    def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(
+            self.lines(), content_type='application/x-ndjson'
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="notes.ndjson"'
+        )
+        return response
+
+    def lines(self):
+        rows = self.get_queryset().order_by('pk').values_list(
+            'title', 'text', 'slug'
+        ).iterator(chunk_size=settings.NOTES_EXPORT_CHUNK_SIZE)
+        for title, text, slug in rows:
+            yield json.dumps(
+                {'title': title, 'text': text, 'slug': slug},
+                ensure_ascii=False,
+            ) + '\n'
@@ -1,9 +1,15 @@
+import os
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Общий для обоих проектов код лежит в корне репозитория.
+sys.path.append(str(BASE_DIR.parent))
+from yacommon.db import database_config, replica_aliases  # noqa: E402
+
 SECRET_KEY = 'django-insecure-yipnj$#j!ajarq%k55z4kuf3x79)91h0h42o9!1ho(z=!%mt=#'
 
 DEBUG = False
@@ -22,7 +28,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yacommon.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'yacommon.middleware.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -31,11 +39,13 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'yanote.urls'
+# asgi.py подставляет yanote.urls_async с асинхронными страницами чтения.
+ROOT_URLCONF = os.environ.get('YANOTE_URLCONF', 'yanote.urls')
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Как DjangoTemplates, но с замером рендера для PerformanceMiddleware.
+        'BACKEND': 'yacommon.templates.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -52,12 +62,20 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# База задаётся переменной YANOTE_DATABASE_URL, см. yacommon.db.
+DATABASES = database_config('YANOTE', BASE_DIR / 'db.sqlite3')
+# Реплики для чтения — переменная YANOTE_REPLICA_URLS.
+DATABASE_REPLICAS = replica_aliases(DATABASES)
+DATABASE_ROUTERS = ['yacommon.routers.ReplicaRouter']
+# Сколько секунд после записи пользователь читает из основной базы.
+REPLICA_PIN_SECONDS = 5
+# Потоки для запросов к базе из асинхронных представлений, см. yacommon.aio.
+ASYNC_DB_THREADS = 32
+if DATABASES['default']['ENGINE'] == 'yacommon.backends.sqlite3':
+    # Тестовая база в файле, а не в общей памяти: там параллельные
+    # записи из потоков сразу падают с «table is locked», а не ждут.
+    # Воркеры xdist получают свои файлы test_db.sqlite3_gw<N>.
+    DATABASES['default']['TEST'] = {'NAME': BASE_DIR / 'test_db.sqlite3'}
 
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -87,3 +105,18 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_COUNT_ON_LIST_PAGE = 20
+
+# Сколько адресов, полученных из заголовков, держать в памяти.
+NOTES_SLUG_CACHE_SIZE = 4096
+
+# Пакетные операции: SQLite до 3.32 принимает не больше 999 параметров
+# в запросе, а адреса пачки проверяются одним slug IN (...).
+NOTES_BULK_MAX_SIZE = 500
+NOTES_EXPORT_CHUNK_SIZE = 2000
+
+# Замеры запросов по представлениям: /admin/perf/ для персонала.
+PERF_ENABLED = os.environ.get('YANOTE_PERF', '1') == '1'
+# Столько одинаковых запросов в одном HTTP-запросе считаются N+1.
+PERF_N_PLUS_ONE_THRESHOLD = 5
@@ -4,8 +4,11 @@ from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path
 from django.views.generic import CreateView
 
+from yacommon.views import perf_stats
+
 urlpatterns = [
     path('', include('notes.urls')),
+    path('admin/perf/', perf_stats, name='perf'),
     path('admin/', admin.site.urls),
 ]
 
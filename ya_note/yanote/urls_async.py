@@ -0,0 +1,10 @@
+"""Адреса для ASGI: страницы чтения заметок — асинхронные."""
+from django.urls import include, path
+
+from yanote import urls
+
+urlpatterns = [
+    path('', include('notes.urls_async'))
+    if getattr(pattern, 'app_name', None) == 'notes' else pattern
+    for pattern in urls.urlpatterns
+]
@@ -0,0 +1,67 @@
+"""
+Запросы к базе из асинхронных представлений.
+
+У ORM в Django 3.2 нет асинхронных методов (aget, acount и т. п.
+появились в 4.1), поэтому синхронный код с запросами выполняется
+в отдельном пуле потоков, а корутина представления его ждёт, не
+занимая поток. Размер пула — настройка ASYNC_DB_THREADS.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from threading import Lock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = None
+_executor_lock = Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_DB_THREADS,
+                thread_name_prefix='db',
+            )
+    return _executor
+
+
+def database_sync_to_async(func):
+    """
+    Обёртка синхронной функции с запросами для await.
+
+    В отличие от sync_to_async по умолчанию независимые вызовы идут
+    параллельно в потоках пула, а не по очереди в одном потоке.
+    Соединения потоков закрываются по CONN_MAX_AGE, как после
+    обычного запроса.
+    """
+    @wraps(func)
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await sync_to_async(
+            run, thread_sensitive=False, executor=get_executor()
+        )(*args, **kwargs)
+
+    return wrapper
+
+
+@database_sync_to_async
+def load_user(request):
+    """
+    Загружает request.user: сессия и пользователь читаются из базы.
+
+    Дальше пользователь и сессия доступны в корутине без запросов.
+    """
+    # Обращение к атрибуту загружает ленивый объект пользователя.
+    request.user.is_authenticated
+    return request.user
@@ -0,0 +1,143 @@
+import threading
+
+import psycopg2
+from django.db.backends.postgresql import base
+from psycopg2 import extras, pool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class BlockingConnectionPool:
+    """
+    ThreadedConnectionPool, в котором поток ждёт свободного соединения.
+
+    psycopg2 при занятых max_size соединениях сразу бросает PoolError;
+    здесь поток ждёт до timeout секунд, и только потом получает
+    PoolError с понятным сообщением.
+    """
+
+    def __init__(self, min_size, max_size, timeout, **conn_params):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._pool = pool.ThreadedConnectionPool(
+            min_size, max_size, **conn_params
+        )
+
+    def getconn(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise pool.PoolError(
+                f'Пул соединений исчерпан: все {self.max_size} заняты '
+                f'дольше {self.timeout:g} с.'
+            )
+        try:
+            return self._pool.getconn()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def putconn(self, connection, close=False):
+        try:
+            self._pool.putconn(connection, close=close)
+        finally:
+            self._slots.release()
+
+
+def is_alive(connection):
+    """SELECT 1 на соединении из пула; транзакция проверки откатывается."""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        if not connection.autocommit:
+            connection.rollback()
+    except psycopg2.Error:
+        return False
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL с проверкой соединения и необязательным пулом.
+
+    HEALTH_CHECKS: перед первым запросом к базе в каждом HTTP-запросе
+    постоянное соединение (CONN_MAX_AGE > 0) проверяется SELECT 1
+    и при обрыве открывается заново, а не падает на запросе приложения.
+    Соединение из пула проверяется так же сразу после выдачи.
+
+    POOL: соединения берутся из общего для процесса пула
+    BlockingConnectionPool и возвращаются в него при закрытии,
+    вместо того чтобы открываться на каждый HTTP-запрос.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+
+    def get_new_connection(self, conn_params):
+        connection_pool = self.get_pool(conn_params)
+        if connection_pool is None:
+            return super().get_new_connection(conn_params)
+        connection = self.checkout(connection_pool)
+        # То же, что делает базовый класс после psycopg2.connect().
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = options.get(
+            'isolation_level', connection.isolation_level
+        )
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda value: value
+        )
+        return connection
+
+    def checkout(self, connection_pool):
+        """
+        Соединение из пула; оборванные закрываются, берётся следующее.
+
+        Попыток на одну больше размера пула: даже если умерли все
+        соединения в пуле, последнее будет открыто заново.
+        """
+        check = self.settings_dict.get('HEALTH_CHECKS')
+        for _ in range(connection_pool.max_size + 1):
+            connection = connection_pool.getconn()
+            if not connection.closed and (not check or is_alive(connection)):
+                return connection
+            connection_pool.putconn(connection, close=True)
+        raise pool.PoolError('Не удалось получить живое соединение из пула.')
+
+    def get_pool(self, conn_params):
+        settings = self.settings_dict.get('POOL')
+        if not settings:
+            return None
+        with _pools_lock:
+            if self.alias not in _pools:
+                _pools[self.alias] = BlockingConnectionPool(
+                    settings['min_size'], settings['max_size'],
+                    settings.get('timeout', 30), **conn_params
+                )
+            return _pools[self.alias]
+
+    def _close(self):
+        connection_pool = _pools.get(self.alias)
+        if connection_pool is None or self.connection is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            broken = bool(self.connection.closed)
+            if not broken and not self.get_autocommit():
+                self.connection.rollback()
+            connection_pool.putconn(self.connection, close=broken)
+
+    def ensure_connection(self):
+        if (self.connection is not None and not self.health_check_done
+                and self.settings_dict.get('HEALTH_CHECKS')):
+            self.health_check_done = True
+            if not self.in_atomic_block and not self.is_usable():
+                self.close()
+        super().ensure_connection()
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        # Вызывается в начале и в конце каждого HTTP-запроса.
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
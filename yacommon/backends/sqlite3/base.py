@@ -0,0 +1,22 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite с прагмами из PRAGMAS и режимом транзакций TRANSACTION_MODE.
+
+    Транзакция BEGIN IMMEDIATE берёт блокировку записи сразу. Обычный
+    BEGIN берёт её на первой записи, и если к этому моменту пишет
+    другое соединение, SQLite сразу отвечает «database is locked»,
+    не дожидаясь busy_timeout.
+    """
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict.get('PRAGMAS', {}).items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict.get('TRANSACTION_MODE')
+        self.cursor().execute(f'BEGIN {mode}' if mode else 'BEGIN')
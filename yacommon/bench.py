@@ -0,0 +1,350 @@
+"""
+Нагрузочные замеры проекта через тестовый клиент Django.
+
+Проект описывает нагрузку списком Route: адрес из urls, метод, вес
+в смеси запросов и функцию, которая строит запрос для потока
+нагрузки (Worker). run() гоняет смесь из нескольких потоков в одном
+процессе, без сервера и внешних сервисов, и считает по каждому
+маршруту запросы в секунду, задержки p50/p95/p99 и запросы к базе.
+
+Результат сохраняется в JSON (--output) и сравнивается с прошлым
+(--baseline): падение RPS или рост p95 и числа запросов к базе
+больше чем на --threshold процентов считается регрессией, и скрипт
+завершается с кодом 1. Отчёты можно сравнить и отдельно:
+    python -m yacommon.bench baseline.json current.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+# Маршруты с меньшим числом запросов шумят и в сравнение не входят.
+MIN_REQUESTS = 20
+# Слова для наполнения баз: основы из случайных букв с окончаниями,
+# чтобы у одной основы были разные формы.
+ALPHABET = 'абвгдежзийклмнопрстуфхцчшщэюя'
+ENDINGS = ('а', 'ы', 'ой', 'ами', 'ах', 'у', 'е')
+
+_counter = threading.local()
+
+
+def count_query(execute, sql, params, many, context):
+    if getattr(_counter, 'queries', None) is not None:
+        _counter.queries += 1
+    return execute(sql, params, many, context)
+
+
+def install():
+    """Счётчик запросов к базе для потоков нагрузки."""
+    from .perf import add_execute_wrapper
+
+    add_execute_wrapper(count_query, 'yacommon.bench')
+
+
+def random_word(rng, min_length=3, max_length=10):
+    return ''.join(
+        rng.choice(ALPHABET)
+        for _ in range(rng.randint(min_length, max_length))
+    )
+
+
+def sentence(rng, vocabulary, words):
+    return ' '.join(
+        rng.choice(vocabulary) + rng.choice(ENDINGS) for _ in range(words)
+    )
+
+
+class Route:
+    """
+    Маршрут в смеси нагрузки.
+
+    build(worker) возвращает аргументы вызова тестового клиента
+    (path, data, content_type, ...) или None, если в этом потоке
+    запрос сейчас невозможен — например, удалять уже нечего.
+    client — какой из клиентов потока отправляет запрос.
+    """
+
+    def __init__(self, name, method, weight, build, client='user'):
+        self.name = name
+        self.method = method
+        self.weight = weight
+        self.build = build
+        self.client = client
+
+    @property
+    def label(self):
+        label = f'{self.method} {self.name}'
+        if self.client != 'user':
+            label += f' ({self.client})'
+        return label
+
+
+class Worker:
+    """Поток нагрузки: свои клиенты, генератор случайных чисел и данные."""
+
+    def __init__(self, clients, seed, **state):
+        self.clients = clients
+        self.rng = random.Random(seed)
+        self.samples = []
+        self.__dict__.update(state)
+
+    def request(self, route):
+        kwargs = route.build(self)
+        if kwargs is None:
+            return
+        _counter.queries = 0
+        started = time.perf_counter()
+        try:
+            client = self.clients[route.client]
+            response = getattr(client, route.method.lower())(**kwargs)
+            if response.streaming:
+                # Только первый блок: замеряется время до начала выдачи,
+                # а не скорость чтения клиента.
+                next(iter(response.streaming_content), None)
+                response.close()
+            status = response.status_code
+        except Exception as error:
+            status = type(error).__name__
+        latency = time.perf_counter() - started
+        self.samples.append((route.label, latency, _counter.queries, status))
+        _counter.queries = None
+
+    def run(self, routes, seconds, barrier):
+        from django.db import connections
+
+        weights = [route.weight for route in routes]
+        barrier.wait()
+        deadline = time.monotonic() + seconds
+        try:
+            while time.monotonic() < deadline:
+                self.request(self.rng.choices(routes, weights)[0])
+        finally:
+            connections.close_all()
+
+
+def setup_django(settings_module, prefix, path):
+    """Django на файле SQLite path с применёнными миграциями."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    os.environ[f'{prefix}_DATABASE_URL'] = (
+        'sqlite:///' + os.path.abspath(path)
+    )
+    import django
+    from django.conf import settings
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['testserver']
+    django.setup()
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+
+
+def insert_rows(table, columns, rows, after_batch=None, batch_size=20_000):
+    """
+    Быстрая вставка данных для замера: executemany пачками.
+
+    after_batch(batch) вызывается в транзакции каждой пачки, например
+    чтобы добавить её в поисковый индекс.
+    """
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        table, ', '.join(columns), ', '.join(['%s'] * len(columns))
+    )
+    batch = []
+    inserted = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            inserted += flush_rows(sql, batch, after_batch)
+            print(f'\r{table}: {inserted}', end='', flush=True)
+    inserted += flush_rows(sql, batch, after_batch)
+    print(f'\r{table}: {inserted}')
+    return inserted
+
+
+def flush_rows(sql, batch, after_batch):
+    from django.db import connection, transaction
+
+    count = len(batch)
+    if count:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.executemany(sql, batch)
+            if after_batch is not None:
+                after_batch(batch)
+    batch.clear()
+    return count
+
+
+def percentile(ordered, percent):
+    if not ordered:
+        return 0
+    index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+    return ordered[index]
+
+
+def failed(status):
+    return not isinstance(status, int) or status >= 400
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(latency for _, latency, _, _ in samples)
+    failures = Counter(
+        str(status) for _, _, _, status in samples if failed(status)
+    )
+    errors = sum(failures.values())
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        # Код ответа или имя исключения -> сколько раз.
+        'failures': dict(sorted(failures.items())),
+        'rps': round((len(samples) - errors) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'queries': round(
+            sum(queries for _, _, queries, _ in samples) / len(samples), 2
+        ) if samples else 0,
+    }
+
+
+def run(routes, workers, seconds):
+    """Гоняет смесь routes из потоков workers seconds секунд."""
+    install()
+    barrier = threading.Barrier(len(workers) + 1)
+    threads = [
+        threading.Thread(target=worker.run, args=(routes, seconds, barrier))
+        for worker in workers
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.monotonic()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    samples = [sample for worker in workers for sample in worker.samples]
+    by_route = {}
+    for sample in samples:
+        by_route.setdefault(sample[0], []).append(sample)
+    return {
+        'total': summarize(samples, elapsed),
+        'routes': {
+            label: summarize(route_samples, elapsed)
+            for label, route_samples in sorted(by_route.items())
+        },
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    import django
+
+    return {
+        'created': datetime.now(timezone.utc).isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(baseline, current, threshold):
+    """Регрессии current относительно baseline, порог в процентах."""
+    limit = threshold / 100
+    problems = []
+    for label, after in current['routes'].items():
+        before = baseline['routes'].get(label)
+        if before is None or min(
+            before['requests'], after['requests']
+        ) < MIN_REQUESTS:
+            continue
+        if after['rps'] < before['rps'] * (1 - limit):
+            problems.append(
+                f'{label}: RPS {before["rps"]} -> {after["rps"]}'
+            )
+        if after['p95_ms'] > before['p95_ms'] * (1 + limit):
+            problems.append(
+                f'{label}: p95 {before["p95_ms"]} -> {after["p95_ms"]} мс'
+            )
+        if after['queries'] > before['queries'] * (1 + limit):
+            problems.append(
+                f'{label}: запросов к базе '
+                f'{before["queries"]} -> {after["queries"]}'
+            )
+    return problems
+
+
+def add_arguments(parser):
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--database', metavar='PATH',
+        help='Файл SQLite: заполняется при первом запуске и '
+             'переиспользуется дальше. По умолчанию — временный.',
+    )
+    parser.add_argument('--output', metavar='PATH',
+                        help='Сохранить результаты в JSON.')
+    parser.add_argument('--baseline', metavar='PATH',
+                        help='Сравнить с результатами прошлого запуска.')
+    parser.add_argument('--threshold', type=float, default=20,
+                        help='Допустимое ухудшение, проценты.')
+
+
+def print_results(results):
+    print(f'{"маршрут":<28} {"запросов":>8} {"ошибок":>6} {"RPS":>8} '
+          f'{"p50, мс":>8} {"p95, мс":>8} {"p99, мс":>8} {"SQL":>6}')
+    rows = [*results['routes'].items(), ('всего', results['total'])]
+    for label, row in rows:
+        print(f'{label:<28} {row["requests"]:>8} {row["errors"]:>6} '
+              f'{row["rps"]:>8} {row["p50_ms"]:>8} {row["p95_ms"]:>8} '
+              f'{row["p99_ms"]:>8} {row["queries"]:>6}')
+
+
+def finish(results, args):
+    """Печатает, сохраняет и сравнивает результаты; код выхода."""
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(results, output, ensure_ascii=False, indent=1)
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding='utf-8') as baseline:
+        problems = compare(json.load(baseline), results, args.threshold)
+    for problem in problems:
+        print(f'Регрессия: {problem}')
+    return 1 if problems else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Сравнение двух результатов нагрузочных замеров.'
+    )
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=20)
+    args = parser.parse_args(argv)
+    reports = []
+    for path in (args.baseline, args.current):
+        with open(path, encoding='utf-8') as report:
+            reports.append(json.load(report))
+    problems = compare(*reports, args.threshold)
+    print('\n'.join(problems) or 'Регрессий нет.')
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Условные GET-запросы: ответ 304 до загрузки объекта и рендера шаблона.
+"""
+import asyncio
+import hashlib
+from calendar import timegm
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, quote_etag
+)
+from django.utils.http import http_date
+
+from .aio import database_sync_to_async
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def page_etag(request, version):
+    """
+    ETag страницы по её версии, пользователю и его CSRF-cookie.
+
+    От пользователя зависят ссылки и формы на странице, а токен
+    в форме должен совпадать с текущей CSRF-cookie.
+    """
+    key = '{}:{}:{}'.format(
+        version,
+        request.user.pk,
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+    )
+    return quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+
+def page_validators(get_updated, request, *args, **kwargs):
+    """ETag и Last-Modified страницы или (None, None), если объекта нет."""
+    updated = get_updated(request, *args, **kwargs)
+    if updated is None:
+        return None, None
+    last_modified = None
+    if not request.user.is_authenticated:
+        last_modified = timegm(updated.utctimetuple())
+    return page_etag(request, updated.isoformat()), last_modified
+
+
+def not_modified(request, etag, last_modified):
+    """Ответ 304 (или 412), если он уже ясен по заголовкам запроса."""
+    if etag is None:
+        return None
+    return get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+
+
+def add_validators(request, response, etag, last_modified):
+    if etag is None or response.status_code not in (200, 304):
+        return response
+    response.setdefault('ETag', etag)
+    if last_modified is not None:
+        response.setdefault('Last-Modified', http_date(last_modified))
+    # Браузер должен спрашивать сервер каждый раз, ответ 304 дешёвый.
+    patch_cache_control(
+        response, no_cache=True, private=request.user.is_authenticated
+    )
+    return response
+
+
+def conditional_page(get_updated):
+    """
+    Декоратор представления с поддержкой If-None-Match и If-Modified-Since.
+
+    get_updated(request, *args, **kwargs) возвращает время изменения
+    страницы одним небольшим запросом или None, если объекта нет, —
+    тогда ответ целиком за представлением. Last-Modified отдаётся
+    только анонимам: вошедшему пользователю страницу различает ETag.
+    Подходит и для синхронных, и для асинхронных представлений.
+    """
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_view(request, *args, **kwargs):
+                if request.method not in SAFE_METHODS:
+                    return await view(request, *args, **kwargs)
+                etag, last_modified = await database_sync_to_async(
+                    page_validators
+                )(get_updated, request, *args, **kwargs)
+                response = not_modified(request, etag, last_modified)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return add_validators(request, response, etag, last_modified)
+            return async_view
+
+        @wraps(view)
+        def sync_view(request, *args, **kwargs):
+            if request.method not in SAFE_METHODS:
+                return view(request, *args, **kwargs)
+            etag, last_modified = page_validators(
+                get_updated, request, *args, **kwargs
+            )
+            response = not_modified(request, etag, last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return add_validators(request, response, etag, last_modified)
+        return sync_view
+
+    return decorator
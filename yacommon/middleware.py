@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import perf
+from .routers import end_request, start_request
+
+PIN_COOKIE = 'use_primary'
+
+
+class ReplicaPinningMiddleware:
+    """
+    Закрепляет чтение за основной базой после записи.
+
+    В запросе с записью всё дальнейшее чтение идёт в основную базу,
+    а ответ ставит cookie на REPLICA_PIN_SECONDS: следующие запросы
+    пользователя тоже читают из неё, пока реплика догоняет.
+    Стоит раньше SessionMiddleware, чтобы учитывать и запись сессии.
+    Работает и под ASGI, не переводя запрос в синхронный поток.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Как в MiddlewareMixin: Django должен видеть корутину.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        state, token = start_request(pinned=PIN_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self.pin(state, response)
+
+    async def __acall__(self, request):
+        state, token = start_request(pinned=PIN_COOKIE in request.COOKIES)
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self.pin(state, response)
+
+    def pin(self, state, response):
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class PerformanceMiddleware:
+    """
+    Замеры каждого запроса в гистограммы его представления.
+
+    Время ответа, число и время запросов к базе, время рендера
+    шаблонов (с бэкендом yacommon.templates.DjangoTemplates) и размер
+    ответа; повторяющиеся запросы отмечаются как N+1. Стоит первой,
+    чтобы время включало остальные middleware. Выключается настройкой
+    PERF_ENABLED. У потокового ответа учитывается время до начала
+    выдачи, размер не считается.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PERF_ENABLED:
+            raise MiddlewareNotUsed
+        perf.install()
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        sample, token = perf.start_sample()
+        try:
+            response = self.get_response(request)
+        finally:
+            perf.end_sample(token)
+        return self.record(request, sample, response)
+
+    async def __acall__(self, request):
+        sample, token = perf.start_sample()
+        try:
+            response = await self.get_response(request)
+        finally:
+            perf.end_sample(token)
+        return self.record(request, sample, response)
+
+    def record(self, request, sample, response):
+        match = getattr(request, 'resolver_match', None)
+        perf.registry.record(
+            match.view_name if match else perf.UNRESOLVED,
+            sample,
+            time.perf_counter() - sample.started,
+            None if response.streaming else len(response.content),
+        )
+        return response
@@ -0,0 +1,162 @@
+"""
+Постраничный вывод по ключу, а не по OFFSET, для обоих проектов.
+
+KeysetPaginator листает по (поле сортировки, pk) с непрозрачным
+курсором, paginate_by_pk — просто по возрастанию pk.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+
+FORWARD = 'n'
+BACKWARD = 'p'
+
+
+class KeysetPage:
+    """Страница выборки и курсоры соседних страниц."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Постраничный вывод по ключу (поле сортировки, pk).
+
+    В отличие от OFFSET стоимость запроса не зависит от номера страницы:
+    выборка начинается сразу за ключом последнего показанного объекта
+    и опирается на составной индекс по тем же полям.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.descending = ordering.startswith('-')
+        self.field = queryset.model._meta.get_field(ordering.lstrip('-'))
+        self.per_page = per_page
+
+    def cursor_after(self, obj):
+        """Курсор страницы, которая начинается после объекта."""
+        return self._encode(FORWARD, obj)
+
+    def cursor_before(self, obj):
+        """Курсор страницы, которая заканчивается перед объектом."""
+        return self._encode(BACKWARD, obj)
+
+    def page_queryset(self, cursor=None):
+        """Запрос страницы с запасом в один объект для поиска следующей."""
+        direction, key = self._decode(cursor)
+        backward = direction == BACKWARD
+        descending = self.descending != backward
+        prefix = '-' if descending else ''
+        queryset = self.queryset.order_by(
+            prefix + self.field.name, prefix + 'pk'
+        )
+        if key is not None:
+            value, pk = key
+            name = self.field.name
+            if descending:
+                queryset = queryset.filter(
+                    Q(**{f'{name}__lte': value}),
+                    Q(**{f'{name}__lt': value}) | Q(pk__lt=pk),
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(**{f'{name}__gte': value}),
+                    Q(**{f'{name}__gt': value}) | Q(pk__gt=pk),
+                )
+        return queryset[:self.per_page + 1]
+
+    def get_page(self, cursor=None):
+        direction, key = self._decode(cursor)
+        object_list = list(self.page_queryset(cursor))
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if direction == BACKWARD:
+            object_list.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, key is not None
+        if not object_list:
+            return KeysetPage(object_list)
+        return KeysetPage(
+            object_list,
+            next_cursor=(
+                self.cursor_after(object_list[-1]) if has_next else None
+            ),
+            previous_cursor=(
+                self.cursor_before(object_list[0]) if has_previous else None
+            ),
+        )
+
+    def _encode(self, direction, obj):
+        payload = json.dumps(
+            [direction, self.field.value_to_string(obj), obj.pk],
+            separators=(',', ':'),
+        )
+        return base64.urlsafe_b64encode(
+            payload.encode()
+        ).decode().rstrip('=')
+
+    def _decode(self, cursor):
+        if not cursor:
+            return FORWARD, None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, value, pk = json.loads(
+                base64.urlsafe_b64decode(padded.encode())
+            )
+            if direction not in (FORWARD, BACKWARD):
+                raise ValueError(direction)
+            return direction, (self.field.to_python(value), int(pk))
+        except (
+            binascii.Error, UnicodeDecodeError,
+            ValueError, TypeError, ValidationError
+        ):
+            raise Http404('Неверный курсор страницы.')
+
+
+def paginate_by_pk(queryset, per_page, after=None, before=None):
+    """
+    Страница выборки по возрастанию pk, начиная после after или до before.
+
+    Запрос ищет начало страницы по индексу, поэтому его стоимость
+    зависит от размера страницы, а не от её номера.
+    """
+    try:
+        after = int(after) if after else None
+        before = int(before) if before else None
+    except ValueError:
+        raise Http404('Неверный курсор страницы.')
+    if before is not None:
+        object_list = list(
+            queryset.filter(pk__lt=before).order_by('-pk')[:per_page + 1]
+        )
+        has_previous = len(object_list) > per_page
+        object_list = object_list[:per_page][::-1]
+        has_next = True
+    else:
+        if after is not None:
+            queryset = queryset.filter(pk__gt=after)
+        object_list = list(queryset.order_by('pk')[:per_page + 1])
+        has_next = len(object_list) > per_page
+        object_list = object_list[:per_page]
+        has_previous = after is not None
+    if not object_list:
+        return KeysetPage(object_list)
+    return KeysetPage(
+        object_list,
+        next_cursor=object_list[-1].pk if has_next else None,
+        previous_cursor=object_list[0].pk if has_previous else None,
+    )
@@ -0,0 +1,254 @@
+"""
+Замеры запросов по представлениям: время, запросы к базе, шаблоны.
+
+PerformanceMiddleware заводит на каждый HTTP-запрос RequestSample
+и кладёт его в контекстную переменную. Обёртка выполнения запросов
+к базе и шаблонный бэкенд yacommon.templates дописывают в него время,
+а по завершении запроса замер попадает в гистограммы его
+представления (news:home, notes:list и т. п.).
+
+Статистика своя у каждого процесса и читается через perf_stats
+(yacommon.views) или snapshot(). Запрос, повторённый в одном
+HTTP-запросе не меньше PERF_N_PLUS_ONE_THRESHOLD раз с разными
+параметрами, считается признаком N+1 и попадает в отчёт. Приложения
+добавляют в снимок свои показатели через registry.add_gauge().
+"""
+import logging
+import os
+import re
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import lru_cache
+from threading import Lock
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# Границы корзин 1-2-5 от 0.01 до 10**8: хватает и на миллисекунды,
+# и на число запросов, и на размер ответа в байтах.
+BOUNDS = tuple(
+    mantissa * 10 ** exponent
+    for exponent in range(-2, 9)
+    for mantissa in (1, 2, 5)
+)
+PERCENTILES = (50, 95, 99)
+METRICS = ('wall_ms', 'db_ms', 'queries', 'template_ms', 'response_bytes')
+UNRESOLVED = '<unresolved>'
+
+STRING = re.compile(r"'(?:[^']|'')*'")
+NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER = re.compile(r'%s|\?')
+IN_LIST = re.compile(r'\bIN \(\?(?:, \?)*\)', re.IGNORECASE)
+SPACES = re.compile(r'\s+')
+
+_current = ContextVar('perf_sample', default=None)
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql):
+    """
+    SQL без значений: одинаков у запросов, различающихся параметрами.
+
+    Списки IN любой длины сводятся к одному виду.
+    """
+    sql = STRING.sub('?', sql)
+    sql = NUMBER.sub('?', sql)
+    sql = PLACEHOLDER.sub('?', sql)
+    sql = SPACES.sub(' ', sql).strip()
+    return IN_LIST.sub('IN (...)', sql)
+
+
+class Histogram:
+    """Счётчики по корзинам BOUNDS; перцентиль — верхняя граница корзины."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BOUNDS) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value):
+        self.counts[bisect_left(BOUNDS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent):
+        rank = self.count * percent / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                if index == len(BOUNDS):
+                    return self.max
+                return min(BOUNDS[index], self.max)
+        return 0
+
+    def as_dict(self):
+        result = {
+            'mean': round(self.total / self.count, 3) if self.count else 0,
+            'max': round(self.max, 3),
+        }
+        for percent in PERCENTILES:
+            result[f'p{percent}'] = round(self.percentile(percent), 3)
+        return result
+
+
+class ViewStats:
+    def __init__(self):
+        self.requests = 0
+        self.histograms = {metric: Histogram() for metric in METRICS}
+        # Отпечаток SQL -> (число запросов с N+1, наибольший повтор).
+        self.n_plus_one = {}
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            **{
+                metric: histogram.as_dict()
+                for metric, histogram in self.histograms.items()
+            },
+            'n_plus_one': [
+                {'sql': sql, 'requests': requests, 'max_repeats': repeats}
+                for sql, (requests, repeats) in sorted(
+                    self.n_plus_one.items(), key=lambda item: -item[1][0]
+                )
+            ],
+        }
+
+
+class RequestSample:
+    """Замер одного HTTP-запроса."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.fingerprints = Counter()
+
+    def repeated_queries(self, threshold):
+        return {
+            sql: repeats
+            for sql, repeats in self.fingerprints.items()
+            if repeats >= threshold
+        }
+
+
+class Registry:
+    """Статистика процесса по именам представлений."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.gauges = {}
+        self.reset()
+
+    def add_gauge(self, name, read):
+        """read() возвращает текущие показатели для снимка или None."""
+        self.gauges[name] = read
+
+    def reset(self):
+        with self.lock:
+            self.views = {}
+            self.since = datetime.now(timezone.utc)
+
+    def record(self, view_name, sample, wall_time, response_bytes):
+        repeated = sample.repeated_queries(
+            settings.PERF_N_PLUS_ONE_THRESHOLD
+        )
+        with self.lock:
+            stats = self.views.get(view_name)
+            if stats is None:
+                stats = self.views[view_name] = ViewStats()
+            stats.requests += 1
+            values = (
+                wall_time * 1000, sample.db_time * 1000, sample.queries,
+                sample.template_time * 1000, response_bytes,
+            )
+            for metric, value in zip(METRICS, values):
+                if value is not None:
+                    stats.histograms[metric].add(value)
+            new = [sql for sql in repeated if sql not in stats.n_plus_one]
+            for sql, repeats in repeated.items():
+                requests, max_repeats = stats.n_plus_one.get(sql, (0, 0))
+                stats.n_plus_one[sql] = (
+                    requests + 1, max(max_repeats, repeats)
+                )
+        for sql in new:
+            logger.warning(
+                'N+1 в %s: запрос повторён %d раз: %s',
+                view_name, repeated[sql], sql,
+            )
+
+    def snapshot(self):
+        with self.lock:
+            snapshot = {
+                'pid': os.getpid(),
+                'since': self.since.isoformat(),
+                'views': {
+                    name: stats.as_dict()
+                    for name, stats in sorted(self.views.items())
+                },
+            }
+        snapshot['gauges'] = {
+            name: read() for name, read in sorted(self.gauges.items())
+        }
+        return snapshot
+
+
+registry = Registry()
+
+
+def start_sample():
+    """Начинает замер запроса; токен передаётся в end_sample."""
+    sample = RequestSample()
+    return sample, _current.set(sample)
+
+
+def end_sample(token):
+    _current.reset(token)
+
+
+def current_sample():
+    return _current.get()
+
+
+def track_query(execute, sql, params, many, context):
+    """Обёртка execute_wrapper: время и отпечаток каждого запроса."""
+    sample = _current.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.db_time += time.perf_counter() - started
+        sample.queries += 1
+        sample.fingerprints[fingerprint(sql)] += 1
+
+
+def add_execute_wrapper(wrapper, dispatch_uid):
+    """
+    Подключает обёртку execute_wrapper ко всем соединениям с базой.
+
+    Соединения других потоков получают обёртку при подключении.
+    """
+    def add(sender, connection, **kwargs):
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+
+    connection_created.connect(add, weak=False, dispatch_uid=dispatch_uid)
+    for connection in connections.all():
+        add(None, connection)
+
+
+def install():
+    """Подключает замер запросов к соединениям с базой."""
+    add_execute_wrapper(track_query, 'yacommon.perf')
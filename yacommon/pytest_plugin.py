@@ -0,0 +1,245 @@
+"""
+Плагин pytest: запросы к базе в каждом тесте.
+
+Подключается через pytest_plugins в conftest.py проекта.
+Считает запросы фазы call (тело теста с setUp, без фикстур)
+и проверяет:
+- бюджет: тест с @pytest.mark.query_budget(n) падает, если сделал
+  больше n запросов;
+- N+1: повторы запросов внутри одного HTTP-запроса по правилу
+  PerformanceMiddleware (yacommon.perf) попадают в список подозрений
+  в конце прогона, а с --fail-on-n-plus-one валят тест;
+- медленные запросы дольше --slow-query-ms.
+
+--query-report PATH сохраняет стоимость каждого теста в JSON.
+Два таких отчёта сравнивает
+    python -m yacommon.pytest_plugin old.json new.json
+"""
+import json
+import sys
+import time
+import pytest
+
+from . import perf
+
+SUSPECTS_IN_SUMMARY = 20
+
+_recorder = None
+_installed = False
+
+
+class QueryRecorder:
+    """Запросы одного теста, из любого потока."""
+
+    def __init__(self, slow_query_ms):
+        self.slow_query_ms = slow_query_ms
+        self.queries = 0
+        self.db_time = 0.0
+        self.slow = []
+
+    def add(self, sql, duration):
+        self.queries += 1
+        self.db_time += duration
+        if duration * 1000 >= self.slow_query_ms:
+            self.slow.append({
+                'sql': perf.fingerprint(sql),
+                'ms': round(duration * 1000, 1),
+            })
+
+    def cost(self, budget, n_plus_one):
+        return {
+            'queries': self.queries,
+            'db_ms': round(self.db_time * 1000, 1),
+            'budget': budget,
+            'n_plus_one': n_plus_one,
+            'slow': self.slow,
+        }
+
+
+def request_n_plus_one(snapshot):
+    """
+    Подозрения на N+1 из статистики PerformanceMiddleware.
+
+    Повторы считаются внутри HTTP-запроса: несколько запросов к одной
+    странице в тесте или цикл в самом тесте — не N+1.
+    """
+    return [
+        {'view': view, 'sql': suspect['sql'],
+         'repeats': suspect['max_repeats']}
+        for view, stats in snapshot['views'].items()
+        for suspect in stats['n_plus_one']
+    ]
+
+
+def record_query(execute, sql, params, many, context):
+    recorder = _recorder
+    if recorder is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        recorder.add(sql, time.perf_counter() - started)
+
+
+def install():
+    global _installed
+    if not _installed:
+        perf.add_execute_wrapper(record_query, 'yacommon.pytest_plugin')
+        _installed = True
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('queries', 'запросы к базе в тестах')
+    group.addoption(
+        '--query-report', metavar='PATH',
+        help='Сохранить число запросов каждого теста в JSON.',
+    )
+    group.addoption(
+        '--fail-on-n-plus-one', action='store_true',
+        help='Считать подозрение на N+1 ошибкой теста.',
+    )
+    group.addoption(
+        '--slow-query-ms', type=float, default=100,
+        help='Запросы не быстрее этого отмечаются как медленные.',
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'query_budget(n): тест падает, если сделал больше n запросов.',
+    )
+    config.pluginmanager.register(QueryReport(config), 'query_report')
+
+
+def budget_of(item):
+    marker = item.get_closest_marker('query_budget')
+    return marker.args[0] if marker else None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    global _recorder
+    from django.conf import settings
+
+    if not settings.configured:
+        yield
+        return
+    install()
+    perf.registry.reset()
+    _recorder = QueryRecorder(item.config.getoption('slow_query_ms'))
+    try:
+        yield
+    finally:
+        item.query_cost = _recorder.cost(
+            budget_of(item), request_n_plus_one(perf.registry.snapshot())
+        )
+        _recorder = None
+
+
+def cost_problems(cost, fail_on_n_plus_one):
+    problems = []
+    if cost['budget'] is not None and cost['queries'] > cost['budget']:
+        problems.append(
+            f'Запросов к базе: {cost["queries"]}, '
+            f'бюджет query_budget: {cost["budget"]}.'
+        )
+    if fail_on_n_plus_one:
+        problems.extend(
+            f'Подозрение на N+1 в {suspect["view"]}, '
+            f'{suspect["repeats"]} повторов: {suspect["sql"]}'
+            for suspect in cost['n_plus_one']
+        )
+    return problems
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    cost = getattr(item, 'query_cost', None)
+    if call.when != 'call' or cost is None:
+        return
+    report = outcome.get_result()
+    # Через user_properties стоимость доходит и из воркеров xdist.
+    report.user_properties.append(('query_cost', cost))
+    problems = cost_problems(
+        cost, item.config.getoption('fail_on_n_plus_one')
+    )
+    if problems and report.passed:
+        report.outcome = 'failed'
+        report.longrepr = '\n'.join(problems)
+
+
+class QueryReport:
+    """Собирает стоимость тестов, в том числе из воркеров xdist."""
+
+    def __init__(self, config):
+        self.config = config
+        self.costs = {}
+
+    def pytest_runtest_logreport(self, report):
+        if report.when != 'call':
+            return
+        for name, value in report.user_properties:
+            if name == 'query_cost':
+                self.costs[report.nodeid] = value
+
+    def pytest_terminal_summary(self, terminalreporter):
+        self.write_suspects(terminalreporter)
+        path = self.config.getoption('query_report')
+        if path:
+            with open(path, 'w', encoding='utf-8') as report:
+                json.dump(
+                    self.costs, report,
+                    ensure_ascii=False, indent=1, sort_keys=True,
+                )
+            terminalreporter.write_line(
+                f'Отчёт о запросах: {path} ({len(self.costs)} тестов)'
+            )
+
+    def write_suspects(self, terminalreporter):
+        suspects = [
+            (nodeid, suspect)
+            for nodeid, cost in sorted(self.costs.items())
+            for suspect in cost['n_plus_one']
+        ]
+        if not suspects:
+            return
+        terminalreporter.section('подозрения на N+1')
+        for nodeid, suspect in suspects[:SUSPECTS_IN_SUMMARY]:
+            terminalreporter.write_line(
+                f'{nodeid} ({suspect["view"]}): '
+                f'{suspect["repeats"]} x {suspect["sql"]}'
+            )
+        if len(suspects) > SUSPECTS_IN_SUMMARY:
+            terminalreporter.write_line(
+                f'... и ещё {len(suspects) - SUSPECTS_IN_SUMMARY}'
+            )
+
+
+def compare(old, new):
+    """Строки об изменении числа запросов между двумя отчётами."""
+    lines = []
+    for nodeid in sorted(old.keys() | new.keys()):
+        before = old.get(nodeid, {}).get('queries')
+        after = new.get(nodeid, {}).get('queries')
+        if before != after:
+            lines.append(f'{nodeid}: {before} -> {after}')
+    return lines
+
+
+def main(argv):
+    if len(argv) != 2:
+        sys.exit('Использование: python -m yacommon.pytest_plugin '
+                 'old.json new.json')
+    reports = []
+    for path in argv:
+        with open(path, encoding='utf-8') as report:
+            reports.append(json.load(report))
+    lines = compare(*reports)
+    print('\n'.join(lines) or 'Число запросов не изменилось.')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,74 @@
+"""
+Чтение с реплик, запись в основную базу.
+
+Реплики перечисляются в настройке DATABASE_REPLICAS (алиасы из
+DATABASES). Пока запрос или пользователь «закреплён» за основной
+базой, чтение тоже идёт туда: так пользователь сразу видит только что
+записанное, даже если реплика ещё отстаёт. Закрепление ставит
+ReplicaPinningMiddleware.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Кэш в таблице (DatabaseCache) читается только из основной базы,
+# иначе сброс кэша не был бы виден до догоняющей реплики.
+PRIMARY_ONLY_APPS = frozenset(('django_cache',))
+
+_state = ContextVar('replica_state', default=None)
+
+
+class ReplicaState:
+    """Состояние текущего запроса: закреплён ли он и была ли запись."""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+    @property
+    def use_primary(self):
+        return self.pinned or self.wrote
+
+
+def start_request(pinned=False):
+    """Начинает отслеживание запроса; токен передаётся в end_request."""
+    state = ReplicaState(pinned)
+    return state, _state.set(state)
+
+
+def end_request(token):
+    _state.reset(token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        state = _state.get()
+        if state is not None and state.use_primary:
+            return DEFAULT_DB_ALIAS
+        # Чтение внутри транзакции (select_for_update и т. п.) должно
+        # видеть её же изменения.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы, связи между ними допустимы.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема реплик приходит из основной базы.
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
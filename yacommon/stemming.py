@@ -0,0 +1,49 @@
+"""
+Лёгкий стеммер русского языка для полнотекстового поиска.
+
+Один на оба проекта, чтобы одно и то же слово сводилось к одной
+основе и при индексации заметок, и в запросах к новостям.
+"""
+import re
+from functools import lru_cache
+
+WORD = re.compile(r'\w+')
+REFLEXIVE = ('ся', 'сь')
+# Окончания русских слов.
+ENDINGS = frozenset((
+    'иями', 'ями', 'ами', 'иях', 'ях', 'ах', 'ией', 'ей', 'ой', 'ий', 'ый',
+    'ая', 'яя', 'ое', 'ее', 'ие', 'ые', 'ого', 'его', 'ому', 'ему', 'ыми',
+    'ими', 'ую', 'юю', 'ом', 'ем', 'ам', 'ям', 'ов', 'ев', 'ью', 'ия', 'ья',
+    'ье', 'ии', 'ьи', 'ию', 'ость', 'ости', 'остью', 'остей', 'ать', 'ять',
+    'ить', 'еть', 'ешь', 'ишь', 'ет', 'ит', 'ут', 'ют', 'ат', 'ят', 'ем',
+    'им', 'ете', 'ите', 'ла', 'ли', 'ло', 'а', 'я', 'о', 'е', 'и', 'ы', 'у',
+    'ю', 'ь', 'й', 'л',
+))
+ENDING_LENGTHS = sorted({len(ending) for ending in ENDINGS}, reverse=True)
+MIN_STEM_LENGTH = 3
+
+
+@lru_cache(maxsize=100_000)
+def stem(word):
+    """
+    Лёгкий стеммер: отрезает возвратную частицу и окончание.
+
+    Одинаковая обработка при индексации и поиске сводит формы
+    «заметка», «заметки», «заметкой» к одной основе. Словарь
+    текстов невелик, поэтому основы слов запоминаются.
+    """
+    word = word.lower().replace('ё', 'е')
+    for suffix in REFLEXIVE:
+        if word.endswith(suffix) and len(word) - 2 >= MIN_STEM_LENGTH:
+            word = word[:-2]
+            break
+    # Окончание ищется по множеству, от длинных к коротким.
+    for length in ENDING_LENGTHS:
+        if (len(word) - length >= MIN_STEM_LENGTH
+                and word[-length:] in ENDINGS):
+            return word[:-length]
+    return word
+
+
+def tokenize(text):
+    return [stem(word) for word in WORD.findall(text)]
@@ -0,0 +1,41 @@
+"""
+Шаблонный бэкенд Django с замером времени рендера для yacommon.perf.
+
+Подключается в TEMPLATES вместо DjangoTemplates; вне замера
+запроса работает как обычный бэкенд.
+"""
+import time
+
+from django.template import TemplateDoesNotExist
+from django.template.backends import django
+
+from .perf import current_sample
+
+
+class Template(django.Template):
+
+    def render(self, context=None, request=None):
+        sample = current_sample()
+        if sample is None:
+            return super().render(context, request)
+        # render_to_string внутри рендера не должен считаться дважды.
+        sample.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            sample.template_depth -= 1
+            if not sample.template_depth:
+                sample.template_time += time.perf_counter() - started
+
+
+class DjangoTemplates(django.DjangoTemplates):
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django.reraise(exc, self)
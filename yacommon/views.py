@@ -0,0 +1,21 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+
+from .perf import registry
+
+
+@never_cache
+@staff_member_required
+def perf_stats(request):
+    """
+    Статистика PerformanceMiddleware этого процесса в JSON, вместе
+    с показателями приложений (gauges), например очереди модерации.
+
+    POST с reset=1 начинает счёт заново.
+    """
+    if request.method == 'POST' and request.POST.get('reset'):
+        registry.reset()
+    return JsonResponse(registry.snapshot(), json_dumps_params={
+        'ensure_ascii': False, 'indent': 2,
+    })